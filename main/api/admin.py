@@ -1,6 +1,6 @@
 from django.contrib import admin
 from .models import (
-    User, BusinessType, AnalysisRequest,
+    User, BusinessType, AnalysisRequest, AnalysisJob,
     TypeRecommendation, SpotRecommendation,
     FavoriteType, FavoriteSpot
 )
@@ -24,6 +24,13 @@ class AnalysisRequestAdmin(admin.ModelAdmin):
     search_fields = ("address",)
 
 
+@admin.register(AnalysisJob)
+class AnalysisJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "analysis_request", "status", "attempts", "available_at", "locked_by", "finished_at")
+    list_filter = ("status",)
+    search_fields = ("error",)
+
+
 @admin.register(TypeRecommendation)
 class TypeRecommendationAdmin(admin.ModelAdmin):
     list_display = ("id", "analysis_request", "business_type", "score", "check_save", "created_at")
@@ -0,0 +1,219 @@
+# api/async_views.py
+# 추천 API 의 비동기(ASGI) 버전. ASGI 서버에서만 연결된다 (asgi.py 가 RECOMMEND_ASYNC=1 로 띄움).
+# 응답 모양과 내용 협상(?format=, Accept)은 views.RecommendBusinessTypes / RecommendSpotsByType 과 같다:
+# 같은 DRF 렌더러로 본문을 만들고, 탐색용 HTML(format=api)은 동기 뷰에 그대로 맡긴다.
+# 점수 계산과 DB 조회는 전용 스레드 풀에서, LLM 설명은 이벤트 루프에서 await 하므로
+# OpenAI 응답을 기다리는 동안 워커 스레드를 잡고 있지 않는다.
+# 비동기 뷰에만 있는 것: ?stream=ndjson|sse 면 점수 결과를 먼저 보내고, 설명은 LLM 호출이 끝나는 대로 이어서 보낸다.
+from __future__ import annotations
+
+import json
+import logging
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework.exceptions import NotAcceptable
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .services import timing
+from .views import (
+    RecommendBusinessTypes, RecommendSpotsByType, _fallback_explain, _lazy_why, _set_lazy_why,
+)
+
+logger = logging.getLogger(__name__)
+
+_pool = ThreadPoolExecutor(max_workers=settings.RECOMMEND_ASYNC_THREADS, thread_name_prefix="recommend")
+
+
+def _in_pool(fn):
+    # thread_sensitive=False + 전용 풀: 요청끼리 한 스레드에 줄 서지 않고, contextvars(타이밍 구간)는 그대로 넘어간다.
+    # 풀 스레드의 DB 연결은 요청 시작/끝 신호가 정리해 주지 않으므로 실행 앞뒤로 직접 정리한다
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False, executor=_pool)
+
+
+def _negotiate(request):
+    """APIView 와 같은 렌더러 목록/내용 협상. (렌더러, 미디어 타입), 맞는 렌더러가 없으면 (None, None)."""
+    renderers = [cls() for cls in api_settings.DEFAULT_RENDERER_CLASSES]
+    try:
+        return api_settings.DEFAULT_CONTENT_NEGOTIATION_CLASS().select_renderer(Request(request), renderers)
+    except NotAcceptable:
+        return None, None
+
+
+def _render(renderer, media_type: str, data: dict, status: int = 200) -> HttpResponse:
+    """DRF Response 와 같은 본문/헤더 (Content-Type, Vary: Accept, Allow)."""
+    content_type = renderer.media_type if renderer.charset is None else f"{renderer.media_type}; charset={renderer.charset}"
+    resp = HttpResponse(renderer.render(data, media_type, {}), status=status, content_type=content_type)
+    resp["Vary"] = "Accept"
+    resp["Allow"] = "GET, HEAD, OPTIONS"
+    return resp
+
+
+class _AsyncRecommendView(View, ABC):
+    """
+    내용 협상 후 JSON 계열이면 respond() 를 await, 탐색용 HTML 이면 동기 뷰(sync_view)를 풀에서 실행.
+    ?stream= 요청은 협상하지 않는다 (EventSource 는 Accept: text/event-stream 을 보냄). 오류는 JSON.
+    """
+    sync_view = None
+
+    async def get(self, request):
+        if _stream_format(request.GET):
+            renderer, media_type = JSONRenderer(), "application/json"
+        else:
+            renderer, media_type = _negotiate(request)
+            if renderer is None:
+                return _render(JSONRenderer(), "application/json", {"detail": NotAcceptable.default_detail}, status=406)
+            if isinstance(renderer, BrowsableAPIRenderer):
+                return await _in_pool(self._sync_get)(request)
+        data, status = await self.respond(request)
+        if status is None:
+            return data
+        return _render(renderer, media_type, data, status)
+
+    def _sync_get(self, request):
+        # 동기 뷰 응답은 렌더링까지 풀 스레드에서
+        return self.sync_view.as_view()(request).render()
+
+    @abstractmethod
+    async def respond(self, request):
+        """(응답 dict, 상태 코드) 또는 (스트리밍 응답, None)."""
+
+
+async def asafe_explain_many(features_list: List[dict], lang: str = "ko") -> List[str]:
+    """views.safe_explain_many 의 비동기 버전."""
+    if not features_list:
+        return []
+    try:
+        from api.services.llm_openai import aexplain_many
+        with timing.span("explain"):
+            return await aexplain_many(features_list, lang=lang)
+    except Exception as e:
+        logger.warning("explain fallback: %r", e)
+        return [_fallback_explain(f, lang) for f in features_list]
+
+
+STREAM_CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson; charset=utf-8",
+    "sse": "text/event-stream; charset=utf-8",
+}
+
+
+def _stream_format(params) -> Optional[str]:
+    fmt = (params.get("stream") or "").strip().lower()
+    return fmt if fmt in STREAM_CONTENT_TYPES else None
+
+
+def _event(fmt: str, name: str, data: dict) -> bytes:
+    body = json.dumps({"event": name, **data}, ensure_ascii=False)
+    if fmt == "sse":
+        return f"event: {name}\ndata: {body}\n\n".encode("utf-8")
+    return (body + "\n").encode("utf-8")
+
+
+async def _explain_events(fmt: str, features_list: List[dict], deltas: bool) -> AsyncIterator[bytes]:
+    """설명을 끝나는 순서대로 why 이벤트로 (deltas 면 토큰 조각은 delta 이벤트로)."""
+    sent = set()
+    try:
+        from api.services.llm_openai import astream_many
+        async for i, text, final in astream_many(features_list, deltas=deltas):
+            if final:
+                sent.add(i)
+                yield _event(fmt, "why", {"index": i, "why": text})
+            else:
+                yield _event(fmt, "delta", {"index": i, "text": text})
+    except Exception as e:
+        logger.warning("explain stream fallback: %r", e)
+    for i, f in enumerate(features_list):
+        if i not in sent:
+            yield _event(fmt, "why", {"index": i, "why": _fallback_explain(f)})
+
+
+def _stream(request, fmt: str, head: dict, features_list: List[dict]) -> StreamingHttpResponse:
+    """
+    results 이벤트(why 는 null 또는 lazy URL) → why/delta 이벤트 → done.
+    index 는 results 안의 위치. lazy 요청이면 설명 이벤트 없이 끝난다.
+    """
+    lazy = _lazy_why(request.GET)
+    deltas = request.GET.get("deltas", "").lower() in ("1", "true", "yes")
+
+    async def events() -> AsyncIterator[bytes]:
+        yield _event(fmt, "results", head)
+        if not lazy and features_list:
+            async for chunk in _explain_events(fmt, features_list, deltas):
+                yield chunk
+        yield _event(fmt, "done", {})
+
+    resp = StreamingHttpResponse(events(), content_type=STREAM_CONTENT_TYPES[fmt])
+    # 프록시가 모아서 보내지 않도록
+    resp["Cache-Control"] = "no-cache"
+    resp["X-Accel-Buffering"] = "no"
+    return resp
+
+
+# GET /api/v1/recommendations/types/?lat=&lon=&radius_km=3  (ASGI, &stream=ndjson|sse&deltas=1 가능)
+class RecommendBusinessTypesAsync(_AsyncRecommendView):
+    sync_view = RecommendBusinessTypes
+
+    async def respond(self, request):
+        args, error = RecommendBusinessTypes.parse(request.GET)
+        if error:
+            return {"detail": error}, 400
+        lat, lon, results, features_list, effective_km = await _in_pool(RecommendBusinessTypes().compute)(*args)
+        origin = {"lat": lat, "lon": lon}
+        fmt = _stream_format(request.GET)
+        if fmt:
+            if _lazy_why(request.GET):
+                _set_lazy_why("types", results, lat, lon)
+            for r in results:
+                r.setdefault("why", None)
+            return _stream(request, fmt, {"results": results, "effective_radius_km": effective_km, "origin": origin}, features_list), None
+        if not results:
+            return {"results": [], "effective_radius_km": effective_km, "origin": origin}, 200
+
+        if _lazy_why(request.GET):
+            _set_lazy_why("types", results, lat, lon)
+        else:
+            for r, why in zip(results, await asafe_explain_many(features_list)):
+                r["why"] = why
+        return {"results": results, "effective_radius_km": effective_km, "origin": origin}, 200
+
+
+# GET /api/v1/recommendations/spots/?type=&lat=&lon=&radius_km=5  (ASGI, &stream=ndjson|sse&deltas=1 가능)
+class RecommendSpotsByTypeAsync(_AsyncRecommendView):
+    sync_view = RecommendSpotsByType
+
+    async def respond(self, request):
+        args, error = RecommendSpotsByType.parse(request.GET)
+        if error:
+            return {"detail": error}, 400
+        qtype, lat, lon, results, features_list = await _in_pool(RecommendSpotsByType().compute)(*args)
+        fmt = _stream_format(request.GET)
+        if fmt:
+            if _lazy_why(request.GET):
+                _set_lazy_why("spots", results, lat, lon, qtype)
+            for r in results:
+                r.setdefault("why", None)
+            return _stream(request, fmt, {"results": results}, features_list), None
+        if not results:
+            return {"results": []}, 200
+
+        if _lazy_why(request.GET):
+            _set_lazy_why("spots", results, lat, lon, qtype)
+        else:
+            for rec, why in zip(results, await asafe_explain_many(features_list)):
+                rec["why"] = why
+        return {"results": results}, 200
@@ -0,0 +1,149 @@
+# api/management/commands/_rows.py
+# import_data 의 CSV 행 파싱. 멀티프로세스 워커에서 import 되므로 Django 를 import 하지 않는다.
+from __future__ import annotations
+import csv, hashlib, io, os, re
+from typing import Any, Dict, List, Optional, Tuple
+
+NUM_RE = re.compile(r"-?\d+")
+
+# 워커 → 적재 프로세스로 넘기는 튜플의 필드 순서 (dict 보다 피클 크기가 작다)
+ROW_FIELDS = (
+    "code", "business_code", "business_types", "address", "region_code", "region", "floor",
+    "latitude", "longitude", "monthly_rent", "deposit", "daily_footfall_avg",
+)
+
+def pick(d: Dict[str, Any], *keys: str) -> str:
+    for k in keys:
+        if k in d and str(d[k]).strip() != "":
+            return str(d[k]).strip()
+    return ""
+
+def to_int(s: str, default: int = 0) -> int:
+    if not s:
+        return default
+    s = s.replace(",", "").strip()
+    m = NUM_RE.search(s)
+    if not m:
+        return default
+    try:
+        return int(m.group())
+    except Exception:
+        return default
+
+def to_floor(s: str) -> Optional[int]:
+    if not s:
+        return None
+    n = to_int(s, default=0)
+    if n <= 0:
+        return None
+    return n
+
+def to_float(s: str) -> Optional[float]:
+    if not s:
+        return None
+    try:
+        return float(s.replace(",", "").strip())
+    except Exception:
+        return None
+
+def parse_row(r: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """CSV 한 행 → Data 필드 dict. 필수값(code, 위경도)이 없으면 None."""
+    code = pick(r, "상가업소번호")
+
+    # 업종 코드/명: 소분류 우선
+    business_code = pick(
+        r,
+        "상권업종소분류코드",
+        "상권업종중분류코드",
+        "상권업종대분류코드",
+        "표준산업분류코드",
+    )
+    business_types = pick(
+        r,
+        "상권업종소분류명",
+        "상권업종중분류명",
+        "상권업종대분류명",
+        "표준산업분류명",
+    )
+
+    address = pick(r, "도로명주소", "지번주소")
+    region_code = pick(r, "법정동코드")   # 없으면 빈 문자열로 저장됨
+    region = pick(r, "법정동명")
+    floor = to_floor(pick(r, "층정보"))
+    lon = to_float(pick(r, "경도"))
+    lat = to_float(pick(r, "위도"))
+
+    # 금액/유동인구: 엑셀 값 그대로(단위 변환 없음)
+    deposit = to_int(pick(r, "예상보증금", "보증금(만원)"), default=0)
+    monthly_rent = to_int(pick(r, "예상월세", "월세(만원)"), default=0)
+    daily_footfall_avg = to_int(pick(r, "예상유동인구", "일평균 유동인구"), default=0)
+
+    # 필수: code, 위경도
+    if not code or lat is None or lon is None:
+        return None
+
+    return dict(
+        code=code,
+        business_code=business_code,
+        business_types=business_types,
+        address=address,
+        region_code=region_code,
+        region=region,
+        floor=floor,
+        latitude=lat,
+        longitude=lon,
+        monthly_rent=monthly_rent,
+        deposit=deposit,
+        daily_footfall_avg=daily_footfall_avg,
+    )
+
+def code_digest(code: str) -> int:
+    """중복 확인용 8바이트 해시 (문자열을 그대로 들고 있는 것보다 작다)."""
+    return int.from_bytes(hashlib.blake2b(code.encode("utf-8"), digest_size=8).digest(), "little")
+
+def _body_encoding(encoding: str) -> str:
+    # BOM 은 파일 맨 앞에만 있으므로 중간 구간은 BOM 없는 코덱으로 읽는다
+    return "utf-8" if encoding.lower().replace("_", "-") == "utf-8-sig" else encoding
+
+def read_header(path: str, encoding: str, delimiter: str) -> Tuple[List[str], int]:
+    """(헤더 컬럼 목록, 본문 시작 바이트 위치)."""
+    with open(path, "rb") as f:
+        line = f.readline()
+        start = f.tell()
+    fieldnames = next(csv.reader([line.decode(encoding).rstrip("\r\n")], delimiter=delimiter))
+    return fieldnames, start
+
+def split_ranges(path: str, encoding: str, delimiter: str, chunk_bytes: int) -> Tuple[List[str], List[Tuple[int, int]]]:
+    """본문을 chunk_bytes 크기의 바이트 구간으로 나눈다. 경계 정렬은 parse_range 에서 처리."""
+    fieldnames, start = read_header(path, encoding, delimiter)
+    size = os.path.getsize(path)
+    ranges = [(s, min(size, s + chunk_bytes)) for s in range(start, size, chunk_bytes)]
+    return fieldnames, ranges
+
+def parse_range(path: str, encoding: str, delimiter: str, fieldnames: List[str],
+                start: int, end: int) -> List[tuple]:
+    """
+    [start, end) 구간에서 '시작하는' 레코드만 파싱해 ROW_FIELDS 순서 튜플 목록으로 반환.
+    레코드 경계 = 줄바꿈 (상권정보 CSV 는 따옴표 안 줄바꿈이 없다는 전제).
+    """
+    with open(path, "rb") as f:
+        if start > 0:
+            f.seek(start - 1)
+            if f.read(1) != b"\n":
+                f.readline()   # 앞 구간에 속한 줄의 나머지는 건너뜀
+        pos = f.tell()
+        lines = []
+        while pos < end:
+            line = f.readline()
+            if not line:
+                break
+            pos += len(line)
+            lines.append(line)
+    text = b"".join(lines).decode(_body_encoding(encoding))
+    reader = csv.DictReader(io.StringIO(text, newline=""), fieldnames=fieldnames, delimiter=delimiter)
+    out = []
+    for r in reader:
+        row = parse_row(r)
+        if row is not None:
+            out.append(tuple(row[k] for k in ROW_FIELDS))
+    return out
@@ -0,0 +1,164 @@
+from __future__ import annotations
+import os, random, statistics, tempfile, time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Tuple
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connections, transaction
+from api.models import AnalysisRequest, BusinessType, Data, SpotRecommendation, TypeRecommendation, User
+from api.services import synthetic
+from api.services.spatial import bbox_for_radius
+
+#python manage.py bench_indexes                      (Data 100만 행)
+#python manage.py bench_indexes --rows 200000 --repeat 20
+
+ALIAS = "bench_indexes"
+MODELS = (User, BusinessType, AnalysisRequest, Data, TypeRecommendation, SpotRecommendation)
+# Meta.indexes 를 가진 모델 (인덱스 전/후 비교 대상)
+INDEXED = (Data, TypeRecommendation, SpotRecommendation)
+
+
+class Command(BaseCommand):
+    help = ("임시 SQLite DB 에 가상 데이터를 채우고 Data/추천 결과 조회의 쿼리 플랜과 시간을 "
+            "복합 인덱스 추가 전/후로 비교 (운영 DB 는 건드리지 않음).")
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--rows", type=int, default=1_000_000, help="Data 행 수 (기본 100만)")
+        parser.add_argument("--requests", type=int, default=20_000, help="분석 요청 수 (기본 2만)")
+        parser.add_argument("--per-request", type=int, default=10, help="요청당 업종/위치 추천 행 수 (기본 10)")
+        parser.add_argument("--repeat", type=int, default=50, help="쿼리별 반복 횟수 (기본 50)")
+        parser.add_argument("--path", default="", help="임시 DB 경로 (기본: 임시 디렉터리)")
+        parser.add_argument("--keep", action="store_true", help="끝난 뒤 임시 DB 파일을 지우지 않음")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **opts):
+        default = connections.databases["default"]
+        if default["ENGINE"] != "django.db.backends.sqlite3":
+            raise CommandError("SQLite 설정에서만 실행할 수 있습니다.")
+        path = opts["path"] or os.path.join(tempfile.gettempdir(), "bench_indexes.sqlite3")
+        if os.path.exists(path):
+            os.remove(path)
+        connections.databases[ALIAS] = {**default, "NAME": path}
+        conn = connections[ALIAS]
+        try:
+            self._create_schema(conn)
+            self._fill(conn, opts["rows"], opts["requests"], opts["per_request"], opts["seed"])
+            cases = self._cases(opts["requests"], opts["repeat"], opts["seed"])
+
+            before = self._run(cases)
+            t0 = time.perf_counter()
+            with conn.schema_editor() as ed:
+                for model in INDEXED:
+                    for index in model._meta.indexes:
+                        ed.add_index(model, index)
+            with conn.cursor() as cur:
+                cur.execute("ANALYZE")
+            self.stdout.write(f"indexes built in {time.perf_counter() - t0:.1f}s")
+            after = self._run(cases)
+            self._report(before, after)
+        finally:
+            conn.close()
+            del connections.databases[ALIAS]
+            if not opts["keep"] and os.path.exists(path):
+                os.remove(path)
+
+    def _create_schema(self, conn) -> None:
+        # 운영 스키마 그대로 만든 뒤 이번에 추가한 복합 인덱스만 제거 → '인덱스 전' 상태
+        with conn.schema_editor() as ed:
+            for model in MODELS:
+                ed.create_model(model)
+        # 인덱스 생성은 schema_editor 종료 시점(deferred)에 실행되므로 블록을 나눈다
+        with conn.schema_editor() as ed:
+            for model in INDEXED:
+                for index in model._meta.indexes:
+                    ed.remove_index(model, index)
+
+    def _fill(self, conn, n_rows: int, n_req: int, per_req: int, seed: int) -> None:
+        t0 = time.perf_counter()
+        now = datetime.now(timezone.utc).isoformat()
+        rnd = random.Random(seed)
+        cols = [f.column for f in Data._meta.concrete_fields if f.column != "id"]
+        sql = f"INSERT INTO {Data._meta.db_table} ({', '.join(cols)}) VALUES ({', '.join(['%s'] * len(cols))})"
+        with transaction.atomic(using=ALIAS), conn.cursor() as cur:
+            buf: List[Tuple] = []
+            for row in synthetic.rows(n_rows, seed=seed):
+                row["is_active"] = True
+                buf.append(tuple(row[c] for c in cols))
+                if len(buf) >= 20000:
+                    cur.executemany(sql, buf)
+                    buf = []
+            cur.executemany(sql, buf)
+
+            User.objects.using(ALIAS).create(uuid="bench")
+            BusinessType.objects.using(ALIAS).bulk_create([BusinessType(name=t) for t in synthetic.TYPES])
+            type_ids = list(BusinessType.objects.using(ALIAS).values_list("id", flat=True))
+            ar = AnalysisRequest._meta.db_table
+            cur.executemany(
+                f"INSERT INTO {ar} (user_id, plan, longitude, created_at) VALUES (1, 'A', 127.0, %s)",
+                [(now,)] * n_req,
+            )
+            trs, srs = [], []
+            for req in range(1, n_req + 1):
+                for _ in range(per_req):
+                    trs.append((req, rnd.choice(type_ids), rnd.random() * 5, False, now))
+                    srs.append((req, rnd.randint(1, n_rows), rnd.choice(type_ids), rnd.random() * 5, False, now))
+            cur.executemany(
+                f"INSERT INTO {TypeRecommendation._meta.db_table} "
+                f"(analysis_request_id, business_type_id, score, check_save, created_at) VALUES (%s, %s, %s, %s, %s)", trs)
+            cur.executemany(
+                f"INSERT INTO {SpotRecommendation._meta.db_table} "
+                f"(analysis_request_id, spot_id, business_type_id, score, check_save, created_at) "
+                f"VALUES (%s, %s, %s, %s, %s, %s)", srs)
+        with conn.cursor() as cur:
+            cur.execute("ANALYZE")
+        self.stdout.write(f"filled {n_rows:,} Data / {n_req * per_req:,} x2 recommendation rows "
+                          f"in {time.perf_counter() - t0:.1f}s")
+
+    def _cases(self, n_req: int, repeat: int, seed: int) -> Dict[str, List[Callable]]:
+        """쿼리 이름 → 매개변수만 다른 QuerySet 생성 함수 목록 (전/후 같은 매개변수 사용)."""
+        rnd = random.Random(seed + 1)
+        data = Data.objects.using(ALIAS)
+        cases: Dict[str, List[Callable]] = {
+            "data_bbox": [], "data_type_bbox": [], "data_type_icontains_bbox": [],
+            "type_rec_by_request": [], "spot_rec_by_request": [],
+        }
+        for _ in range(repeat):
+            _, lat, lon, _ = rnd.choice(synthetic.HOTSPOTS)
+            lat += rnd.uniform(-0.01, 0.01)
+            lon += rnd.uniform(-0.01, 0.01)
+            min_lat, max_lat, min_lon, max_lon = bbox_for_radius(lat, lon, 1.0)
+            box = {"latitude__range": (min_lat, max_lat), "longitude__range": (min_lon, max_lon)}
+            btype = rnd.choice(synthetic.TYPES)
+            ar_id = rnd.randint(1, n_req)
+            cases["data_bbox"].append(lambda box=box: data.filter(**box).values_list("id", flat=True))
+            cases["data_type_bbox"].append(
+                lambda box=box, t=btype: data.filter(business_types=t, **box).values_list("id", flat=True))
+            cases["data_type_icontains_bbox"].append(
+                lambda box=box, t=btype: data.filter(business_types__icontains=t, **box).values_list("id", flat=True))
+            cases["type_rec_by_request"].append(
+                lambda a=ar_id: TypeRecommendation.objects.using(ALIAS).filter(analysis_request_id=a).order_by("-score", "-id")[:3])
+            cases["spot_rec_by_request"].append(
+                lambda a=ar_id: SpotRecommendation.objects.using(ALIAS).filter(analysis_request_id=a).order_by("-score", "-id")[:3])
+        return cases
+
+    def _run(self, cases: Dict[str, List[Callable]]) -> Dict[str, Tuple[float, str]]:
+        out = {}
+        for name, makers in cases.items():
+            plan = makers[0]().explain()
+            times = []
+            for make in makers:
+                t0 = time.perf_counter()
+                list(make())
+                times.append((time.perf_counter() - t0) * 1000)
+            out[name] = (statistics.median(times), plan)
+        return out
+
+    def _report(self, before, after) -> None:
+        self.stdout.write("")
+        self.stdout.write(f"{'query':<28}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+        for name in before:
+            b, a = before[name][0], after[name][0]
+            self.stdout.write(f"{name:<28}{b:>12.2f}{a:>12.2f}{b / max(a, 1e-6):>9.1f}x")
+        for name in before:
+            self.stdout.write(f"\n[{name}]")
+            self.stdout.write("  before: " + before[name][1].replace("\n", "\n          "))
+            self.stdout.write("  after:  " + after[name][1].replace("\n", "\n          "))
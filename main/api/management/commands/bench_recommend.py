@@ -0,0 +1,211 @@
+from __future__ import annotations
+import io, json, os, platform, random, statistics, tempfile, time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from unittest import mock
+from urllib.parse import urlencode
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connections
+from django.test import Client
+from api.services import clusters, recommender, response_cache, spatial, synthetic
+from api.services.spatial import bbox_for_radius
+
+#python manage.py bench_recommend                                    (1만/10만/100만 행)
+#python manage.py bench_recommend --sizes 10000,100000 --out bench.json
+#python manage.py bench_recommend --sizes 100000 --baseline bench.json   (p50 이 25% 넘게 느려지면 실패)
+
+DEFAULT_SIZES = "10000,100000,1000000"
+
+
+# LLM 대신 고정 문장 (네트워크/모델 시간 제외하고 추천 경로만 잰다). 동기/비동기 뷰가 부르는 입구를 모두 바꾼다
+FAKE_WHY = "벤치마크용 설명"
+
+
+def _fake_explain(features, lang="ko"):
+    return FAKE_WHY
+
+
+def _fake_explain_many(features_list, lang="ko", **kwargs):
+    return [FAKE_WHY] * len(features_list)
+
+
+async def _fake_aexplain_many(features_list, lang="ko", **kwargs):
+    return [FAKE_WHY] * len(features_list)
+
+
+async def _fake_astream_many(features_list, lang="ko", deltas=False, **kwargs):
+    for i in range(len(features_list)):
+        yield i, FAKE_WHY, True
+
+
+class Command(BaseCommand):
+    help = ("임시 SQLite DB 에 서울 상권 모양의 가상 데이터를 import_data 로 적재하고, "
+            "업종/위치 추천과 by_bbox 를 HTTP 경로 그대로 (LLM 은 고정 응답) 측정해 JSON 으로 남긴다. "
+            "운영 DB 는 건드리지 않음.")
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Data 행 수 목록 (기본 {DEFAULT_SIZES})")
+        parser.add_argument("--repeat", type=int, default=50, help="엔드포인트별 요청 수 (기본 50)")
+        parser.add_argument("--import-workers", type=int, default=1, help="import_data --workers (기본 1)")
+        parser.add_argument("--out", default="", help="결과 JSON 경로 (없으면 표만 출력)")
+        parser.add_argument("--baseline", default="", help="비교할 이전 결과 JSON")
+        parser.add_argument("--tolerance", type=float, default=1.25, help="p50 이 기준의 이 배수를 넘으면 회귀 (기본 1.25)")
+        parser.add_argument("--path", default="", help="임시 DB 경로 (기본: 임시 디렉터리)")
+        parser.add_argument("--keep", action="store_true", help="끝난 뒤 임시 DB/CSV 파일을 지우지 않음")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **opts):
+        conn = connections["default"]
+        if conn.settings_dict["ENGINE"] != "django.db.backends.sqlite3":
+            raise CommandError("SQLite 설정에서만 실행할 수 있습니다.")
+        try:
+            sizes = [int(s) for s in opts["sizes"].split(",") if s.strip()]
+        except ValueError:
+            raise CommandError("--sizes 는 쉼표로 구분한 정수 목록입니다.")
+
+        results: List[Dict] = []
+        for n in sizes:
+            results.extend(self._bench_size(n, opts))
+
+        report = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "repeat": opts["repeat"],
+            "seed": opts["seed"],
+            "results": results,
+        }
+        self._print(results)
+        if opts["out"]:
+            with open(opts["out"], "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            self.stdout.write(f"\nwrote {opts['out']}")
+        if opts["baseline"]:
+            self._compare(results, opts["baseline"], opts["tolerance"])
+
+    def _bench_size(self, n: int, opts) -> List[Dict]:
+        """n 행 임시 DB 하나를 만들어 적재 → 준비 → 엔드포인트 측정."""
+        conn = connections["default"]
+        base = opts["path"] or os.path.join(tempfile.gettempdir(), "bench_recommend")
+        db_path, csv_path = f"{base}_{n}.sqlite3", f"{base}_{n}.csv"
+        for p in (db_path, csv_path):
+            if os.path.exists(p):
+                os.remove(p)
+
+        # 테스트 러너와 같은 방식으로 default 연결만 임시 DB 로 바꿔 끼운다 (뷰/명령이 그대로 그 DB 를 씀)
+        original = conn.settings_dict["NAME"]
+        conn.close()
+        conn.settings_dict["NAME"] = db_path
+        self._reset()
+        out: List[Dict] = []
+        try:
+            call_command("migrate", verbosity=0, interactive=False)
+            t0 = time.perf_counter()
+            synthetic.write_csv(csv_path, n, seed=opts["seed"])
+            self.stdout.write(f"[{n:,}] csv {time.perf_counter() - t0:.1f}s")
+
+            t0 = time.perf_counter()
+            call_command("import_data", path=csv_path, encoding="utf-8", workers=opts["import_workers"], stdout=io.StringIO())
+            sec = time.perf_counter() - t0
+            out.append({"rows": n, "name": "import_data", "seconds": round(sec, 3), "rows_per_s": round(n / max(sec, 1e-9))})
+
+            # 첫 요청에 섞이지 않도록 준비 단계는 따로 잰다
+            for name, warm in (("grid_index_build", spatial.get_index), ("recommender_load", recommender.get_recommender)):
+                t0 = time.perf_counter()
+                warm()
+                out.append({"rows": n, "name": name, "seconds": round(time.perf_counter() - t0, 3)})
+
+            client = Client()
+            with mock.patch.multiple("api.services.llm_openai", explain=_fake_explain, explain_many=_fake_explain_many,
+                                     aexplain_many=_fake_aexplain_many, astream_many=_fake_astream_many):
+                for name, urls in self._cases(opts["repeat"], opts["seed"]).items():
+                    out.append({"rows": n, "name": name, **self._time(client, urls)})
+        finally:
+            conn.close()
+            conn.settings_dict["NAME"] = original
+            self._reset()
+            if not opts["keep"]:
+                for p in (db_path, csv_path):
+                    if os.path.exists(p):
+                        os.remove(p)
+        return out
+
+    def _reset(self) -> None:
+        # 프로세스 메모리 상태는 데이터 버전으로만 구분하므로, DB 를 바꿀 때 직접 비운다
+        spatial._index = None
+        recommender._engine = None
+        clusters._clusters = None
+        response_cache.clear()
+
+    def _cases(self, repeat: int, seed: int) -> Dict[str, List[str]]:
+        """엔드포인트 이름 → 요청 URL 목록 (핫스팟 주변 무작위 좌표)."""
+        rnd = random.Random(seed + 1)
+        cases: Dict[str, List[str]] = {
+            "recommend_types": [], "recommend_spots": [], "by_bbox": [], "by_bbox_columnar": [],
+        }
+        for _ in range(repeat):
+            _, lat, lon, _ = rnd.choice(synthetic.HOTSPOTS)
+            lat += rnd.uniform(-0.01, 0.01)
+            lon += rnd.uniform(-0.01, 0.01)
+            min_lat, max_lat, min_lon, max_lon = bbox_for_radius(lat, lon, 1.0)
+            box = {"min_lat": min_lat, "max_lat": max_lat, "min_lon": min_lon, "max_lon": max_lon}
+            cases["recommend_types"].append(
+                "/api/v1/recommendations/types/?" + urlencode({"lat": lat, "lon": lon, "radius_km": 3}))
+            cases["recommend_spots"].append(
+                "/api/v1/recommendations/spots/?" + urlencode({"type": rnd.choice(synthetic.TYPES), "lat": lat, "lon": lon, "radius_km": 5}))
+            cases["by_bbox"].append("/api/v1/data/by_bbox/?" + urlencode(box))
+            cases["by_bbox_columnar"].append("/api/v1/data/by_bbox/?" + urlencode({**box, "format": "columnar"}))
+        return cases
+
+    def _time(self, client: Client, urls: List[str]) -> Dict:
+        times: List[float] = []
+        size = 0
+        for url in urls:
+            # 응답 캐시는 비워서 매번 실제 계산 경로를 잰다
+            response_cache.clear()
+            t0 = time.perf_counter()
+            resp = client.get(url)
+            body = resp.content
+            times.append((time.perf_counter() - t0) * 1000)
+            if resp.status_code != 200:
+                raise CommandError(f"{url} → {resp.status_code}: {body[:200]!r}")
+            size += len(body)
+        times.sort()
+        return {
+            "n": len(times),
+            "p50_ms": round(statistics.median(times), 3),
+            "p95_ms": round(times[min(len(times) - 1, int(len(times) * 0.95))], 3),
+            "mean_ms": round(statistics.fmean(times), 3),
+            "avg_bytes": size // max(1, len(times)),
+        }
+
+    def _print(self, results: List[Dict]) -> None:
+        self.stdout.write("")
+        self.stdout.write(f"{'rows':>10}  {'name':<20}{'p50 ms':>10}{'p95 ms':>10}{'seconds':>10}")
+        for r in results:
+            p50 = f"{r['p50_ms']:.2f}" if "p50_ms" in r else ""
+            p95 = f"{r['p95_ms']:.2f}" if "p95_ms" in r else ""
+            sec = f"{r['seconds']:.2f}" if "seconds" in r else ""
+            self.stdout.write(f"{r['rows']:>10,}  {r['name']:<20}{p50:>10}{p95:>10}{sec:>10}")
+
+    def _compare(self, results: List[Dict], path: str, tolerance: float) -> None:
+        """같은 (행 수, 이름) 의 p50(없으면 seconds)을 기준 파일과 비교. 회귀가 있으면 CommandError."""
+        with open(path, encoding="utf-8") as f:
+            base = {(r["rows"], r["name"]): r for r in json.load(f)["results"]}
+
+        def metric(r: Dict) -> Optional[float]:
+            return r.get("p50_ms", r.get("seconds"))
+
+        regressions: List[Tuple[str, float, float]] = []
+        self.stdout.write(f"\n{'rows':>10}  {'name':<20}{'baseline':>10}{'now':>10}{'ratio':>8}")
+        for r in results:
+            b = base.get((r["rows"], r["name"]))
+            if b is None or not metric(b):
+                continue
+            ratio = metric(r) / metric(b)
+            self.stdout.write(f"{r['rows']:>10,}  {r['name']:<20}{metric(b):>10.2f}{metric(r):>10.2f}{ratio:>7.2f}x")
+            if ratio > tolerance:
+                regressions.append((f"{r['rows']}/{r['name']}", metric(b), metric(r)))
+        if regressions:
+            raise CommandError("성능 회귀: " + ", ".join(f"{k} {b:.2f}→{a:.2f}" for k, b, a in regressions))
@@ -0,0 +1,18 @@
+from __future__ import annotations
+import time
+from django.core.management.base import BaseCommand
+from api.services import clusters
+from api.services.dataset import current_epoch
+
+#python manage.py build_clusters     (import_data 가 끝에서 자동으로 부름. 단건 편집을 반영하려면 직접)
+
+class Command(BaseCommand):
+    help = "활성 Data 를 줌 레벨별 격자 클러스터로 집계해 현재 세대의 MapCluster 에 저장."
+
+    def handle(self, *args, **opts):
+        t0 = time.perf_counter()
+        epoch = current_epoch()
+        n = clusters.build(epoch)
+        self.stdout.write(self.style.SUCCESS(
+            f"Clusters: {n:,} cells for zoom {clusters.MIN_ZOOM}-{clusters.MAX_ZOOM - 1}, epoch {epoch} "
+            f"({time.perf_counter() - t0:.1f}s)"))
@@ -0,0 +1,18 @@
+from __future__ import annotations
+import time
+from django.core.management.base import BaseCommand, CommandParser
+from api.services.features import refresh_features
+
+#python manage.py build_features            (지표 없는 행만)
+#python manage.py build_features --rebuild  (전체 재계산)
+
+class Command(BaseCommand):
+    help = "Data 행별 지표(전환율, 방문자 추정, 층 보너스, 격자 셀, 업종 id)를 DataFeature 에 적재."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--rebuild", action="store_true", help="이미 있는 지표도 모두 다시 계산")
+
+    def handle(self, *args, **opts):
+        t0 = time.perf_counter()
+        n = refresh_features(missing_only=not opts["rebuild"])
+        self.stdout.write(self.style.SUCCESS(f"Features: {n} rows ({time.perf_counter() - t0:.1f}s)"))
@@ -0,0 +1,79 @@
+from __future__ import annotations
+import multiprocessing, os, time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connections, transaction
+from api.models import RecommendationTile
+from api.services import tiles
+from api.services.dataset import current_epoch
+
+#python manage.py build_tiles                (CPU 수만큼 프로세스)
+#python manage.py build_tiles --workers 1
+
+class Command(BaseCommand):
+    help = "서울 범위를 격자로 나눠 칸 x 반경 버킷별 업종 추천을 미리 계산해 RecommendationTile 에 저장."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="계산 프로세스 수 (기본 CPU 수)")
+
+    def handle(self, *args, **opts):
+        t0 = time.perf_counter()
+        epoch = current_epoch()
+        n = tiles.load_state()
+        rows, cols = tiles.grid_rows_cols()
+        radii = tiles.RADII
+        total = len(rows) * len(cols) * len(radii)
+        self.stdout.write(f"Data {n:,} rows loaded ({time.perf_counter() - t0:.1f}s); "
+                          f"{len(rows)} x {len(cols)} cells x {len(radii)} radii = {total:,} tiles")
+
+        # 워커는 fork 로 적재된 상태를 물려받는다. fork 가 없는 OS 면 단일 프로세스로
+        workers = opts["workers"] if "fork" in multiprocessing.get_all_start_methods() else 1
+        # 계산(워커 fork 포함)은 트랜잭션 밖에서 끝내고, 교체만 짧은 트랜잭션으로 한다
+        objs: List[RecommendationTile] = []
+        for batch in self._compute(rows, cols, radii, workers):
+            objs.extend(
+                RecommendationTile(epoch=epoch, grid_deg=tiles.GRID_DEG, row=r, col=c, radius_km=rad,
+                                   payload=p, effective_km=eff)
+                for r, c, rad, p, eff in batch
+            )
+            if len(objs) % 20000 < len(batch):
+                rate = len(objs) / max(1e-9, time.perf_counter() - t0)
+                self.stdout.write(f"  {len(objs):,}/{total:,} tiles ({rate:,.0f} tiles/s)")
+
+        with transaction.atomic():
+            # 이번 세대/격자를 새로 쓰고 이전 세대/격자 타일은 정리
+            RecommendationTile.objects.all().delete()
+            RecommendationTile.objects.bulk_create(objs, batch_size=2000)
+
+        if current_epoch() != epoch:
+            self.stdout.write(self.style.WARNING("계산 중 대량 적재가 있었습니다. 타일은 다시 만들 때까지 쓰이지 않습니다."))
+        self.stdout.write(self.style.SUCCESS(f"Tiles: {total:,} ({workers} workers, {time.perf_counter() - t0:.1f}s)"))
+
+    def _compute(self, rows, cols, radii, workers: int):
+        """격자 행 단위로 계산한 타일 묶음을 순서대로 내보낸다."""
+        if workers <= 1:
+            for r in rows:
+                yield tiles.build_row(r, cols, radii)
+            return
+        # 부모의 DB 연결을 자식과 공유하지 않도록 fork 전에 닫는다
+        connections.close_all()
+        todo = iter(rows)
+        window: deque = deque()
+        ctx = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            def submit() -> bool:
+                r = next(todo, None)
+                if r is None:
+                    return False
+                window.append(pool.submit(tiles.build_row, r, list(cols), radii))
+                return True
+
+            for _ in range(workers * 4):
+                if not submit():
+                    break
+            while window:
+                batch: List[tuple] = window.popleft().result()
+                submit()
+                yield batch
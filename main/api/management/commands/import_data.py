@@ -1,133 +1,202 @@
 from __future__ import annotations
-import csv, re
-from typing import Any, Dict, List, Optional
-from django.core.management.base import BaseCommand, CommandParser
+import csv, time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Set
+from django.core.management.base import BaseCommand, CommandError, CommandParser
 from django.db import transaction
+from django.db.models import Max
 from api.models import Data
-
-NUM_RE = re.compile(r"-?\d+")
+from api.services import clusters
+from api.services.dataset import bump_epoch, bump_version
+from api.services.features import refresh_features
+from api.signals import muted
+# 파싱 함수는 워커 프로세스에서도 쓰므로 Django 의존이 없는 모듈에 둔다
+from ._rows import ROW_FIELDS, code_digest, parse_range, parse_row, split_ranges
 
 #python manage.py import_data --path "C:\Users\rudwn\Desktop\hackaton\csv\상권정보.csv" --encoding utf-8-sig --fres
 
-def pick(d: Dict[str, Any], *keys: str) -> str:
-    for k in keys:
-        if k in d and str(d[k]).strip() != "":
-            return str(d[k]).strip()
-    return ""
-
-def to_int(s: str, default: int = 0) -> int:
-    if not s:
-        return default
-    s = s.replace(",", "").strip()
-    m = NUM_RE.search(s)
-    if not m:
-        return default
-    try:
-        return int(m.group())
-    except Exception:
-        return default
-
-def to_floor(s: str) -> Optional[int]:
-    if not s:
-        return None
-    n = to_int(s, default=0)
-    if n <= 0:
-        return None
-    return n
-
-def to_float(s: str) -> Optional[float]:
-    if not s:
-        return None
-    try:
-        return float(s.replace(",", "").strip())
-    except Exception:
-        return None
+# 한 트랜잭션에 넣는 행 수 (메모리 상한도 이 값으로 결정)
+DEFAULT_BATCH = 5000
+
+# 변경 여부 비교/갱신 대상 필드 (code 제외)
+VALUE_FIELDS = (
+    "business_code", "business_types", "address", "region_code", "region", "floor",
+    "latitude", "longitude", "monthly_rent", "deposit", "daily_footfall_avg",
+)
+CHUNK = 500
+# --workers 사용 시 워커 하나가 맡는 바이트 구간 크기 기본값 (MB)
+DEFAULT_CHUNK_MB = 8
 
 class Command(BaseCommand):
-    help = "상권 CSV를 Data 모델로 적재 (여분 컬럼은 무시)."
+    help = "상권 CSV를 Data 모델로 적재 (여분 컬럼은 무시). 파일 크기와 무관하게 배치 단위로 스트리밍 적재."
 
     def add_arguments(self, parser: CommandParser) -> None:
         parser.add_argument("--path", required=True, help="CSV 파일 경로 (예: 상권정보.csv)")
         parser.add_argument("--encoding", default="cp949", help="파일 인코딩 (기본 cp949)")
         parser.add_argument("--fresh", action="store_true", help="적재 전 Data 테이블 비우기")
+        parser.add_argument("--upsert", action="store_true", help="기존 상가업소번호는 값이 바뀐 경우만 갱신 (월별 갱신용)")
+        parser.add_argument("--tombstone", action="store_true", help="--upsert 와 함께: 파일에 없는 기존 행을 비활성(is_active=False) 처리")
         parser.add_argument("--delimiter", default=",", help="CSV 구분자 (기본 ,)")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH, help=f"배치당 행 수 (기본 {DEFAULT_BATCH})")
+        parser.add_argument("--workers", type=int, default=1, help="CSV 파싱 프로세스 수 (기본 1 = 단일 프로세스). DB 쓰기는 항상 한 곳에서")
+        parser.add_argument("--chunk-mb", type=int, default=DEFAULT_CHUNK_MB, help=f"--workers 사용 시 구간 크기 MB (기본 {DEFAULT_CHUNK_MB})")
 
     def handle(self, *args, **opts):
         path: str = opts["path"]
         encoding: str = opts["encoding"]
         delimiter: str = opts["delimiter"]
         fresh: bool = opts["fresh"]
+        self.upsert: bool = opts["upsert"]
+        tombstone: bool = opts["tombstone"]
+        batch_size: int = max(1, opts["batch_size"])
+        workers: int = max(1, opts["workers"])
+        chunk_bytes: int = max(1, opts["chunk_mb"]) << 20
+
+        if fresh and self.upsert:
+            raise CommandError("--fresh 와 --upsert 는 함께 쓸 수 없습니다.")
+        if tombstone and not self.upsert:
+            raise CommandError("--tombstone 은 --upsert 와 함께 써야 합니다.")
 
         # 필요하면 테이블 초기화
         if fresh:
-            Data.objects.all().delete()
-
+            with muted():
+                Data.objects.all().delete()
+            bump_version()
+
+        # 이번 적재에서 들어간 행(id > start_id)은 같은 code 가 다시 나오면 항상 덮어쓴다 (마지막 레코드 우선)
+        self.start_id = Data.objects.aggregate(m=Max("id"))["m"] or 0
+        self.t0 = time.perf_counter()
+        self.total = 0
+        self.counts = {"inserted": 0, "updated": 0, "unchanged": 0, "skipped": 0}
+        self.n_feat = 0
+
+        # --tombstone 일 때만 이번 파일의 code 해시를 모은다 (아니면 스트리밍 적재 메모리는 배치 크기만큼)
+        seen: Set[int] | None = set() if tombstone else None
+        pending: Dict[str, Dict[str, Any]] = {}
+
+        if workers > 1:
+            rows = self._parse_parallel(path, encoding, delimiter, workers, chunk_bytes)
+        else:
+            rows = self._parse(path, encoding, delimiter)
+        for row in rows:
+            if seen is not None:
+                seen.add(code_digest(row["code"]))
+            pending[row["code"]] = row
+
+            if len(pending) >= batch_size:
+                self._flush(pending)
+                pending = {}
+        self._flush(pending)
+
+        tombstoned = self._tombstone(seen) if tombstone else 0
+
+        # bulk_create/bulk_update 는 시그널을 안 보내므로 직접 버전을 올려 공간 인덱스 재구성 유도.
+        # 대량 적재라 세대도 올린다 (사전 계산 타일은 build_tiles 로 다시 만들 때까지 안 쓰임)
+        epoch = bump_epoch()
+        # 지도 클러스터는 새 세대로 바로 다시 집계한다
+        n_clusters = clusters.build(epoch)
+
+        c = self.counts
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported: {c['inserted']} new, {c['updated']} updated, {c['unchanged']} unchanged, "
+            f"{c['skipped']} skipped, {tombstoned} tombstoned, {n_clusters} clusters "
+            f"(features: {self.n_feat}, {self._rate():.0f} rows/s)"
+        ))
+
+    def _parse(self, path: str, encoding: str, delimiter: str) -> Iterator[Dict[str, Any]]:
         with open(path, "r", encoding=encoding, newline="") as f:
-            reader = csv.DictReader(f, delimiter=delimiter)
-            rows = list(reader)
-
-        # 중복 code(상가업소번호) 방지: 마지막 레코드 우선
-        uniq: Dict[str, Dict[str, Any]] = {}
-        for r in rows:
-            code = pick(r, "상가업소번호")
-            if not code:
+            for r in csv.DictReader(f, delimiter=delimiter):
+                row = parse_row(r)
+                if row is not None:
+                    yield row
+
+    def _parse_parallel(self, path: str, encoding: str, delimiter: str,
+                        workers: int, chunk_bytes: int) -> Iterator[Dict[str, Any]]:
+        """
+        파일을 줄 경계 기준 바이트 구간으로 나눠 워커 프로세스에서 파싱.
+        결과는 파일 순서대로 돌려주므로 '마지막 레코드 우선' 규칙이 단일 프로세스와 같다.
+        동시에 처리 중인 구간은 workers*2 개로 제한 (메모리 상한).
+        """
+        fieldnames, ranges = split_ranges(path, encoding, delimiter, chunk_bytes)
+        self.stdout.write(f"  parsing {len(ranges)} chunks with {workers} workers")
+        todo = iter(ranges)
+        window = deque()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            def submit() -> bool:
+                rng = next(todo, None)
+                if rng is None:
+                    return False
+                window.append(pool.submit(parse_range, path, encoding, delimiter, fieldnames, *rng))
+                return True
+
+            for _ in range(workers * 2):
+                if not submit():
+                    break
+            while window:
+                chunk = window.popleft().result()
+                submit()
+                for t in chunk:
+                    yield dict(zip(ROW_FIELDS, t))
+
+    def _rate(self) -> float:
+        return self.total / max(1e-9, time.perf_counter() - self.t0)
+
+    def _flush(self, pending: Dict[str, Dict[str, Any]]) -> None:
+        if not pending:
+            return
+        codes = list(pending)
+        existing: Dict[str, Data] = {}
+        for i in range(0, len(codes), CHUNK):
+            for obj in Data.objects.filter(code__in=codes[i:i + CHUNK]).only("id", "code", "is_active", *VALUE_FIELDS):
+                existing[obj.code] = obj
+
+        new: List[Data] = []
+        changed: List[Data] = []
+        for code, row in pending.items():
+            obj = existing.get(code)
+            if obj is None:
+                new.append(Data(**row))
                 continue
-            uniq[code] = r
-
-        objs: List[Data] = []
-        for r in uniq.values():
-            code = pick(r, "상가업소번호")
-
-            # 업종 코드/명: 소분류 우선
-            business_code = pick(
-                r,
-                "상권업종소분류코드",
-                "상권업종중분류코드",
-                "상권업종대분류코드",
-                "표준산업분류코드",
-            )
-            business_types = pick(
-                r,
-                "상권업종소분류명",
-                "상권업종중분류명",
-                "상권업종대분류명",
-                "표준산업분류명",
-            )
-
-            address = pick(r, "도로명주소", "지번주소")
-            region_code = pick(r, "법정동코드")   # 없으면 빈 문자열로 저장됨
-            region = pick(r, "법정동명")
-            floor = to_floor(pick(r, "층정보"))
-            lon = to_float(pick(r, "경도"))
-            lat = to_float(pick(r, "위도"))
-
-            # 금액/유동인구: 엑셀 값 그대로(단위 변환 없음)
-            deposit = to_int(pick(r, "예상보증금", "보증금(만원)"), default=0)
-            monthly_rent = to_int(pick(r, "예상월세", "월세(만원)"), default=0)
-            daily_footfall_avg = to_int(pick(r, "예상유동인구", "일평균 유동인구"), default=0)
-
-            # 필수: code, 위경도
-            if not code or lat is None or lon is None:
+            if not self.upsert and obj.id <= self.start_id:
+                # 기본 모드: 적재 전부터 있던 행은 건드리지 않음
+                self.counts["skipped"] += 1
                 continue
-
-            objs.append(
-                Data(
-                    code=code,
-                    business_code=business_code,
-                    business_types=business_types,
-                    address=address,
-                    region_code=region_code,
-                    region=region,
-                    floor=floor,
-                    latitude=lat,
-                    longitude=lon,
-                    monthly_rent=monthly_rent,
-                    deposit=deposit,
-                    daily_footfall_avg=daily_footfall_avg,
+            if obj.is_active and all(getattr(obj, k) == row[k] for k in VALUE_FIELDS):
+                self.counts["unchanged"] += 1
+                continue
+            for k in VALUE_FIELDS:
+                setattr(obj, k, row[k])
+            obj.is_active = True
+            changed.append(obj)
+
+        with transaction.atomic(), muted():
+            if new:
+                Data.objects.bulk_create(new, batch_size=2000)
+            if changed:
+                # bulk_update(CASE WHEN) 대신 INSERT ... ON CONFLICT(code) DO UPDATE 한 번
+                Data.objects.bulk_create(
+                    changed, batch_size=CHUNK,
+                    update_conflicts=True, unique_fields=["code"],
+                    update_fields=[*VALUE_FIELDS, "is_active"],
                 )
-            )
-
-        with transaction.atomic():
-            Data.objects.bulk_create(objs, batch_size=2000)
-
-        self.stdout.write(self.style.SUCCESS(f"Imported: {len(objs)} rows"))
+            # 새로/바뀐 행의 사전 계산 지표 갱신 (증분). pk 를 못 받는 DB 면 빈 행 전체 검색
+            ids = [o.pk for o in new if o.pk is not None]
+            if len(ids) < len(new):
+                self.n_feat += refresh_features(missing_only=True)
+            self.n_feat += refresh_features(ids + [o.pk for o in changed])
+
+        self.counts["inserted"] += len(new)
+        self.counts["updated"] += len(changed)
+        self.total += len(pending)
+        self.stdout.write(f"  {self.total:,} rows ({self._rate():,.0f} rows/s)")
+
+    def _tombstone(self, seen: Set[int]) -> int:
+        """이번 파일에 없는 활성 행을 비활성 처리 (삭제하지 않으므로 추천 이력 FK 유지)."""
+        stale: List[int] = []
+        for pk, code in Data.objects.filter(is_active=True).values_list("id", "code").iterator(chunk_size=10000):
+            if code_digest(code) not in seen:
+                stale.append(pk)
+        for i in range(0, len(stale), CHUNK):
+            Data.objects.filter(id__in=stale[i:i + CHUNK]).update(is_active=False)
+        return len(stale)
@@ -0,0 +1,44 @@
+from __future__ import annotations
+import threading, time
+from django.core.management.base import BaseCommand, CommandParser
+from api.services import jobs
+
+#python manage.py run_jobs                 (계속 돌며 대기 작업 처리. 웹 서버와 따로 띄운다)
+#python manage.py run_jobs --workers 4
+#python manage.py run_jobs --once          (지금 있는 작업만 처리하고 종료)
+
+class Command(BaseCommand):
+    help = "AnalysisJob 대기열의 분석 요청 추천 계산 작업을 처리하는 워커. 여러 프로세스/서버에서 함께 돌려도 된다."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--workers", type=int, default=1, help="워커 스레드 수 (기본 1)")
+        parser.add_argument("--poll", type=float, default=2.0, help="작업이 없을 때 다시 볼 간격(초, 기본 2)")
+        parser.add_argument("--once", action="store_true", help="대기 작업이 없으면 종료")
+
+    def handle(self, *args, **opts):
+        stop = threading.Event()
+        counts = [0] * max(1, opts["workers"])
+
+        def loop(i: int) -> None:
+            while not stop.is_set():
+                n = jobs.drain()
+                counts[i] += n
+                if not n:
+                    if opts["once"]:
+                        return
+                    stop.wait(opts["poll"])
+
+        t0 = time.perf_counter()
+        threads = [threading.Thread(target=loop, args=(i,), name=f"run-jobs-{i}", daemon=True) for i in range(len(counts))]
+        for t in threads:
+            t.start()
+        try:
+            for t in threads:
+                while t.is_alive():
+                    t.join(0.5)
+        except KeyboardInterrupt:
+            # 처리 중인 작업은 끝내고 멈춘다
+            stop.set()
+            for t in threads:
+                t.join()
+        self.stdout.write(self.style.SUCCESS(f"Jobs: {sum(counts)} processed ({time.perf_counter() - t0:.1f}s)"))
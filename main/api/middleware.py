@@ -0,0 +1,70 @@
+# api/middleware.py
+from __future__ import annotations
+
+import json
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from api.services import timing
+
+logger = logging.getLogger("api.timing")
+
+
+class ServerTimingMiddleware:
+    """요청별 단계 시간을 모아 Server-Timing 헤더, 구조화 로그(JSON 한 줄), 지표로 남긴다."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # ASGI 에서 비동기 뷰 앞에 있을 때 스레드로 넘기지 않도록 비동기로도 동작
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = timing.begin()
+        t0 = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            spans = timing.end(token)
+        return self._finish(request, response, spans, time.perf_counter() - t0)
+
+    async def __acall__(self, request):
+        token = timing.begin()
+        t0 = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            spans = timing.end(token)
+        return self._finish(request, response, spans, time.perf_counter() - t0)
+
+    def _finish(self, request, response, spans, total: float):
+        match = getattr(request, "resolver_match", None)
+        route = (match.url_name if match else None) or "other"
+        timing.observe_request(route, total)
+        response["Server-Timing"] = timing.server_timing(spans, total)
+        logger.info(json.dumps({
+            "event": "request",
+            "route": route,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "total_ms": round(total * 1000, 2),
+            "spans_ms": {k: round(v * 1000, 2) for k, v in spans.items()},
+        }, ensure_ascii=False))
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF Response 는 뷰가 끝난 뒤 render() 에서 JSON 으로 직렬화된다. 그 구간을 serialize 로 잰다
+        t0 = time.perf_counter()
+
+        def done(r):
+            timing.record("serialize", time.perf_counter() - t0)
+
+        response.add_post_render_callback(done)
+        return response
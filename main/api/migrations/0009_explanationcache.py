@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-16 20:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_datasetversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExplanationCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True, verbose_name='캐시 키')),
+                ('text', models.TextField(verbose_name='추천 사유')),
+                ('model', models.CharField(max_length=100, verbose_name='모델')),
+                ('prompt_version', models.PositiveSmallIntegerField(verbose_name='프롬프트 버전')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성 시각')),
+                ('expires_at', models.DateTimeField(verbose_name='만료 시각')),
+                ('last_used_at', models.DateTimeField(db_index=True, verbose_name='최근 사용 시각')),
+            ],
+            options={
+                'verbose_name': '추천 사유 캐시',
+                'verbose_name_plural': '추천 사유 캐시',
+            },
+        ),
+    ]
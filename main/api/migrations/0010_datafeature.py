@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-16 20:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_explanationcache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataFeature',
+            fields=[
+                ('data', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feature', serialize=False, to='api.data')),
+                ('visit_rate', models.FloatField(verbose_name='전환율')),
+                ('visit_estimate', models.FloatField(verbose_name='방문자 추정')),
+                ('floor_bonus', models.FloatField(verbose_name='층 보너스')),
+                ('cell_id', models.BigIntegerField(db_index=True, verbose_name='격자 셀')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='갱신 시각')),
+                ('business_type', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='data_features', to='api.businesstype')),
+            ],
+            options={
+                'verbose_name': '후보 입지 지표',
+                'verbose_name_plural': '후보 입지 지표',
+            },
+        ),
+    ]
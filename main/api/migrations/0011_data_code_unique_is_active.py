@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-16 20:59
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def dedupe_codes(apps, schema_editor):
+    """같은 상가업소번호가 여러 행이면 가장 최근(id 최대) 행만 남기고, 추천 이력은 남는 행으로 옮긴다."""
+    Data = apps.get_model("api", "Data")
+    SpotRecommendation = apps.get_model("api", "SpotRecommendation")
+    dups = (
+        Data.objects.values("code")
+        .annotate(n=Count("id"), keep=Max("id"))
+        .filter(n__gt=1)
+        .values_list("code", "keep")
+    )
+    for code, keep in list(dups):
+        stale = list(Data.objects.filter(code=code).exclude(id=keep).values_list("id", flat=True))
+        SpotRecommendation.objects.filter(spot_id__in=stale).update(spot_id=keep)
+        Data.objects.filter(id__in=stale).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_datafeature'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='data',
+            name='is_active',
+            field=models.BooleanField(default=True, verbose_name='활성'),
+        ),
+        migrations.RunPython(dedupe_codes, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='data',
+            name='code',
+            field=models.CharField(max_length=50, unique=True, verbose_name='상가업소번호'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-16 21:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_data_code_unique_is_active'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='data',
+            index=models.Index(fields=['latitude', 'longitude'], name='data_lat_lon_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='data',
+            index=models.Index(fields=['business_types', 'latitude', 'longitude'], name='data_type_lat_lon_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='spotrecommendation',
+            index=models.Index(fields=['analysis_request', '-score', '-id'], name='spotrec_req_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='typerecommendation',
+            index=models.Index(fields=['analysis_request', '-score', '-id'], name='typerec_req_score_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-16 21:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecommendationTile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(verbose_name='데이터 버전')),
+                ('grid_deg', models.FloatField(verbose_name='격자 크기(도)')),
+                ('row', models.IntegerField(verbose_name='격자 행')),
+                ('col', models.IntegerField(verbose_name='격자 열')),
+                ('radius_km', models.FloatField(verbose_name='반경(km)')),
+                ('payload', models.JSONField(verbose_name='추천 결과')),
+            ],
+            options={
+                'verbose_name': '추천 타일',
+                'verbose_name_plural': '추천 타일',
+                'constraints': [models.UniqueConstraint(fields=('version', 'grid_deg', 'radius_km', 'row', 'col'), name='tile_cell_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-16 22:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_recommendationtile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recommendationtile',
+            name='effective_km',
+            field=models.FloatField(blank=True, null=True, verbose_name='실제 반경(km)'),
+        ),
+    ]
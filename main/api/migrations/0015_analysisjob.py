@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-16 23:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_recommendationtile_effective_km'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalysisJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', '대기'), ('running', '처리 중'), ('done', '완료'), ('failed', '실패')], default='queued', max_length=10, verbose_name='상태')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='시도 횟수')),
+                ('available_at', models.DateTimeField(verbose_name='처리 가능 시각')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='잠금 시각')),
+                ('locked_by', models.CharField(blank=True, default='', max_length=100, verbose_name='워커')),
+                ('error', models.TextField(blank=True, default='', verbose_name='마지막 오류')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성 시각')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='완료 시각')),
+                ('analysis_request', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='job', to='api.analysisrequest')),
+            ],
+            options={
+                'verbose_name': '분석 작업',
+                'verbose_name_plural': '분석 작업 목록',
+                'indexes': [models.Index(fields=['status', 'available_at'], name='job_status_available_idx')],
+            },
+        ),
+    ]
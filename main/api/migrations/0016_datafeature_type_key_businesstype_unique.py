@@ -0,0 +1,68 @@
+# Generated by Django 5.2.5 on 2026-10-17 09:12
+
+import hashlib
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def _type_key(raw):
+    # features.type_key 와 같은 계산 (마이그레이션은 앱 코드에 의존하지 않도록 복사해 둔다)
+    name = (raw or "").strip() or "미분류"
+    return int.from_bytes(hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest(), "big") >> 1
+
+
+def fill_type_keys(apps, schema_editor):
+    DataFeature = apps.get_model("api", "DataFeature")
+    last = 0
+    while True:
+        rows = list(DataFeature.objects.filter(data_id__gt=last).order_by("data_id")
+                    .values_list("data_id", "data__business_types")[:5000])
+        if not rows:
+            break
+        DataFeature.objects.bulk_update(
+            [DataFeature(data_id=pk, type_key=_type_key(raw)) for pk, raw in rows], ["type_key"], batch_size=500)
+        last = rows[-1][0]
+
+
+def dedupe_business_types(apps, schema_editor):
+    """같은 이름의 업종이 여러 행이면 가장 작은 id 만 남기고, 참조는 남는 행으로 옮긴다."""
+    BusinessType = apps.get_model("api", "BusinessType")
+    dups = (
+        BusinessType.objects.values("name")
+        .annotate(n=Count("id"), keep=Min("id"))
+        .filter(n__gt=1)
+        .values_list("name", "keep")
+    )
+    for name, keep in list(dups):
+        stale = list(BusinessType.objects.filter(name=name).exclude(id=keep).values_list("id", flat=True))
+        for model in ("AnalysisRequest", "TypeRecommendation", "SpotRecommendation"):
+            apps.get_model("api", model).objects.filter(business_type_id__in=stale).update(business_type_id=keep)
+        BusinessType.objects.filter(id__in=stale).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_analysisjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datafeature',
+            name='type_key',
+            field=models.BigIntegerField(default=0, verbose_name='업종 키'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_type_keys, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='datafeature',
+            name='business_type',
+        ),
+        migrations.RunPython(dedupe_business_types, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='businesstype',
+            name='name',
+            field=models.CharField(max_length=100, unique=True, verbose_name='업종명'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.5 on 2026-10-17 09:40
+
+from django.db import migrations, models
+
+
+def drop_tiles(apps, schema_editor):
+    # 기존 타일은 데이터 버전 기준이라 세대와 맞지 않는다. build_tiles 로 다시 만든다
+    apps.get_model("api", "RecommendationTile").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_datafeature_type_key_businesstype_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datasetversion',
+            name='epoch',
+            field=models.PositiveBigIntegerField(default=0, verbose_name='데이터 세대'),
+        ),
+        migrations.RemoveConstraint(
+            model_name='recommendationtile',
+            name='tile_cell_unique',
+        ),
+        migrations.RunPython(drop_tiles, migrations.RunPython.noop),
+        migrations.RenameField(
+            model_name='recommendationtile',
+            old_name='version',
+            new_name='epoch',
+        ),
+        migrations.AlterField(
+            model_name='recommendationtile',
+            name='epoch',
+            field=models.PositiveBigIntegerField(verbose_name='데이터 세대'),
+        ),
+        migrations.AddConstraint(
+            model_name='recommendationtile',
+            constraint=models.UniqueConstraint(fields=('epoch', 'grid_deg', 'radius_km', 'row', 'col'), name='tile_cell_unique'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-17 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_dataset_epoch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MapCluster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('epoch', models.PositiveBigIntegerField(verbose_name='데이터 세대')),
+                ('zoom', models.PositiveSmallIntegerField(verbose_name='줌')),
+                ('row', models.IntegerField(verbose_name='격자 행')),
+                ('col', models.IntegerField(verbose_name='격자 열')),
+                ('count', models.PositiveIntegerField(verbose_name='개수')),
+                ('latitude', models.FloatField(verbose_name='중심 위도')),
+                ('longitude', models.FloatField(verbose_name='중심 경도')),
+                ('avg_rent', models.FloatField(verbose_name='평균 월세')),
+                ('avg_footfall', models.FloatField(verbose_name='평균 유동인구')),
+            ],
+            options={
+                'verbose_name': '지도 클러스터',
+                'verbose_name_plural': '지도 클러스터',
+                'constraints': [models.UniqueConstraint(fields=('epoch', 'zoom', 'row', 'col'), name='cluster_cell_unique')],
+            },
+        ),
+    ]
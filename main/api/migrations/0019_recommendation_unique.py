@@ -0,0 +1,48 @@
+# Generated by Django 5.2.5 on 2026-10-17 11:20
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Min
+
+
+def _dedupe(apps, model, favorite, fields):
+    """같은 조합이 여러 행이면 가장 작은 id 만 남긴다. 즐겨찾기는 남는 행으로 옮기고, 하나라도 저장됐으면 저장으로."""
+    Rec = apps.get_model("api", model)
+    Fav = apps.get_model("api", favorite)
+    dups = (
+        Rec.objects.values(*fields)
+        .annotate(n=Count("id"), keep=Min("id"), saved=Max("check_save"))
+        .filter(n__gt=1)
+    )
+    for row in list(dups):
+        keep = row.pop("keep")
+        saved = row.pop("saved")
+        row.pop("n")
+        stale = list(Rec.objects.filter(**row).exclude(id=keep).values_list("id", flat=True))
+        Fav.objects.filter(recommendation_id__in=stale).update(recommendation_id=keep)
+        if saved:
+            Rec.objects.filter(id=keep).update(check_save=True)
+        Rec.objects.filter(id__in=stale).delete()
+
+
+def dedupe_recommendations(apps, schema_editor):
+    _dedupe(apps, "TypeRecommendation", "FavoriteType", ["analysis_request_id", "business_type_id"])
+    _dedupe(apps, "SpotRecommendation", "FavoriteSpot", ["analysis_request_id", "spot_id", "business_type_id"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_mapcluster'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_recommendations, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='spotrecommendation',
+            constraint=models.UniqueConstraint(fields=('analysis_request', 'spot', 'business_type'), name='spotrec_req_spot_type_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='typerecommendation',
+            constraint=models.UniqueConstraint(fields=('analysis_request', 'business_type'), name='typerec_req_type_unique'),
+        ),
+    ]
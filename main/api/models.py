@@ -15,14 +15,14 @@ class User(models.Model):
 
 
 class BusinessType(models.Model):
-    name = models.CharField(_("업종명"), max_length=100)
+    name = models.CharField(_("업종명"), max_length=100, unique=True)
 
     def __str__(self):
         return self.name
 
 
 class Data(models.Model):
-    code = models.CharField(_("상가업소번호"), max_length=50)
+    code = models.CharField(_("상가업소번호"), max_length=50, unique=True)
     business_code = models.CharField(_("분류코드"), max_length=100)
     business_types = models.CharField(_("분류명"), max_length=100)
     address = models.CharField(_("주소"), max_length=255)
@@ -34,9 +34,16 @@ class Data(models.Model):
     monthly_rent = models.PositiveIntegerField(_("월세(만원)"))
     deposit = models.PositiveIntegerField(_("보증금(만원)"), default=0)
     daily_footfall_avg = models.PositiveIntegerField(_("일평균 유동인구"), default=0)
+    # 최신 CSV 에서 빠진 행은 지우지 않고(추천 이력 FK 보존) 비활성으로만 표시
+    is_active = models.BooleanField(_("활성"), default=True)
 
     class Meta:
         ordering = ['id']
+        indexes = [
+            # 반경/사각형 조회, 업종 + 반경 조회
+            models.Index(fields=["latitude", "longitude"], name="data_lat_lon_idx"),
+            models.Index(fields=["business_types", "latitude", "longitude"], name="data_type_lat_lon_idx"),
+        ]
         verbose_name = _("후보 입지")
         verbose_name_plural = _("후보 입지 목록")
 
@@ -44,6 +51,106 @@ class Data(models.Model):
         return f"{self.business_types} - {self.address} ({self.floor}층)"
 
 
+class DataFeature(models.Model):
+    """Data 행별 사전 계산 지표. build_features 명령/저장 시그널로 갱신."""
+    data = models.OneToOneField(Data, on_delete=models.CASCADE, primary_key=True, related_name="feature")
+    # 업종명 해시 (features.type_key). BusinessType 행을 만들지 않고 추천 엔진 안에서만 쓰는 업종 id
+    type_key = models.BigIntegerField(_("업종 키"))
+    visit_rate = models.FloatField(_("전환율"))
+    visit_estimate = models.FloatField(_("방문자 추정"))
+    floor_bonus = models.FloatField(_("층 보너스"))
+    cell_id = models.BigIntegerField(_("격자 셀"), db_index=True)
+    updated_at = models.DateTimeField(_("갱신 시각"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("후보 입지 지표")
+        verbose_name_plural = _("후보 입지 지표")
+
+    def __str__(self):
+        return f"Feature {self.data_id}"
+
+
+class DatasetVersion(models.Model):
+    """Data 테이블 변경 시마다 증가하는 단일 행 버전 (프로세스 간 캐시/인덱스 무효화용)."""
+    version = models.PositiveBigIntegerField(_("데이터 버전"), default=0)
+    # 대량 적재(import_data) 때만 오르는 더 굵은 번호. 사전 계산 타일은 이 값으로 유효성을 본다
+    epoch = models.PositiveBigIntegerField(_("데이터 세대"), default=0)
+    updated_at = models.DateTimeField(_("갱신 시각"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("데이터 버전")
+        verbose_name_plural = _("데이터 버전")
+
+    def __str__(self):
+        return f"Data v{self.version}"
+
+
+class ExplanationCache(models.Model):
+    """LLM 추천 사유 영구 캐시. key = sha256(정규화 지표 + 모델 + 프롬프트 버전)."""
+    key = models.CharField(_("캐시 키"), max_length=64, unique=True)
+    text = models.TextField(_("추천 사유"))
+    model = models.CharField(_("모델"), max_length=100)
+    prompt_version = models.PositiveSmallIntegerField(_("프롬프트 버전"))
+    created_at = models.DateTimeField(_("생성 시각"), auto_now_add=True)
+    expires_at = models.DateTimeField(_("만료 시각"))
+    last_used_at = models.DateTimeField(_("최근 사용 시각"), db_index=True)
+
+    class Meta:
+        verbose_name = _("추천 사유 캐시")
+        verbose_name_plural = _("추천 사유 캐시")
+
+    def __str__(self):
+        return f"{self.key[:12]} ({self.model})"
+
+
+class RecommendationTile(models.Model):
+    """격자 칸 x 반경별 업종 추천 사전 계산 결과 (build_tiles 명령으로 생성)."""
+    # 단건 수정(version)으로는 무효화하지 않고, 대량 적재로 세대가 바뀌면 다시 만든다
+    epoch = models.PositiveBigIntegerField(_("데이터 세대"))
+    grid_deg = models.FloatField(_("격자 크기(도)"))
+    row = models.IntegerField(_("격자 행"))
+    col = models.IntegerField(_("격자 열"))
+    radius_km = models.FloatField(_("반경(km)"))
+    # 후보가 모자라 최근접 탐색으로 넓힌 실제 반경
+    effective_km = models.FloatField(_("실제 반경(km)"), null=True, blank=True)
+    # [[업종명, 점수("x.xx"), 후보 수, 대표 Data id, 거리 km, 전환율], ...]
+    payload = models.JSONField(_("추천 결과"))
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["epoch", "grid_deg", "radius_km", "row", "col"], name="tile_cell_unique"),
+        ]
+        verbose_name = _("추천 타일")
+        verbose_name_plural = _("추천 타일")
+
+    def __str__(self):
+        return f"Tile e{self.epoch} ({self.row}, {self.col}) r={self.radius_km}"
+
+
+class MapCluster(models.Model):
+    """줌 레벨 x 격자 칸별 마커 클러스터 사전 집계 (build_clusters 명령 / import_data 끝에 생성)."""
+    epoch = models.PositiveBigIntegerField(_("데이터 세대"))
+    zoom = models.PositiveSmallIntegerField(_("줌"))
+    row = models.IntegerField(_("격자 행"))
+    col = models.IntegerField(_("격자 열"))
+    count = models.PositiveIntegerField(_("개수"))
+    # 칸 중앙이 아닌 실제 점들의 평균 위치
+    latitude = models.FloatField(_("중심 위도"))
+    longitude = models.FloatField(_("중심 경도"))
+    avg_rent = models.FloatField(_("평균 월세"))
+    avg_footfall = models.FloatField(_("평균 유동인구"))
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["epoch", "zoom", "row", "col"], name="cluster_cell_unique"),
+        ]
+        verbose_name = _("지도 클러스터")
+        verbose_name_plural = _("지도 클러스터")
+
+    def __str__(self):
+        return f"Cluster e{self.epoch} z{self.zoom} ({self.row}, {self.col}) n={self.count}"
+
+
 class AnalysisRequest(models.Model):
     PLAN_CHOICES = [("A", "Plan A"), ("B", "Plan B")]
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="analysis_requests")
@@ -63,6 +170,32 @@ class AnalysisRequest(models.Model):
         return f"분석요청 {self.id} ({self.get_plan_display()})"
 
 
+class AnalysisJob(models.Model):
+    """분석 요청 하나의 추천 계산 작업. DB 테이블이 곧 작업 큐 (api.services.jobs / run_jobs 명령이 처리)."""
+    QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+    STATUS_CHOICES = [(QUEUED, "대기"), (RUNNING, "처리 중"), (DONE, "완료"), (FAILED, "실패")]
+    analysis_request = models.OneToOneField(AnalysisRequest, on_delete=models.CASCADE, related_name="job")
+    status = models.CharField(_("상태"), max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(_("시도 횟수"), default=0)
+    # 이 시각 이후에 가져갈 수 있음 (재시도 대기)
+    available_at = models.DateTimeField(_("처리 가능 시각"))
+    # 처리 중 표시. 너무 오래되면 워커가 죽은 것으로 보고 다시 가져간다
+    locked_at = models.DateTimeField(_("잠금 시각"), null=True, blank=True)
+    locked_by = models.CharField(_("워커"), max_length=100, blank=True, default="")
+    error = models.TextField(_("마지막 오류"), blank=True, default="")
+    created_at = models.DateTimeField(_("생성 시각"), auto_now_add=True)
+    finished_at = models.DateTimeField(_("완료 시각"), null=True, blank=True)
+
+    class Meta:
+        # 워커 조회: status 로 거른 뒤 available_at 순
+        indexes = [models.Index(fields=["status", "available_at"], name="job_status_available_idx")]
+        verbose_name = _("분석 작업")
+        verbose_name_plural = _("분석 작업 목록")
+
+    def __str__(self):
+        return f"Job {self.analysis_request_id} ({self.status})"
+
+
 class TypeRecommendation(models.Model):
     analysis_request = models.ForeignKey(AnalysisRequest, on_delete=models.CASCADE, related_name="type_recommendations")
     business_type = models.ForeignKey(BusinessType, on_delete=models.CASCADE, related_name="type_recommendations")
@@ -73,6 +206,10 @@ class TypeRecommendation(models.Model):
 
     class Meta:
         ordering = ["-score"]
+        # by_request: analysis_request 로 거른 뒤 -score, -id 순 상위 N 개
+        indexes = [models.Index(fields=["analysis_request", "-score", "-id"], name="typerec_req_score_idx")]
+        # 요청 하나에 업종별 한 행 (services.persistence 가 이 제약으로 upsert)
+        constraints = [models.UniqueConstraint(fields=["analysis_request", "business_type"], name="typerec_req_type_unique")]
         verbose_name = _("업종 추천 결과")
         verbose_name_plural = _("업종 추천 결과 목록")
 
@@ -91,6 +228,10 @@ class SpotRecommendation(models.Model):
 
     class Meta:
         ordering = ["-score"]
+        # by_request: analysis_request 로 거른 뒤 -score, -id 순 상위 N 개
+        indexes = [models.Index(fields=["analysis_request", "-score", "-id"], name="spotrec_req_score_idx")]
+        # 요청 하나에 (위치, 업종)별 한 행. business_type 이 NULL 인 행끼리는 제약이 걸리지 않는다 (작업 결과는 항상 업종이 있음)
+        constraints = [models.UniqueConstraint(fields=["analysis_request", "spot", "business_type"], name="spotrec_req_spot_type_unique")]
         verbose_name = _("위치 추천 결과")
         verbose_name_plural = _("위치 추천 결과 목록")
 
@@ -0,0 +1,63 @@
+# api/pagination.py
+from __future__ import annotations
+
+import bisect
+from typing import List, Optional, Sequence
+
+from django.conf import settings
+from rest_framework.pagination import Cursor, CursorPagination
+from rest_framework.response import Response
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    id 기준 커서 페이지네이션. OFFSET 없이 WHERE id > 마지막 id 로 다음 페이지를 읽는다.
+    DB 쿼리셋(list)과 격자 인덱스가 준 id 목록(by_bbox, paginate_ids) 모두 같은 ?cursor=, ?page_size= 를 쓴다.
+    """
+    ordering = "id"
+    page_size = settings.DATA_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = settings.DATA_MAX_PAGE_SIZE
+
+    def paginate_ids(self, ids: Sequence[int], request, max_page_size: Optional[int] = None) -> List[int]:
+        """
+        id 오름차순 목록의 한 페이지 (DB 조회 없음). 커서 위치 = 앞 페이지 마지막 id,
+        이전 페이지 커서(reverse)면 = 뒤 페이지 첫 id (그 앞의 id 들을 읽는다).
+        max_page_size 로 이 요청의 상한만 바꿀 수 있다 (마커 응답).
+        """
+        if max_page_size is not None:
+            self.max_page_size = max_page_size
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        try:
+            position = int(cursor.position) if cursor is not None and cursor.position is not None else None
+        except ValueError:
+            position = None
+        if position is not None and cursor.reverse:
+            end = bisect.bisect_left(ids, position)
+            start = max(0, end - self.page_size)
+        else:
+            start = bisect.bisect_right(ids, position) if position is not None else 0
+            end = start + self.page_size
+        page = list(ids[start:end])
+        self._ids_next = page[-1] if page and end < len(ids) else None
+        self._ids_previous = page[0] if page and start > 0 else None
+        return page
+
+    def ids_next_link(self) -> Optional[str]:
+        """paginate_ids 다음 페이지 URL (없으면 None)."""
+        if self._ids_next is None:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=str(self._ids_next)))
+
+    def ids_previous_link(self) -> Optional[str]:
+        """paginate_ids 이전 페이지 URL (없으면 None)."""
+        if self._ids_previous is None:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=str(self._ids_previous)))
+
+    def get_ids_response(self, results: list) -> Response:
+        """paginate_ids 한 페이지를 list 응답과 같은 모양으로."""
+        return Response({"next": self.ids_next_link(), "previous": self.ids_previous_link(), "results": results})
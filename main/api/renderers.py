@@ -0,0 +1,48 @@
+# api/renderers.py
+from __future__ import annotations
+
+import struct
+
+import numpy as np
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+# 지도 마커 열 순서와 바이너리 자료형 (리틀 엔디언, 4바이트 정렬이라 JS TypedArray 로 바로 읽힘). floor 가 없으면 -1
+MARKER_COLUMNS = (
+    ("id", "<i4"),
+    ("lat", "<f4"),
+    ("lon", "<f4"),
+    ("floor", "<i4"),
+    ("rent", "<i4"),
+    ("footfall", "<i4"),
+)
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    """?format=columnar : 행 목록 대신 열마다 배열 하나 (struct-of-arrays)."""
+    format = "columnar"
+
+
+class MarkerBinaryRenderer(BaseRenderer):
+    """
+    ?format=bin : 마커 열을 고정 자료형 배열로 이어 붙인 바이너리.
+    [uint32 개수 n][id int32 x n][lat float32 x n][lon float32 x n][floor int32 x n][rent int32 x n][footfall int32 x n]
+    다음/이전 페이지 URL 은 X-Next/X-Previous 헤더로. 오류 응답(dict 에 detail)은 JSON 그대로.
+    """
+    media_type = "application/octet-stream"
+    format = "bin"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if "detail" in data:
+            response = (renderer_context or {}).get("response")
+            if response is not None:
+                response["Content-Type"] = "application/json"
+            return JSONRenderer().render(data)
+        n = len(data["id"])
+        parts = [struct.pack("<I", n)]
+        for name, dtype in MARKER_COLUMNS:
+            parts.append(np.asarray(data[name], dtype=dtype).tobytes())
+        return b"".join(parts)
@@ -1,6 +1,5 @@
 # api/serializers.py
 from __future__ import annotations
-from django.db import transaction
 from rest_framework import serializers
 from .models import (
     User, BusinessType, Data, AnalysisRequest,
@@ -19,23 +18,28 @@ class BusinessTypeSerializer(serializers.ModelSerializer):
         model = BusinessType
         fields = ["id", "name", "parent"]
 
+# 목록/지도 조회는 serializer 없이 .values() 로 바로 이 필드 dict 를 만든다 (DataSerializer 와 같은 모양)
+DATA_FIELDS = (
+    "id", "code", "business_code", "business_types",
+    "address", "region_code", "region", "floor",
+    "latitude", "longitude", "monthly_rent", "deposit", "daily_footfall_avg", "is_active",
+)
+
 class DataSerializer(serializers.ModelSerializer):
     class Meta:
         model = Data
-        fields = [
-            "id", "code", "business_code", "business_types",
-            "address", "region_code", "region", "floor",
-            "latitude", "longitude", "monthly_rent", "deposit", "daily_footfall_avg",
-        ]
+        fields = list(DATA_FIELDS)
         read_only_fields = ["id"]
 
 class AnalysisRequestSerializer(serializers.ModelSerializer):
     user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
     business_type = serializers.PrimaryKeyRelatedField(queryset=BusinessType.objects.all(), allow_null=True, required=False)
+    # 추천 계산 작업 상태 (queued/running/done/failed, 작업이 없으면 null)
+    status = serializers.CharField(source="job.status", read_only=True, default=None)
 
     class Meta:
         model = AnalysisRequest
-        fields = ["id", "user", "business_type", "plan", "latitude", "longitude", "address", "created_at", ]
+        fields = ["id", "user", "business_type", "plan", "latitude", "longitude", "address", "created_at", "status", ]
         read_only_fields = ["id", "created_at"]
 
 class TypeRecommendationSerializer(serializers.ModelSerializer):
@@ -0,0 +1,162 @@
+# api/services/clusters.py
+# 지도 클러스터. 줌 레벨별 격자 집계는 build_clusters 명령(import_data 끝에서도)이 MapCluster 에 미리 저장하고,
+# 요청은 현재 세대(epoch)의 화면 안 칸만 읽는다. 단건 편집은 다음 빌드 때 반영된다 (타일과 같은 기준).
+from __future__ import annotations
+
+import logging
+import math
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from api.models import Data, MapCluster
+from api.services.dataset import current_epoch, current_version
+
+logger = logging.getLogger(__name__)
+
+# 이 줌보다 작으면(더 멀리서 보면) by_bbox 가 점 대신 클러스터를 돌려준다
+MIN_ZOOM = settings.CLUSTER_MIN_ZOOM
+MAX_ZOOM = settings.CLUSTER_MAX_ZOOM
+# 256px 지도 타일 한 장을 이 수만큼 나눈 격자로 묶는다 (4 면 약 64px 칸)
+CELLS_PER_TILE = 4
+
+
+def cell_deg(zoom: int) -> float:
+    """줌 레벨의 클러스터 격자 한 칸 크기(도)."""
+    return 360.0 / (2 ** zoom) / CELLS_PER_TILE
+
+
+class ZoomClusters:
+    """한 줌 레벨의 격자 칸별 집계. 칸 (행, 열) 순으로 정렬된 열 배열."""
+
+    __slots__ = ("deg", "row", "col", "count", "lat", "lon", "avg_rent", "avg_footfall")
+
+    def __init__(self, zoom: int, lat: np.ndarray, lon: np.ndarray, rent: np.ndarray, foot: np.ndarray):
+        self.deg = cell_deg(zoom)
+        rows = np.floor(lat / self.deg).astype(np.int64)
+        cols = np.floor(lon / self.deg).astype(np.int64)
+        if rows.size:
+            keys, inv = np.unique(np.stack([rows, cols], axis=1), axis=0, return_inverse=True)
+            inv = inv.reshape(-1)
+        else:
+            keys, inv = np.empty((0, 2), dtype=np.int64), np.empty(0, dtype=np.int64)
+        count = np.bincount(inv, minlength=len(keys)).astype(np.int64)
+        n = np.maximum(count, 1)
+        self.row, self.col = keys[:, 0], keys[:, 1]
+        self.count = count
+        # 중심은 칸 중앙이 아닌 실제 점들의 평균 위치
+        self.lat = np.bincount(inv, weights=lat, minlength=len(keys)) / n
+        self.lon = np.bincount(inv, weights=lon, minlength=len(keys)) / n
+        self.avg_rent = np.bincount(inv, weights=rent, minlength=len(keys)) / n
+        self.avg_footfall = np.bincount(inv, weights=foot, minlength=len(keys)) / n
+
+    def bbox(self, min_lat: float, max_lat: float, min_lon: float, max_lon: float) -> List[dict]:
+        """사각형과 겹치는 칸의 클러스터 목록."""
+        r0, r1 = math.floor(min_lat / self.deg), math.floor(max_lat / self.deg)
+        c0, c1 = math.floor(min_lon / self.deg), math.floor(max_lon / self.deg)
+        mask = (self.row >= r0) & (self.row <= r1) & (self.col >= c0) & (self.col <= c1)
+        return [
+            {
+                "lat": round(float(la), 6),
+                "lon": round(float(lo), 6),
+                "count": int(cnt),
+                "avg_rent": round(float(rent), 1),
+                "avg_footfall": round(float(foot), 1),
+            }
+            for la, lo, cnt, rent, foot in zip(self.lat[mask], self.lon[mask], self.count[mask],
+                                                self.avg_rent[mask], self.avg_footfall[mask])
+        ]
+
+
+class ClusterSet:
+    """활성 Data 전체에 대한 줌 레벨별 사전 집계."""
+
+    def __init__(self, version: int = 0):
+        self.version = version
+        self.zooms: Dict[int, ZoomClusters] = {}
+
+    def build(self) -> "ClusterSet":
+        rows = (Data.objects.filter(is_active=True)
+                .values_list("latitude", "longitude", "monthly_rent", "daily_footfall_avg"))
+        arr = np.array(list(rows.iterator(chunk_size=10000)), dtype=np.float64).reshape(-1, 4)
+        arr = arr[~np.isnan(arr[:, 0]) & ~np.isnan(arr[:, 1])]
+        for z in range(MIN_ZOOM, MAX_ZOOM):
+            self.zooms[z] = ZoomClusters(z, arr[:, 0], arr[:, 1], arr[:, 2], arr[:, 3])
+        return self
+
+    def bbox(self, zoom: int, min_lat: float, max_lat: float, min_lon: float, max_lon: float) -> List[dict]:
+        return self.zooms[clamp_zoom(zoom)].bbox(min_lat, max_lat, min_lon, max_lon)
+
+    def save(self, epoch: int) -> int:
+        """이 집계를 세대 epoch 의 MapCluster 로 저장한다 (다른 세대 행은 지움). 저장한 칸 수를 돌려준다."""
+        objs = [
+            MapCluster(epoch=epoch, zoom=z, row=int(r), col=int(c), count=int(n), latitude=float(la),
+                       longitude=float(lo), avg_rent=float(rent), avg_footfall=float(foot))
+            for z, zc in self.zooms.items()
+            for r, c, n, la, lo, rent, foot in zip(zc.row, zc.col, zc.count, zc.lat, zc.lon,
+                                                   zc.avg_rent, zc.avg_footfall)
+        ]
+        with transaction.atomic():
+            MapCluster.objects.all().delete()
+            MapCluster.objects.bulk_create(objs, batch_size=2000)
+        return len(objs)
+
+
+def clamp_zoom(zoom: int) -> int:
+    return max(MIN_ZOOM, min(MAX_ZOOM - 1, zoom))
+
+
+def clusters_wanted(zoom: Optional[int]) -> bool:
+    return zoom is not None and zoom < MAX_ZOOM
+
+
+def build(epoch: Optional[int] = None) -> int:
+    """활성 Data 전체를 줌별로 집계해 MapCluster 에 저장 (build_clusters / import_data)."""
+    return ClusterSet(current_version()).build().save(current_epoch() if epoch is None else epoch)
+
+
+def bbox(zoom: int, min_lat: float, max_lat: float, min_lon: float, max_lon: float) -> List[dict]:
+    """
+    화면 안 클러스터. 현재 세대의 사전 집계(MapCluster)에서 칸 범위로 읽는다.
+    아직 이 세대를 빌드하지 않았으면 메모리에서 집계한다 (경고를 남김).
+    """
+    zoom = clamp_zoom(zoom)
+    deg = cell_deg(zoom)
+    epoch = current_epoch()
+    rows = list(
+        MapCluster.objects.filter(
+            epoch=epoch, zoom=zoom,
+            row__gte=math.floor(min_lat / deg), row__lte=math.floor(max_lat / deg),
+            col__gte=math.floor(min_lon / deg), col__lte=math.floor(max_lon / deg),
+        ).order_by("row", "col").values_list("latitude", "longitude", "count", "avg_rent", "avg_footfall")
+    )
+    if not rows and not MapCluster.objects.filter(epoch=epoch).exists():
+        logger.warning("no prebuilt clusters for epoch %s; run `manage.py build_clusters`", epoch)
+        return get_clusters().bbox(zoom, min_lat, max_lat, min_lon, max_lon)
+    return [
+        {"lat": round(la, 6), "lon": round(lo, 6), "count": cnt,
+         "avg_rent": round(rent, 1), "avg_footfall": round(foot, 1)}
+        for la, lo, cnt, rent, foot in rows
+    ]
+
+
+_lock = threading.Lock()
+_clusters: Optional[ClusterSet] = None
+
+
+def get_clusters() -> ClusterSet:
+    """메모리 집계 (사전 집계가 없을 때만 쓰임). Data 가 바뀌었으면 다시 만든다."""
+    global _clusters
+    version = current_version()
+    cs = _clusters
+    if cs is not None and cs.version == version:
+        return cs
+    with _lock:
+        cs = _clusters
+        if cs is None or cs.version != version:
+            cs = ClusterSet(version).build()
+            _clusters = cs
+    return cs
@@ -0,0 +1,35 @@
+# api/services/dataset.py
+from __future__ import annotations
+
+from django.db.models import F
+
+from api.models import DatasetVersion
+
+# DatasetVersion 은 pk=1 단일 행만 사용한다.
+_PK = 1
+
+
+def current_version() -> int:
+    v = DatasetVersion.objects.filter(pk=_PK).values_list("version", flat=True).first()
+    return int(v or 0)
+
+
+def bump_version() -> int:
+    """Data 가 바뀌었음을 기록하고 새 버전을 돌려준다."""
+    updated = DatasetVersion.objects.filter(pk=_PK).update(version=F("version") + 1)
+    if not updated:
+        DatasetVersion.objects.get_or_create(pk=_PK, defaults={"version": 1})
+    return current_version()
+
+
+def current_epoch() -> int:
+    v = DatasetVersion.objects.filter(pk=_PK).values_list("epoch", flat=True).first()
+    return int(v or 0)
+
+
+def bump_epoch() -> int:
+    """대량 적재가 끝났음을 기록한다 (버전도 함께 올림). 새 세대를 돌려준다."""
+    updated = DatasetVersion.objects.filter(pk=_PK).update(version=F("version") + 1, epoch=F("epoch") + 1)
+    if not updated:
+        DatasetVersion.objects.get_or_create(pk=_PK, defaults={"version": 1, "epoch": 1})
+    return current_epoch()
@@ -0,0 +1,137 @@
+# api/services/explain_cache.py
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from datetime import timedelta
+from typing import Any, Dict, Iterable
+
+from django.conf import settings
+from django.utils import timezone
+
+from api.models import ExplanationCache
+from api.services.lru import LRUCache
+
+# SQLite 바인딩 변수 제한 대비
+KEY_CHUNK = 500
+# 영구 캐시 정리는 저장 N 건마다 한 번
+EVICT_EVERY = 200
+
+TTL = settings.EXPLAIN_CACHE_TTL
+MAX_ROWS = settings.EXPLAIN_CACHE_MAX_ROWS
+
+_lru = LRUCache(maxsize=settings.EXPLAIN_CACHE_LRU_SIZE, ttl=TTL)
+_lock = threading.Lock()
+_counters = {"db_hits": 0, "misses": 0, "stores": 0, "evicted": 0}
+_since_evict = 0
+
+
+def _normalize(v: Any) -> Any:
+    # 소수는 3자리(거리 기준 1m)까지만 키에 반영해 거의 같은 요청끼리 캐시를 공유
+    if isinstance(v, float):
+        return round(v, 3)
+    if isinstance(v, dict):
+        return {str(k): _normalize(x) for k, x in v.items()}
+    if isinstance(v, (list, tuple)):
+        return [_normalize(x) for x in v]
+    if isinstance(v, str):
+        return v.strip()
+    return v
+
+
+def make_key(features: dict, model: str, prompt_version: int) -> str:
+    payload = json.dumps(
+        {"f": _normalize(features), "m": model, "v": prompt_version},
+        ensure_ascii=False, sort_keys=True, separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _bump(name: str, n: int = 1) -> None:
+    with _lock:
+        _counters[name] += n
+
+
+def get_many(keys: Iterable[str]) -> Dict[str, str]:
+    """LRU → DB 순으로 찾는다. 만료된 항목은 없는 것으로 본다."""
+    keys = list(dict.fromkeys(keys))
+    found: Dict[str, str] = _lru.get_many(keys)
+    rest = [k for k in keys if k not in found]
+    if not rest:
+        return found
+
+    now = timezone.now()
+    db: Dict[str, str] = {}
+    for i in range(0, len(rest), KEY_CHUNK):
+        chunk = rest[i:i + KEY_CHUNK]
+        db.update(ExplanationCache.objects.filter(key__in=chunk, expires_at__gt=now).values_list("key", "text"))
+    if db:
+        hit_keys = list(db)
+        for i in range(0, len(hit_keys), KEY_CHUNK):
+            ExplanationCache.objects.filter(key__in=hit_keys[i:i + KEY_CHUNK]).update(last_used_at=now)
+        for k, t in db.items():
+            _lru.set(k, t)
+    _bump("db_hits", len(db))
+    _bump("misses", len(rest) - len(db))
+    found.update(db)
+    return found
+
+
+def set_many(items: Dict[str, str], model: str, prompt_version: int) -> None:
+    global _since_evict
+    if not items:
+        return
+    now = timezone.now()
+    expires = now + timedelta(seconds=TTL)
+    objs = [
+        ExplanationCache(key=k, text=t, model=model, prompt_version=prompt_version,
+                         expires_at=expires, last_used_at=now)
+        for k, t in items.items()
+    ]
+    ExplanationCache.objects.bulk_create(
+        objs, batch_size=KEY_CHUNK,
+        update_conflicts=True, unique_fields=["key"],
+        update_fields=["text", "expires_at", "last_used_at"],
+    )
+    for k, t in items.items():
+        _lru.set(k, t)
+    _bump("stores", len(items))
+
+    with _lock:
+        _since_evict += len(items)
+        due = _since_evict >= EVICT_EVERY
+        if due:
+            _since_evict = 0
+    if due:
+        evict()
+
+
+def evict() -> int:
+    """만료 항목 삭제 후, MAX_ROWS 를 넘으면 가장 오래 안 쓴 항목부터 삭제."""
+    deleted, _ = ExplanationCache.objects.filter(expires_at__lte=timezone.now()).delete()
+    over = ExplanationCache.objects.count() - MAX_ROWS
+    if over > 0:
+        ids = list(ExplanationCache.objects.order_by("last_used_at").values_list("id", flat=True)[:over])
+        for i in range(0, len(ids), KEY_CHUNK):
+            n, _ = ExplanationCache.objects.filter(id__in=ids[i:i + KEY_CHUNK]).delete()
+            deleted += n
+    _bump("evicted", deleted)
+    return deleted
+
+
+def clear_local() -> None:
+    _lru.clear()
+
+
+def stats() -> Dict[str, Any]:
+    with _lock:
+        counters = dict(_counters)
+    lru = _lru.stats()
+    total = lru["hits"] + counters["db_hits"] + counters["misses"]
+    return {
+        "lru": lru,
+        **counters,
+        "hit_ratio": round((lru["hits"] + counters["db_hits"]) / total, 4) if total else 0.0,
+        "rows": ExplanationCache.objects.count(),
+    }
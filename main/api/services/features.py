@@ -0,0 +1,103 @@
+# api/services/features.py
+from __future__ import annotations
+
+import hashlib
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from api.models import Data, DataFeature
+from api.services.scoring import floor_bonus, get_visit_rate
+from api.services.spatial import ID_CHUNK, cell_id
+
+logger = logging.getLogger(__name__)
+
+BATCH = 5000
+
+# (type_key, visit_rate, visit_estimate, floor_bonus, cell_id)
+FeatureRow = Tuple[int, float, float, float, int]
+
+_DATA_FIELDS = ("id", "business_types", "floor", "latitude", "longitude", "daily_footfall_avg")
+
+
+def type_name(raw: Optional[str]) -> str:
+    return (raw or "").strip() or "미분류"
+
+
+def type_key(name: str) -> int:
+    """업종명 → 정수 키 (63비트 해시). 테이블 없이 어느 프로세스에서나 같은 값이다."""
+    return int.from_bytes(hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest(), "big") >> 1
+
+
+def feature_rows(rows: Sequence[tuple]) -> List[Tuple[int, FeatureRow]]:
+    """_DATA_FIELDS 순서 튜플 → (Data id, 지표). 층 보너스/전환율은 scoring 과 같은 함수로."""
+    floors = np.fromiter((f if isinstance(f, int) else 0 for _, _, f, _, _, _ in rows), dtype=np.int64, count=len(rows))
+    bonus = floor_bonus(floors)
+    out = []
+    for (pk, btype, _floor, lat, lon, foot), b in zip(rows, bonus):
+        name = type_name(btype)
+        rate = get_visit_rate(name)
+        out.append((pk, (type_key(name), rate, float(foot or 0) * rate, float(b), cell_id(lat, lon))))
+    return out
+
+
+def _write(rows: List[tuple]) -> int:
+    if not rows:
+        return 0
+    objs = [
+        DataFeature(data_id=pk, type_key=key, visit_rate=rate, visit_estimate=est, floor_bonus=bonus, cell_id=cell)
+        for pk, (key, rate, est, bonus, cell) in feature_rows(rows)
+    ]
+    DataFeature.objects.bulk_create(
+        objs, batch_size=1000,
+        update_conflicts=True, unique_fields=["data"],
+        update_fields=["type_key", "visit_rate", "visit_estimate", "floor_bonus", "cell_id", "updated_at"],
+    )
+    return len(objs)
+
+
+def refresh_features(ids: Optional[Sequence[int]] = None, missing_only: bool = False) -> int:
+    """
+    지정한 Data(없으면 전체)의 지표를 다시 계산해 저장한다.
+    missing_only=True 면 지표 행이 없는 Data 만 처리 (증분 갱신).
+    """
+    written = 0
+    if ids is not None:
+        for i in range(0, len(ids), ID_CHUNK):
+            qs = Data.objects.filter(id__in=ids[i:i + ID_CHUNK])
+            if missing_only:
+                qs = qs.filter(feature__isnull=True)
+            written += _write(list(qs.values_list(*_DATA_FIELDS)))
+        return written
+
+    qs = Data.objects.order_by("id")
+    if missing_only:
+        qs = qs.filter(feature__isnull=True)
+    last = 0
+    while True:
+        rows = list(qs.filter(id__gt=last).values_list(*_DATA_FIELDS)[:BATCH])
+        if not rows:
+            break
+        written += _write(rows)
+        last = rows[-1][0]
+    return written
+
+
+def load_features(ids: Sequence[int]) -> Dict[int, FeatureRow]:
+    """
+    Data id → 사전 계산 지표. 읽기 경로라 DB 에 쓰지 않는다:
+    빠진 행은 메모리에서만 계산하고 (build_features 로 채우라고) 경고를 남긴다.
+    """
+    out: Dict[int, FeatureRow] = {}
+    cols = ("data_id", "type_key", "visit_rate", "visit_estimate", "floor_bonus", "cell_id")
+    for i in range(0, len(ids), ID_CHUNK):
+        for pk, *rest in DataFeature.objects.filter(data_id__in=ids[i:i + ID_CHUNK]).values_list(*cols):
+            out[pk] = tuple(rest)
+    missing = [pk for pk in ids if pk not in out]
+    if missing:
+        logger.warning("%d Data rows have no DataFeature; run `manage.py build_features`", len(missing))
+        for i in range(0, len(missing), ID_CHUNK):
+            rows = Data.objects.filter(id__in=missing[i:i + ID_CHUNK]).values_list(*_DATA_FIELDS)
+            out.update(feature_rows(list(rows)))
+    return out
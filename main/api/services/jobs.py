@@ -0,0 +1,152 @@
+# api/services/jobs.py
+# 분석 요청(AnalysisRequest) 추천 계산 작업 큐. AnalysisJob 테이블이 큐이고,
+# 요청 경로는 작업 행만 만들고 돌아간다. 계산/설명/저장은 run_jobs 명령(ANALYSIS_JOB_WORKERS > 0 이면 프로세스 내 워커 풀도)이 한다.
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from api.models import AnalysisJob, AnalysisRequest
+from api.services import persistence
+from api.services.recommender import get_recommender
+
+logger = logging.getLogger(__name__)
+
+# 추천 API 기본 반경과 같음 (업종 3km, 위치 5km)
+TYPE_RADIUS_KM = 3.0
+SPOT_RADIUS_KM = 5.0
+# 한 번에 살펴볼 대기 작업 수 (다른 워커가 먼저 가져가면 다음 것을 시도)
+CLAIM_SCAN = 20
+
+
+def _ready(now) -> Q:
+    """가져갈 수 있는 작업: 대기 중이고 재시도 시각이 지났거나, 처리 중인데 잠금이 오래된 것(워커 죽음)."""
+    stale = now - timedelta(seconds=settings.ANALYSIS_JOB_LOCK_TIMEOUT)
+    return Q(status=AnalysisJob.QUEUED, available_at__lte=now) | Q(status=AnalysisJob.RUNNING, locked_at__lt=stale)
+
+
+def enqueue(ar: AnalysisRequest) -> AnalysisJob:
+    """분석 요청의 작업을 만들고(이미 있으면 그대로) 커밋 후 워커를 깨운다."""
+    job, _ = AnalysisJob.objects.get_or_create(analysis_request=ar, defaults={"available_at": timezone.now()})
+    transaction.on_commit(kick)
+    return job
+
+
+def retry(job: AnalysisJob) -> bool:
+    """실패한 작업을 시도 횟수를 비우고 다시 대기열에 넣는다. 실패 상태가 아니면 False."""
+    updated = AnalysisJob.objects.filter(pk=job.pk, status=AnalysisJob.FAILED).update(
+        status=AnalysisJob.QUEUED, attempts=0, error="", available_at=timezone.now(),
+        locked_at=None, locked_by="", finished_at=None,
+    )
+    if updated:
+        transaction.on_commit(kick)
+    return bool(updated)
+
+
+def claim(worker: str) -> Optional[AnalysisJob]:
+    """
+    작업 하나를 가져와 처리 중으로 표시한다. 조건부 UPDATE 한 번으로 가져가므로
+    (SELECT ... FOR UPDATE 없이도) 같은 작업을 두 워커가 동시에 잡지 않는다.
+    """
+    now = timezone.now()
+    ready = _ready(now)
+    pks = list(AnalysisJob.objects.filter(ready).order_by("available_at", "id").values_list("pk", flat=True)[:CLAIM_SCAN])
+    for pk in pks:
+        if AnalysisJob.objects.filter(ready, pk=pk).update(
+                status=AnalysisJob.RUNNING, locked_at=now, locked_by=worker, attempts=F("attempts") + 1):
+            return AnalysisJob.objects.select_related("analysis_request__business_type").get(pk=pk)
+    return None
+
+
+def compute(ar: AnalysisRequest) -> Tuple[List[persistence.Item], List[persistence.Item]]:
+    """
+    분석 요청 → 저장할 (업종 추천, 위치 추천) 항목 (설명 전).
+    업종 추천은 좌표가 있을 때, 위치 추천은 업종이 정해져 있을 때만 만든다.
+    """
+    engine = get_recommender()
+    types: List[persistence.Item] = []
+    if ar.latitude is not None and ar.longitude is not None:
+        results, features_list, _ = engine.recommend_types(ar.latitude, ar.longitude, TYPE_RADIUS_KM)
+        type_ids = persistence.business_type_ids(r["business_type"] for r in results)
+        types = [persistence.Item(type_ids[r["business_type"]], float(r["score"]), f)
+                 for r, f in zip(results, features_list)]
+    spots: List[persistence.Item] = []
+    if ar.business_type_id:
+        results, features_list = engine.recommend_spots(ar.business_type.name, ar.latitude, ar.longitude, SPOT_RADIUS_KM)
+        spots = [persistence.Item(ar.business_type_id, float(r["score"]), f, spot_id=r["id"])
+                 for r, f in zip(results, features_list)]
+    return types, spots
+
+
+def process(job: AnalysisJob, worker: str) -> bool:
+    """가져온 작업 하나 처리. 결과 저장과 완료 표시는 한 트랜잭션. 실패하면 지연 후 재시도, 횟수를 넘으면 실패."""
+    ar = job.analysis_request
+    try:
+        # 설명(LLM)은 트랜잭션 밖에서, 이미 저장된 조합은 건너뛴다
+        pending = persistence.prepare(ar, *compute(ar))
+        with transaction.atomic():
+            persistence.write(pending)
+            # 잠금이 넘어갔으면(오래 걸려 다른 워커가 가져감) 이 결과는 버린다
+            if not AnalysisJob.objects.filter(pk=job.pk, locked_by=worker, status=AnalysisJob.RUNNING).update(
+                    status=AnalysisJob.DONE, error="", locked_at=None, finished_at=timezone.now()):
+                transaction.set_rollback(True)
+                return False
+        return True
+    except Exception as e:
+        logger.warning("analysis job %s failed (attempt %s): %r", ar.pk, job.attempts, e)
+        now = timezone.now()
+        if job.attempts >= settings.ANALYSIS_JOB_MAX_ATTEMPTS:
+            changes = {"status": AnalysisJob.FAILED, "finished_at": now}
+        else:
+            delay = settings.ANALYSIS_JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+            changes = {"status": AnalysisJob.QUEUED, "available_at": now + timedelta(seconds=delay)}
+        AnalysisJob.objects.filter(pk=job.pk, locked_by=worker).update(
+            error=repr(e)[:2000], locked_at=None, **changes)
+        return False
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"[:100]
+
+
+def drain(limit: Optional[int] = None) -> int:
+    """가져갈 작업이 없을 때까지(또는 limit 개) 처리하고 처리한 수를 돌려준다."""
+    worker = worker_name()
+    n = 0
+    try:
+        while limit is None or n < limit:
+            job = claim(worker)
+            if job is None:
+                break
+            process(job, worker)
+            n += 1
+    finally:
+        # 요청 밖 스레드라 연결 정리를 직접 한다
+        close_old_connections()
+    return n
+
+
+_lock = threading.Lock()
+_pool: Optional[ThreadPoolExecutor] = None
+
+
+def kick() -> None:
+    """프로세스 내 워커(ANALYSIS_JOB_WORKERS > 0)에게 큐를 비우라고 알린다. 0 이면 run_jobs 명령에 맡긴다."""
+    global _pool
+    workers = settings.ANALYSIS_JOB_WORKERS
+    if workers <= 0:
+        return
+    with _lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analysis-job")
+    _pool.submit(drain)
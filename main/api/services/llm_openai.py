@@ -1,13 +1,27 @@
 # api/services/llm_openai.py
 from __future__ import annotations
-import os, json
+import os, json, asyncio, logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, List, Tuple
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 
-# settings.py 에서 읽어온 API 키 사용
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+from api.services import explain_cache
+from api.services.timing import span
+
+logger = logging.getLogger(__name__)
+
+# settings.py 에서 읽어온 API 키 사용 (OPENAI_BASE_URL 로 호환 서버/가짜 서버 지정 가능)
+client = OpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL)
 
 MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+# 프롬프트(SYSTEM_KO/_messages)를 바꾸면 올려서 기존 캐시를 무효화
+PROMPT_VERSION = 1
+
+# 한 응답에서 동시에 보낼 최대 호출 수 / 호출당 제한 시간(초)
+CONCURRENCY = settings.OPENAI_CONCURRENCY
+TIMEOUT = settings.OPENAI_TIMEOUT
 
 SYSTEM_KO = (
     "너는 입지 추천 사유를 작성하는 도우미다. "
@@ -43,9 +57,8 @@ def _fallback(f: dict) -> str:
     base = ", ".join(parts) if parts else "여러 지표가 균형적"
     return base + " 등을 종합해 상위 후보로 선정했습니다."
 
-def explain(features: dict, lang: str = "ko") -> str:
-    try:
-        prompt = f"""
+def _messages(features: dict) -> list:
+    prompt = f"""
 다음 JSON 지표만 근거로 아래 형식을 그대로 작성하라.
 규칙:
 - 각 항목은 정확히 2문장
@@ -63,19 +76,199 @@ def explain(features: dict, lang: str = "ko") -> str:
 JSON:
 {json.dumps(features, ensure_ascii=False)}
 """.strip()
+    return [
+        {"role": "system", "content": SYSTEM_KO},
+        {"role": "user",   "content": prompt},
+    ]
+
+def explain(features: dict, lang: str = "ko") -> str:
+    key = explain_cache.make_key(features, MODEL, PROMPT_VERSION)
+    hit = explain_cache.get_many([key]).get(key)
+    if hit is not None:
+        return hit
+    try:
+        with span("llm"):
+            resp = client.chat.completions.create(
+                model=MODEL,
+                messages=_messages(features),
+                temperature=0.2,
+                max_tokens=300,
+            )
+        text = (resp.choices[0].message.content or "").strip()
+        explain_cache.set_many({key: text}, MODEL, PROMPT_VERSION)
+        return text
+    except Exception:
+        logger.exception("openai explain failed, using fallback")
+        return _fallback(features)
+
+
+async def _aexplain(aclient: AsyncOpenAI, sem: asyncio.Semaphore, features: dict, timeout: float) -> Tuple[str, bool]:
+    """(설명, LLM 성공 여부). 실패 시 규칙 기반 문구로 대체하고 캐시에는 넣지 않는다."""
+    async with sem:
+        try:
+            resp = await asyncio.wait_for(
+                aclient.chat.completions.create(
+                    model=MODEL,
+                    messages=_messages(features),
+                    temperature=0.2,
+                    max_tokens=300,
+                ),
+                timeout,
+            )
+            return (resp.choices[0].message.content or "").strip(), True
+        except Exception as e:
+            logger.warning("openai explain failed, using fallback: %r", e)
+            return _fallback(features), False
+
+
+async def _afetch_many(features_list: List[dict], concurrency: int | None = None,
+                       timeout: float | None = None) -> List[Tuple[str, bool]]:
+    if not features_list:
+        return []
+    timeout = TIMEOUT if timeout is None else timeout
+    sem = asyncio.Semaphore(max(1, concurrency or CONCURRENCY))
+    async with AsyncOpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL,
+                           timeout=timeout) as aclient:
+        return list(await asyncio.gather(*(_aexplain(aclient, sem, f, timeout) for f in features_list)))
+
+
+def _cache_split(features_list: List[dict]):
+    """캐시 조회 후 (키 목록, 캐시 히트, 요청할 {키: 지표}) 반환. 같은 지표는 한 번만 요청."""
+    keys = [explain_cache.make_key(f, MODEL, PROMPT_VERSION) for f in features_list]
+    cached = explain_cache.get_many(keys)
+    todo: Dict[str, dict] = {}
+    for k, f in zip(keys, features_list):
+        if k not in cached and k not in todo:
+            todo[k] = f
+    return keys, cached, todo
+
 
-        resp = client.chat.completions.create(
+def _cache_merge(keys: List[str], cached: Dict[str, str], todo_keys: List[str],
+                 fetched: List[Tuple[str, bool]]) -> List[str]:
+    texts = dict(cached)
+    store = {}
+    for k, (text, ok) in zip(todo_keys, fetched):
+        texts[k] = text
+        if ok:
+            store[k] = text
+    explain_cache.set_many(store, MODEL, PROMPT_VERSION)
+    return [texts[k] for k in keys]
+
+
+async def aexplain_many(features_list: List[dict], lang: str = "ko",
+                        concurrency: int | None = None, timeout: float | None = None) -> List[str]:
+    """여러 설명을 (캐시 확인 후) 동시에 요청. 결과 순서는 입력 순서와 같다."""
+    if not features_list:
+        return []
+    keys, cached, todo = await sync_to_async(_cache_split)(features_list)
+    with span("llm"):
+        fetched = await _afetch_many(list(todo.values()), concurrency, timeout)
+    return await sync_to_async(_cache_merge)(keys, cached, list(todo), fetched)
+
+
+async def _astream_one(aclient: AsyncOpenAI, sem: asyncio.Semaphore, features: dict, timeout: float,
+                       on_delta: Callable[[str], None]) -> Tuple[str, bool]:
+    """_aexplain 과 같지만 OpenAI stream API 로 받으며 토큰 조각마다 on_delta 를 부른다."""
+    async def consume() -> str:
+        stream = await aclient.chat.completions.create(
             model=MODEL,
-            messages=[
-                {"role": "system", "content": SYSTEM_KO},
-                {"role": "user",   "content": prompt},
-            ],
+            messages=_messages(features),
             temperature=0.2,
             max_tokens=300,
+            stream=True,
         )
-        return (resp.choices[0].message.content or "").strip()
-    except Exception as e:
-        import traceback
-        print(">>> OPENAI ERROR:", e)
-        traceback.print_exc()
-        return _fallback(features)
+        parts: List[str] = []
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parts.append(delta)
+                on_delta(delta)
+        return "".join(parts).strip()
+
+    async with sem:
+        try:
+            return await asyncio.wait_for(consume(), timeout), True
+        except Exception as e:
+            logger.warning("openai explain stream failed, using fallback: %r", e)
+            return _fallback(features), False
+
+
+async def astream_many(features_list: List[dict], lang: str = "ko", deltas: bool = False,
+                       concurrency: int | None = None, timeout: float | None = None
+                       ) -> AsyncIterator[Tuple[int, str, bool]]:
+    """
+    설명을 끝나는 순서대로 (입력 위치, 텍스트, 완료 여부) 로 내보낸다. 캐시 히트는 맨 먼저.
+    deltas=True 면 완료 전 토큰 조각도 (위치, 조각, False) 로 내보낸다. 완료 텍스트는 항상 전체 문장.
+    """
+    if not features_list:
+        return
+    keys, cached, todo = await sync_to_async(_cache_split)(features_list)
+    positions: Dict[str, List[int]] = {}
+    for i, k in enumerate(keys):
+        if k in cached:
+            yield i, cached[k], True
+        else:
+            positions.setdefault(k, []).append(i)
+    if not todo:
+        return
+
+    timeout = TIMEOUT if timeout is None else timeout
+    sem = asyncio.Semaphore(max(1, concurrency or CONCURRENCY))
+    queue: asyncio.Queue = asyncio.Queue()
+    store: Dict[str, str] = {}
+    async with AsyncOpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL,
+                           timeout=timeout) as aclient:
+        async def run(key: str, features: dict) -> None:
+            try:
+                if deltas:
+                    result = await _astream_one(aclient, sem, features, timeout,
+                                                lambda d: queue.put_nowait((key, d, False)))
+                else:
+                    result = await _aexplain(aclient, sem, features, timeout)
+            except Exception as e:
+                logger.warning("openai explain failed, using fallback: %r", e)
+                result = (_fallback(features), False)
+            queue.put_nowait((key, result, True))
+
+        tasks = [asyncio.create_task(run(k, f)) for k, f in todo.items()]
+        remaining = len(tasks)
+        try:
+            while remaining:
+                key, payload, final = await queue.get()
+                if final:
+                    remaining -= 1
+                    text, ok = payload
+                    if ok:
+                        store[key] = text
+                    for i in positions[key]:
+                        yield i, text, True
+                else:
+                    for i in positions[key]:
+                        yield i, payload, False
+        finally:
+            # 클라이언트가 끊으면 남은 호출은 취소하고, 받은 것까지만 캐시에 넣는다
+            for t in tasks:
+                t.cancel()
+            if store:
+                await sync_to_async(explain_cache.set_many)(store, MODEL, PROMPT_VERSION)
+
+
+def _run(coro):
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # 이미 이벤트 루프가 도는 스레드면 별도 스레드에서 실행
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+def explain_many(features_list: List[dict], lang: str = "ko",
+                 concurrency: int | None = None, timeout: float | None = None) -> List[str]:
+    """aexplain_many 의 동기 버전. 전체 소요 시간은 가장 느린 호출 하나 수준."""
+    if not features_list:
+        return []
+    keys, cached, todo = _cache_split(features_list)
+    with span("llm"):
+        fetched = _run(_afetch_many(list(todo.values()), concurrency, timeout)) if todo else []
+    return _cache_merge(keys, cached, list(todo), fetched)
@@ -0,0 +1,147 @@
+# api/services/persistence.py
+# 분석 요청(AnalysisRequest) 추천 결과 저장. 요청 하나의 업종/위치 추천을 한 트랜잭션에서 표마다 upsert 한 번으로 쓴다.
+# - (analysis_request, spot, business_type) 유일 제약으로 이미 있는 조합은 점수/설명만 갱신 (id/즐겨찾기/check_save 유지)
+# - 설명은 새 조합만, 기존 행 설명 → 설명 캐시 → LLM 순으로 채운다
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.db import transaction
+
+from api.models import AnalysisRequest, BusinessType, SpotRecommendation, TypeRecommendation
+
+# (spot_id 또는 None, business_type_id). 업종 추천은 spot 이 없다
+RecKey = Tuple[Optional[int], Optional[int]]
+
+
+@dataclass
+class Item:
+    """저장할 추천 한 건. features 는 설명 생성/캐시 조회용 지표 (ranking.*_features)."""
+    business_type_id: Optional[int]
+    score: float
+    features: dict
+    spot_id: Optional[int] = None
+    description: Optional[str] = None
+
+    @property
+    def key(self) -> RecKey:
+        return self.spot_id, self.business_type_id
+
+
+@dataclass
+class Pending:
+    """prepare() 결과. write() 가 한 트랜잭션으로 반영한다."""
+    ar: AnalysisRequest
+    items: Dict[type, List[Item]] = field(default_factory=dict)
+    # 이번 결과에도 있는 기존 행 id (지우지 않음)
+    keep: Dict[type, List[int]] = field(default_factory=dict)
+
+
+def business_type_ids(names: Iterable[str]) -> Dict[str, int]:
+    """
+    추천 결과의 업종명 → BusinessType id. 추천으로 저장되는 업종만 없으면 만든다.
+    name 이 유일하므로 동시에 만들어도 ignore_conflicts 로 한 행만 남는다.
+    """
+    names = set(names)
+    if not names:
+        return {}
+    out = dict(BusinessType.objects.filter(name__in=names).values_list("name", "id"))
+    missing = names - out.keys()
+    if missing:
+        BusinessType.objects.bulk_create([BusinessType(name=n) for n in missing], ignore_conflicts=True)
+        out.update(BusinessType.objects.filter(name__in=missing).values_list("name", "id"))
+    return out
+
+
+def _dedup(items: Sequence[Item]) -> List[Item]:
+    """같은 조합은 처음 것(점수순 입력이면 최고 점수)만."""
+    seen: Dict[RecKey, Item] = {}
+    for it in items:
+        seen.setdefault(it.key, it)
+    return list(seen.values())
+
+
+def _existing(model, ar: AnalysisRequest) -> Dict[RecKey, Tuple[int, Optional[str]]]:
+    """이미 저장된 조합 → (id, 설명)."""
+    if model is SpotRecommendation:
+        rows = model.objects.filter(analysis_request=ar).values_list("id", "spot_id", "business_type_id", "description")
+        return {(spot, bt): (pk, desc) for pk, spot, bt, desc in rows}
+    rows = model.objects.filter(analysis_request=ar).values_list("id", "business_type_id", "description")
+    return {(None, bt): (pk, desc) for pk, bt, desc in rows}
+
+
+def _explain(items: List[Item]) -> None:
+    """설명 없는 새 행만 채운다. explain_many 가 설명 캐시를 먼저 보므로 캐시 히트는 LLM 을 부르지 않는다."""
+    todo = [it for it in items if it.description is None]
+    if not todo:
+        return
+    from api.services.llm_openai import explain_many
+    for it, why in zip(todo, explain_many([it.features for it in todo])):
+        it.description = why
+
+
+def prepare(ar: AnalysisRequest, types: Sequence[Item], spots: Sequence[Item]) -> Pending:
+    """
+    기존 행 조회(표당 한 번)와 설명 생성. 트랜잭션 밖에서 부른다 (LLM 을 기다리는 동안 쓰기 잠금을 잡지 않도록).
+    같은 조합이 이미 있으면 그 설명을 재사용한다.
+    """
+    pending = Pending(ar)
+    fresh: List[Item] = []
+    for model, items in ((TypeRecommendation, types), (SpotRecommendation, spots)):
+        existing = _existing(model, ar)
+        items = _dedup(items)
+        keep = []
+        for it in items:
+            hit = existing.get(it.key)
+            if hit is None:
+                fresh.append(it)
+                continue
+            pk, old_desc = hit
+            keep.append(pk)
+            it.description = old_desc or it.description
+            if it.description is None:
+                fresh.append(it)
+        pending.items[model], pending.keep[model] = items, keep
+    _explain(fresh)
+    return pending
+
+
+def _build(model, ar: AnalysisRequest, it: Item):
+    if model is SpotRecommendation:
+        return model(analysis_request=ar, spot_id=it.spot_id, business_type_id=it.business_type_id,
+                     score=it.score, description=it.description, check_save=False)
+    return model(analysis_request=ar, business_type_id=it.business_type_id,
+                 score=it.score, description=it.description, check_save=False)
+
+
+# upsert 충돌 기준 (모델의 유일 제약과 같은 필드)
+UNIQUE_FIELDS = {
+    TypeRecommendation: ["analysis_request", "business_type"],
+    SpotRecommendation: ["analysis_request", "spot", "business_type"],
+}
+
+
+def write(pending: Pending) -> Tuple[int, int]:
+    """
+    한 트랜잭션, 표마다:
+    1) 이번 결과에 없는 미저장(check_save=False) 행 중 즐겨찾기가 없는 것만 삭제 (즐겨찾기는 CASCADE 되지 않게 남김)
+    2) bulk_create(update_conflicts) 한 번으로 새 조합은 추가, 기존 조합은 점수/설명만 갱신
+    (쓴 업종 추천 수, 위치 추천 수) 를 돌려준다.
+    """
+    ar = pending.ar
+    written = []
+    with transaction.atomic():
+        for model in (TypeRecommendation, SpotRecommendation):
+            (model.objects.filter(analysis_request=ar, check_save=False, favorited_by__isnull=True)
+             .exclude(pk__in=pending.keep[model]).delete())
+            objs = [_build(model, ar, it) for it in pending.items[model]]
+            model.objects.bulk_create(objs, update_conflicts=True, unique_fields=UNIQUE_FIELDS[model],
+                                      update_fields=["score", "description"])
+            written.append(len(objs))
+    return written[0], written[1]
+
+
+def save_recommendations(ar: AnalysisRequest, types: Sequence[Item], spots: Sequence[Item]) -> Tuple[int, int]:
+    """prepare + write. 다른 쓰기와 같은 트랜잭션에 묶어야 하면 둘을 따로 부른다."""
+    return write(prepare(ar, types, spots))
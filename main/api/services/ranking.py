@@ -0,0 +1,140 @@
+# api/services/ranking.py
+# 추천 순위 계산 (뷰, 일괄 추천, 타일 사전 계산이 함께 쓴다). 설명(why) 생성 전 단계까지.
+from __future__ import annotations
+
+from typing import List, Tuple
+
+import numpy as np
+
+from django.conf import settings
+
+from api.models import Data
+from api.services.features import type_name
+from api.services.scoring import (
+    ROW_FIELDS, Candidates, SPOT_WEIGHTS, SPOT_WEIGHTS_NO_LOCATION, TYPE_WEIGHTS,
+    aggregate_by_type, five_point, get_visit_rate, haversine_km, score, top_k,
+)
+from api.services.spatial import GridIndex
+from api.services.timing import span
+
+TARGET_TYPE_COUNT = 3
+TARGET_SPOT_COUNT = 3
+# 업종 추천: 반경 안 후보가 이보다 적으면 가까운 순으로 채운다 (최대 MAX_GROW_KM 까지).
+# 기본 1 은 기존 규칙 (반경 안이 비었을 때만 넓힘)
+MIN_TYPE_CANDIDATES = settings.RECOMMEND_MIN_TYPE_CANDIDATES
+MAX_GROW_KM = 30.0
+# 후보 Data 조회 필드 (업종/위치 추천 공통)
+CANDIDATE_FIELDS = ROW_FIELDS
+
+
+def type_candidate_ids(index: GridIndex, lat: float, lon: float, radius_km: float) -> Tuple[List[int], float]:
+    """업종 추천 후보 (id 목록, 실제 적용 반경 km). 반경 안이 모자라면 최근접 탐색으로 넓힌다."""
+    return index.nearest(lat, lon, radius_km, MIN_TYPE_CANDIDATES, MAX_GROW_KM)
+
+
+def int_or_none(v):
+    try:
+        return int(v) if v is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def type_features(btype: str, spot: Data, distance_km: float, rate: float) -> dict:
+    """업종 추천 설명용 지표 (대표 후보 1곳 기준)."""
+    daily_foot = int_or_none(spot.daily_footfall_avg)
+    return {
+        "business_type": btype,
+        "distance_km": distance_km,
+        "daily_footfall_avg": daily_foot,
+        "assumed_visit_rate": rate,
+        "estimated_visitors": int_or_none((daily_foot or 0) * rate) if daily_foot is not None else None,
+        "monthly_rent": int_or_none(spot.monthly_rent),
+        "deposit": int_or_none(spot.deposit),
+        "floor": spot.floor,
+    }
+
+
+def spot_features(btype: str, spot: Data, distance_km: float | None, rate: float) -> dict:
+    """위치 추천 설명용 지표."""
+    return {
+        "business_type": btype,
+        "distance_km": distance_km,
+        "daily_footfall_avg": int_or_none(spot.daily_footfall_avg),
+        "assumed_visit_rate": rate,
+        "estimated_visitors": int_or_none(float(spot.daily_footfall_avg or 0) * rate),
+        "monthly_rent": int_or_none(spot.monthly_rent),
+        "deposit": int_or_none(spot.deposit),
+        "floor": spot.floor,
+        "address": spot.address,
+    }
+
+
+def rank_types(cand: Candidates, lat: float, lon: float, topn: int):
+    """업종 추천 (결과 목록, 설명용 지표 목록). 설명(why) 생성 전 단계까지."""
+    # 특징 계산 (유동인구→전환율 적용 방문자 추정) + 점수화, 한 번에 벡터 연산
+    with span("score"):
+        dist = haversine_km(lat, lon, cand.lat, cand.lon)
+        raw = score(cand.visit_est, dist, cand.rent, cand.dep, cand.bonus, TYPE_WEIGHTS)
+
+    # 1단계: 모든 업종을 점수만으로 집계/정렬 (LLM 호출 없음)
+    with span("aggregate"):
+        groups = aggregate_by_type(cand.type_id, raw)
+        agg = np.array([g[1] for g in groups])
+        scores = five_point(agg, agg)
+        ranked = sorted(zip(groups, scores), key=lambda x: float(x[1]), reverse=True)
+        ranked = ranked[:topn]
+
+    results = []
+    features_list = []
+    for (_type_id, _agg_raw, count, best), sc in ranked:
+        first = cand.row(best)
+        t = type_name(first.business_types)
+        results.append({
+            "business_type": t,
+            "score": sc,  # "x.xx"
+            "count": count,
+            "spot_id": first.id,
+        })
+        features_list.append(type_features(t, first, float(dist[best]), float(cand.visit_rate[best])))
+    return results, features_list
+
+
+def rank_spots(cand: Candidates, qtype: str, lat, lon, topn: int):
+    """위치 추천 (결과 목록, 설명용 지표 목록). 설명(why) 생성 전 단계까지."""
+    rate = get_visit_rate(qtype)
+    has_loc = lat is not None and lon is not None
+
+    with span("score"):
+        visit = cand.foot * rate
+        dist = haversine_km(lat, lon, cand.lat, cand.lon) if has_loc else None
+        weights = SPOT_WEIGHTS if has_loc else SPOT_WEIGHTS_NO_LOCATION
+        raw = score(visit, dist, cand.rent, cand.dep, cand.bonus, weights)
+
+    with span("aggregate"):
+        top = top_k(raw, topn)
+        top_scores = five_point(raw[top], raw)
+
+    results = []
+    features_list = []
+    for i, sc in zip(top, top_scores):
+        c = cand.row(i)
+        rec = {
+            "id": c.id,
+            "code": c.code,
+            "business_type": c.business_types,
+            "address": c.address,
+            "region": c.region,
+            "latitude": c.latitude,
+            "longitude": c.longitude,
+            "monthly_rent": c.monthly_rent,
+            "deposit": c.deposit,
+            "daily_footfall_avg": c.daily_footfall_avg,
+            "assumed_visit_rate": rate,
+            "estimated_visitors": int_or_none(visit[i]),
+            "floor": c.floor,
+            "distance_km": round(float(dist[i]), 3) if has_loc else None,
+            "score": sc,
+        }
+        features_list.append(spot_features(qtype or rec["business_type"], c, rec["distance_km"], rate))
+        results.append(rec)
+    return results, features_list
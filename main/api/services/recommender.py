@@ -0,0 +1,129 @@
+# api/services/recommender.py
+from __future__ import annotations
+
+import threading
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from api.models import Data
+from api.services.dataset import current_version
+from api.services.features import load_features, type_name
+from api.services.ranking import (
+    CANDIDATE_FIELDS, TARGET_SPOT_COUNT, TARGET_TYPE_COUNT, rank_spots, rank_types, type_candidate_ids,
+)
+from api.services.scoring import Candidates
+from api.services.spatial import GridIndex, get_index
+from api.services.taxonomy import TypeIndex
+from api.services.timing import span
+
+# 위치 추천 후보 상한 (기존 DB 조회의 [:10000] 과 같음)
+MAX_SPOT_CANDIDATES = 10000
+
+
+class Recommender:
+    """
+    활성 Data 전체 스냅샷 (한 데이터 버전). 후보 조회에 DB 를 쓰지 않는다.
+    - ids / cand : id 오름차순 Data 열 배열 (DataFeature 사전 계산 값 포함)
+    - index      : 프로세스 공용 격자 인덱스 (spatial.get_index). 스냅샷에 없는 id 는 positions() 가 뺀다
+    - type_rows  : 업종 키 (DataFeature.type_key) → 그 업종의 행 위치
+    - types      : 업종 검색어/동의어 → 업종 키 역색인
+    """
+
+    def __init__(self, version: int, cand: Candidates, index: GridIndex, type_names: Dict[int, str]):
+        self.version = version
+        self.cand = cand
+        self.ids = cand.ids
+        self.index = index
+        # 업종 키 순으로 안정 정렬하면 같은 업종의 행 위치가 id 오름차순으로 이어진다
+        order = np.argsort(cand.type_id, kind="stable")
+        tids, starts = np.unique(cand.type_id[order], return_index=True)
+        self.type_rows = {int(t): part for t, part in zip(tids, np.split(order, starts[1:]))} if tids.size else {}
+        self.types = TypeIndex({t: type_names.get(t, "") for t in self.type_rows})
+
+    @classmethod
+    def load(cls, version: Optional[int] = None) -> "Recommender":
+        if version is None:
+            version = current_version()
+        index = get_index()
+        qs = Data.objects.filter(is_active=True).order_by("id").values_list(*CANDIDATE_FIELDS)
+        rows = list(qs.iterator(chunk_size=10000))
+        cand = Candidates(rows, load_features([r[0] for r in rows]))
+        del rows
+        # 업종 키는 업종명 해시이므로 이름은 같은 행의 분류명에서
+        names = dict(zip(cand.type_id.tolist(), map(type_name, cand.btype_labels[cand.btype_idx].tolist())))
+        return cls(version, cand, index, names)
+
+    def __len__(self) -> int:
+        return len(self.cand)
+
+    def positions(self, ids: Sequence[int]) -> np.ndarray:
+        """Data id 목록 → 스냅샷 내 위치 (없는 id 는 뺌)."""
+        ids = np.asarray(ids, dtype=np.int64)
+        if ids.size == 0 or self.ids.size == 0:
+            return np.empty(0, dtype=np.int64)
+        pos = np.searchsorted(self.ids, ids)
+        return pos[(pos < self.ids.size) & (self.ids[np.minimum(pos, self.ids.size - 1)] == ids)]
+
+    def type_positions(self, qtype: str) -> np.ndarray:
+        """qtype(과 동의어)에 해당하는 업종 키들의 행 위치 (id 오름차순)."""
+        hits = [self.type_rows[t] for t in self.types.resolve(qtype)]
+        if not hits:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(hits))
+
+    def recommend_types(self, lat: float, lon: float, radius_km: float, topn: int = TARGET_TYPE_COUNT):
+        """업종 추천 (결과 목록, 설명용 지표 목록, 실제 적용 반경 km)."""
+        with span("fetch"):
+            ids, effective_km = type_candidate_ids(self.index, lat, lon, radius_km)
+            pos = self.positions(ids)
+            cand = self.cand.take(pos)
+        if pos.size == 0:
+            return [], [], effective_km
+        return (*rank_types(cand, lat, lon, topn), effective_km)
+
+    def recommend_spots(self, qtype: str, lat, lon, radius_km: float, topn: int = TARGET_SPOT_COUNT):
+        """위치 추천 (결과 목록, 설명용 지표 목록). 위치가 없으면 업종 필터만."""
+        with span("fetch"):
+            pos = self.type_positions(qtype)
+            if lat is not None and lon is not None and pos.size:
+                pos = np.intersect1d(pos, self.positions(self.index.radius(lat, lon, radius_km)), assume_unique=True)
+            pos = pos[:MAX_SPOT_CANDIDATES]
+            cand = self.cand.take(pos)
+        if pos.size == 0:
+            return [], []
+        return rank_spots(cand, qtype, lat, lon, topn)
+
+
+_lock = threading.Lock()
+_engine: Optional[Recommender] = None
+
+
+def get_recommender() -> Recommender:
+    """
+    현재 데이터 버전의 엔진. 버전이 바뀌면 한 스레드가 새 스냅샷을 만들어 통째로 바꿔 끼우고,
+    그동안 다른 요청은 이전 스냅샷으로 계속 응답한다 (처음 한 번만 모두 기다림).
+    """
+    global _engine
+    version = current_version()
+    engine = _engine
+    if engine is not None and engine.version == version:
+        return engine
+    if not _lock.acquire(blocking=engine is None):
+        return engine
+    try:
+        engine = _engine
+        if engine is None or engine.version != version:
+            engine = Recommender.load(version)
+            _engine = engine
+    finally:
+        _lock.release()
+    return engine
+
+
+def warm_recommender() -> None:
+    """서버 시작 시 엔진을 미리 적재한다. 마이그레이션 전이면 조용히 넘어간다."""
+    try:
+        get_recommender()
+    except Exception:
+        pass
@@ -0,0 +1,63 @@
+# api/services/response_cache.py
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from django.conf import settings
+
+from api.services.dataset import current_version
+from api.services.lru import LRUCache
+
+GRID_DEG = settings.RECOMMEND_CACHE_GRID_DEG
+ENABLED = settings.RECOMMEND_CACHE_SIZE > 0
+
+_lru = LRUCache(maxsize=max(1, settings.RECOMMEND_CACHE_SIZE), ttl=settings.RECOMMEND_CACHE_TTL)
+_lock = threading.Lock()
+_version: Optional[int] = None
+
+
+def snap(v: Optional[float]) -> Optional[float]:
+    """좌표를 격자 중심 값으로. 같은 칸에 드는 요청은 같은 좌표로 계산된다."""
+    if v is None or not ENABLED or GRID_DEG <= 0:
+        return v
+    return round(round(v / GRID_DEG) * GRID_DEG, 6)
+
+
+def norm_radius(radius_km: float) -> float:
+    return round(radius_km, 1) if ENABLED else radius_km
+
+
+def norm_type(qtype: str) -> str:
+    return " ".join(qtype.split())
+
+
+def get_or_compute(key: Tuple[Hashable, ...], compute: Callable[[], Any]) -> Any:
+    """key(+현재 Data 버전)로 결과를 찾고, 없으면 compute() 결과를 저장해 돌려준다."""
+    if not ENABLED:
+        return compute()
+    global _version
+    version = current_version()
+    if version != _version:
+        # import_data 등으로 Data 가 바뀌었으면 이전 결과는 전부 버림
+        with _lock:
+            if version != _version:
+                _lru.clear()
+                _version = version
+    full = (version, *key)
+    value = _lru.get(full, _MISSING)
+    if value is _MISSING:
+        value = compute()
+        _lru.set(full, value)
+    return value
+
+
+def clear() -> None:
+    _lru.clear()
+
+
+def stats() -> Dict[str, Any]:
+    return {**_lru.stats(), "enabled": ENABLED, "grid_deg": GRID_DEG, "version": _version}
+
+
+_MISSING = object()
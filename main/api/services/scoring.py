@@ -0,0 +1,200 @@
+# api/services/scoring.py
+from __future__ import annotations
+
+from collections import namedtuple
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from api.services.taxonomy import expand, normalize
+
+VISIT_RATE_BY_TYPE = {
+    "편의점": 0.040,
+    "카페": 0.035,
+    "음식점": 0.050,
+    "식당": 0.050,
+    "미용": 0.015,
+    "헤어": 0.015,
+    "약국": 0.020,
+}
+DEFAULT_VISIT_RATE = 0.025
+
+# (W_VISIT, W_DIST, W_RENT, W_DEP)
+TYPE_WEIGHTS = (0.42, 0.25, 0.23, 0.10)
+SPOT_WEIGHTS = (0.42, 0.23, 0.25, 0.10)
+SPOT_WEIGHTS_NO_LOCATION = (0.55, 0.0, 0.30, 0.15)
+
+# 업종 점수: 상위 3개 평균 + log(1+개수) 보너스
+TYPE_TOPK = 3
+TYPE_COUNT_BONUS = 0.02
+
+
+@lru_cache(maxsize=4096)
+def get_visit_rate(btype: str | None) -> float:
+    # 키의 동의어로 써도 같은 전환율 (커피/커피전문점 → 카페)
+    bt = normalize(btype)
+    for k, v in VISIT_RATE_BY_TYPE.items():
+        if any(term in bt for term in expand(k)):
+            return float(v)
+    return float(DEFAULT_VISIT_RATE)
+
+
+# 후보 한 행의 필드 (Data.values_list 순서). Candidates 는 이 순서의 튜플로 만든다
+ROW_FIELDS = ("id", "code", "business_types", "address", "region", "latitude", "longitude",
+              "monthly_rent", "deposit", "daily_footfall_avg", "floor")
+# 응답/설명용으로 꺼낸 후보 한 행 (Data 와 같은 속성 이름)
+Row = namedtuple("Row", ROW_FIELDS)
+# 층 정보 없음
+NO_FLOOR = -1
+
+
+def _categorical(values: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """문자열 열 → (고유값 배열, 행별 고유값 위치). 분류명/법정동명처럼 값 종류가 적은 열용."""
+    labels, codes = np.unique(np.array(values, dtype=object), return_inverse=True)
+    return labels, codes.reshape(-1).astype(np.int32)
+
+
+class Candidates:
+    """후보 Data 목록을 열 단위 NumPy 배열로 들고 있는 묶음. 행 객체는 두지 않고 row(i) 로 필요한 행만 꺼낸다.
+
+    features(Data id → DataFeature 값)가 주어지면 업종 id, 전환율, 방문자 추정,
+    층 보너스는 사전 계산 값을 그대로 쓴다.
+    """
+
+    _ARRAYS = ("ids", "code", "address", "btype_idx", "region_idx", "floor", "lat", "lon", "rent", "dep", "foot",
+               "type_id", "visit_rate", "visit_est", "bonus")
+
+    def __init__(self, rows: Sequence[tuple], features: Optional[Dict[int, tuple]] = None):
+        n = len(rows)
+        col = dict(zip(ROW_FIELDS, zip(*rows))) if n else dict.fromkeys(ROW_FIELDS, ())
+        self.ids = np.fromiter(col["id"], dtype=np.int64, count=n)
+        self.code = np.array(col["code"], dtype=object)
+        self.address = np.array(col["address"], dtype=object)
+        self.btype_labels, self.btype_idx = _categorical(col["business_types"])
+        self.region_labels, self.region_idx = _categorical(col["region"])
+        self.floor = np.fromiter((NO_FLOOR if f is None else f for f in col["floor"]), dtype=np.int16, count=n)
+        self.lat = np.fromiter(col["latitude"], dtype=np.float64, count=n)
+        self.lon = np.fromiter(col["longitude"], dtype=np.float64, count=n)
+        self.rent = np.fromiter((v or 0 for v in col["monthly_rent"]), dtype=np.float64, count=n)
+        self.dep = np.fromiter((v or 0 for v in col["deposit"]), dtype=np.float64, count=n)
+        self.foot = np.fromiter((v or 0 for v in col["daily_footfall_avg"]), dtype=np.float64, count=n)
+        if features is not None:
+            f = [features[pk] for pk in col["id"]]
+            self.type_id = np.fromiter((r[0] or 0 for r in f), dtype=np.int64, count=n)
+            self.visit_rate = np.fromiter((r[1] for r in f), dtype=np.float64, count=n)
+            self.visit_est = np.fromiter((r[2] for r in f), dtype=np.float64, count=n)
+            self.bonus = np.fromiter((r[3] for r in f), dtype=np.float64, count=n)
+        else:
+            # 층 정보 없음(NO_FLOOR)은 보너스 없음
+            self.bonus = floor_bonus(self.floor)
+
+    def __len__(self) -> int:
+        return self.ids.size
+
+    def take(self, idx: np.ndarray) -> "Candidates":
+        """idx 위치의 후보만 담은 새 묶음 (배열은 복사, 고유값 배열은 공유)."""
+        sub = Candidates.__new__(Candidates)
+        sub.btype_labels, sub.region_labels = self.btype_labels, self.region_labels
+        for name in self._ARRAYS:
+            if hasattr(self, name):
+                setattr(sub, name, getattr(self, name)[idx])
+        return sub
+
+    def row(self, i: int) -> Row:
+        """i 번째 후보 한 행 (상위 결과에만 만든다)."""
+        floor = int(self.floor[i])
+        return Row(int(self.ids[i]), self.code[i], self.btype_labels[self.btype_idx[i]], self.address[i],
+                   self.region_labels[self.region_idx[i]], float(self.lat[i]), float(self.lon[i]),
+                   int(self.rent[i]), int(self.dep[i]), int(self.foot[i]), None if floor == NO_FLOOR else floor)
+
+    def types(self) -> List[str]:
+        return [(b or "").strip() or "미분류" for b in self.btype_labels[self.btype_idx].tolist()]
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    R = 6371.0
+    dlat = np.radians(lats - lat)
+    dlon = np.radians(lons - lon)
+    a = (np.sin(dlat / 2) ** 2 +
+         np.cos(np.radians(lat)) * np.cos(np.radians(lats)) * np.sin(dlon / 2) ** 2)
+    return 2 * R * np.arcsin(np.sqrt(a))
+
+
+def minmax_norm(x: np.ndarray) -> np.ndarray:
+    """0~1 정규화. 값이 모두 같으면 0."""
+    if x.size == 0:
+        return x
+    a, b = float(x.min()), float(x.max())
+    if b == a:
+        b = a + 1e-9
+    return (x - a) / (b - a)
+
+
+def floor_bonus(floor: np.ndarray) -> np.ndarray:
+    return np.where(floor == 1, 0.03, np.where((floor >= 2) & (floor <= 3), 0.015, 0.0))
+
+
+def score(visit: np.ndarray, dist: Optional[np.ndarray], rent: np.ndarray, dep: np.ndarray,
+          bonus: np.ndarray, weights: Tuple[float, float, float, float]) -> np.ndarray:
+    """가중 정규화 점수(raw)를 한 번에 계산."""
+    w_visit, w_dist, w_rent, w_dep = weights
+    dist_n = (1.0 - minmax_norm(dist)) if (dist is not None and w_dist > 0) else 0.0
+    raw = (w_visit * minmax_norm(visit) + w_dist * dist_n
+           + w_rent * (1.0 - minmax_norm(rent)) + w_dep * (1.0 - minmax_norm(dep)))
+    return raw + bonus
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """점수 내림차순 상위 k 개의 인덱스 (동점은 앞선 인덱스 우선)."""
+    n = scores.size
+    if n == 0 or k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        # k 번째 점수와 같은 동점은 argpartition 이 아무거나 고르므로, 그 점수는 앞선 인덱스부터 채운다
+        kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        above = np.flatnonzero(scores > kth)
+        idx = np.concatenate((above, np.flatnonzero(scores == kth)[:k - above.size]))
+    else:
+        idx = np.arange(n)
+    return idx[np.lexsort((idx, -scores[idx]))]
+
+
+def five_point(raw: np.ndarray, values: np.ndarray) -> List[str]:
+    """values 의 min/max 기준 0~5 점 문자열 ("x.xx")."""
+    if values.size == 0:
+        return ["0.00"] * raw.size
+    vmin, vmax = float(values.min()), float(values.max())
+    denom = vmax - vmin
+    if denom <= 1e-12:
+        return ["5.00"] * raw.size
+    n = np.clip((raw - vmin) / denom, 0.0, 1.0) * 5.0
+    return [f"{v:.2f}" for v in n]
+
+
+def aggregate_by_type(keys: Sequence, scores: np.ndarray, topk: int = TYPE_TOPK):
+    """
+    업종별 집계. keys 는 후보별 업종 id(또는 업종명). 업종 등장 순서대로
+    (업종 key, 집계 raw 점수, 후보 수, 최고점 후보 인덱스) 목록을 돌려준다.
+    """
+    if len(keys) == 0:
+        return []
+    uniq, first_pos, codes = np.unique(np.asarray(keys), return_index=True, return_inverse=True)
+    codes = codes.ravel()
+    counts = np.bincount(codes, minlength=len(uniq))
+
+    # 업종별로 묶고, 같은 업종 안에서는 점수 내림차순 (동점은 앞선 후보 우선)
+    order = np.lexsort((np.arange(codes.size), -scores, codes))
+    sorted_codes = codes[order]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    rank = np.arange(order.size) - starts[sorted_codes]
+    keep = rank < topk
+    sums = np.bincount(sorted_codes[keep], weights=scores[order][keep], minlength=len(uniq))
+    agg = sums / np.maximum(1, np.minimum(counts, topk)) + np.log1p(counts) * TYPE_COUNT_BONUS
+    best = order[starts]
+
+    ukeys = uniq.tolist()
+    out = []
+    for code in np.argsort(first_pos, kind="stable"):
+        out.append((ukeys[code], float(agg[code]), int(counts[code]), int(best[code])))
+    return out
@@ -0,0 +1,228 @@
+# api/services/spatial.py
+from __future__ import annotations
+
+import math
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from api.models import Data
+from api.services.dataset import current_version
+
+# 격자 한 칸 크기(도). 서울 위도에서 약 0.55km x 0.44km
+CELL_DEG = 0.005
+
+# SQLite 바인딩 변수 제한(구버전 999)을 넘지 않도록 id__in 을 나눠서 조회
+ID_CHUNK = 900
+
+Cell = Tuple[int, int]
+Point = Tuple[int, float, float]
+
+
+def bbox_for_radius(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """반경(km)을 감싸는 위경도 사각형 (min_lat, max_lat, min_lon, max_lon)."""
+    lat_deg = radius_km / 111.0
+    lon_deg = radius_km / (111.320 * max(0.0001, math.cos(math.radians(lat))))
+    return lat - lat_deg, lat + lat_deg, lon - lon_deg, lon + lon_deg
+
+
+def cell_id(lat: float, lon: float, cell_deg: float = CELL_DEG) -> int:
+    """격자 셀 (행, 열) 을 정수 하나로. 상위 32비트 = 행, 하위 32비트 = 열."""
+    row = math.floor(lat / cell_deg)
+    col = math.floor(lon / cell_deg)
+    return (row << 32) | (col & 0xFFFFFFFF)
+
+
+class GridIndex:
+    """Data 위경도에 대한 프로세스 로컬 격자 인덱스."""
+
+    def __init__(self, cell_deg: float = CELL_DEG, version: int = 0):
+        self.cell_deg = cell_deg
+        self.version = version
+        self.cells: Dict[Cell, List[Point]] = defaultdict(list)
+        self.points: Dict[int, Tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def cell_of(self, lat: float, lon: float) -> Cell:
+        return (math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg))
+
+    def add(self, pk: int, lat: float, lon: float) -> None:
+        if pk in self.points:
+            self.remove(pk)
+        self.points[pk] = (lat, lon)
+        self.cells[self.cell_of(lat, lon)].append((pk, lat, lon))
+
+    def remove(self, pk: int) -> None:
+        pos = self.points.pop(pk, None)
+        if pos is None:
+            return
+        key = self.cell_of(*pos)
+        bucket = self.cells.get(key)
+        if bucket is None:
+            return
+        bucket[:] = [p for p in bucket if p[0] != pk]
+        if not bucket:
+            del self.cells[key]
+
+    def bbox(self, min_lat: float, max_lat: float, min_lon: float, max_lon: float) -> List[int]:
+        """사각형 안의 Data id 목록 (id 오름차순)."""
+        if min_lat > max_lat or min_lon > max_lon:
+            return []
+        c = self.cell_deg
+        r0, c0 = self.cell_of(min_lat, min_lon)
+        r1, c1 = self.cell_of(max_lat, max_lon)
+        out: List[int] = []
+        cells = self.cells
+        # 셀 개수가 점 개수보다 많으면(도시 전체 같은 넓은 범위) 점을 직접 훑는 편이 빠름
+        if (r1 - r0 + 1) * (c1 - c0 + 1) > len(cells):
+            for key, bucket in cells.items():
+                if r0 <= key[0] <= r1 and c0 <= key[1] <= c1:
+                    out.extend(pk for pk, la, lo in bucket
+                               if min_lat <= la <= max_lat and min_lon <= lo <= max_lon)
+            out.sort()
+            return out
+        for r in range(r0, r1 + 1):
+            # 셀이 사각형 안에 완전히 들어가면 점 단위 비교를 생략
+            row_inside = r * c >= min_lat and (r + 1) * c <= max_lat
+            for col in range(c0, c1 + 1):
+                bucket = cells.get((r, col))
+                if not bucket:
+                    continue
+                if row_inside and col * c >= min_lon and (col + 1) * c <= max_lon:
+                    out.extend(p[0] for p in bucket)
+                else:
+                    out.extend(pk for pk, la, lo in bucket
+                               if min_lat <= la <= max_lat and min_lon <= lo <= max_lon)
+        out.sort()
+        return out
+
+    def radius(self, lat: float, lon: float, radius_km: float) -> List[int]:
+        """기존 뷰와 같은 반경 사각형 범위의 Data id 목록."""
+        return self.bbox(*bbox_for_radius(lat, lon, radius_km))
+
+    def nearest(self, lat: float, lon: float, radius_km: float, min_count: int = 1,
+                max_km: float = 30.0) -> Tuple[List[int], float]:
+        """
+        반경 사각형 안에 min_count 개 이상 있으면 그대로 (radius() 와 같음).
+        모자라면 중심 셀부터 고리 모양으로 셀을 넓혀 가까운 순으로 min_count 개가 찰 때까지 찾는다 (max_km 까지).
+        반환: (Data id 목록 id 오름차순, 실제 적용 반경 km)
+        """
+        ids = self.radius(lat, lon, radius_km)
+        if len(ids) >= min_count or radius_km >= max_km or not self.points:
+            return ids, radius_km
+
+        c = self.cell_deg
+        # 고리 k 까지 훑으면 그 밖의 점은 적어도 이 거리(km) x k 만큼 떨어져 있다 (경도 방향이 더 짧음)
+        ring_km = c * min(111.0, 111.320 * max(0.0001, math.cos(math.radians(lat))))
+        r0, c0 = self.cell_of(lat, lon)
+        cells = self.cells
+        found: List[Tuple[float, int]] = []
+        k = 0
+        while True:
+            for r in range(r0 - k, r0 + k + 1):
+                # 고리 테두리 셀만 (안쪽은 이전 고리에서 봤음)
+                step = 1 if r in (r0 - k, r0 + k) else 2 * k or 1
+                for col in range(c0 - k, c0 + k + 1, step):
+                    for pk, la, lo in cells.get((r, col), ()):
+                        found.append((_haversine_km(lat, lon, la, lo), pk))
+            covered = k * ring_km
+            if len(found) >= min_count:
+                found.sort()
+                if found[min_count - 1][0] <= covered or covered >= max_km:
+                    break
+            elif covered >= max_km:
+                break
+            k += 1
+
+        found.sort()
+        if not found:
+            return [], max_km
+        # k 번째 점까지의 거리를 반경으로 (반경 요청값 ~ max_km 사이). 같은 거리 안의 점은 모두 포함
+        reach = found[min(min_count, len(found)) - 1][0]
+        effective = min(max_km, max(radius_km, reach))
+        out = sorted(pk for d, pk in found if d <= effective)
+        return out, math.ceil(effective * 1000) / 1000
+
+
+def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((p2 - p1) / 2) ** 2
+         + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * 6371.0 * math.asin(math.sqrt(a))
+
+
+def build_index(version: Optional[int] = None) -> GridIndex:
+    if version is None:
+        version = current_version()
+    idx = GridIndex(version=version)
+    rows = Data.objects.filter(is_active=True).values_list("id", "latitude", "longitude")
+    for pk, lat, lon in rows.iterator(chunk_size=10000):
+        if lat is None or lon is None:
+            continue
+        idx.add(pk, lat, lon)
+    return idx
+
+
+_lock = threading.Lock()
+_index: Optional[GridIndex] = None
+
+
+def get_index() -> GridIndex:
+    """현재 데이터 버전에 맞는 인덱스. 다른 프로세스가 Data 를 바꿨으면 다시 만든다."""
+    global _index
+    version = current_version()
+    idx = _index
+    if idx is not None and idx.version == version:
+        return idx
+    with _lock:
+        idx = _index
+        if idx is None or idx.version != version:
+            idx = build_index(version)
+            _index = idx
+    return idx
+
+
+def warm_index() -> None:
+    """서버 시작 시 인덱스를 미리 만든다. 마이그레이션 전이면 조용히 넘어간다."""
+    try:
+        get_index()
+    except Exception:
+        pass
+
+
+def apply_write(pk: int, lat: Optional[float], lon: Optional[float], new_version: int) -> None:
+    """단건 저장/삭제를 메모리 인덱스에 반영. 놓친 변경이 있으면 다음 조회 때 재구성된다."""
+    with _lock:
+        idx = _index
+        if idx is None or idx.version != new_version - 1:
+            return
+        if lat is None or lon is None:
+            idx.remove(pk)
+        else:
+            idx.add(pk, lat, lon)
+        idx.version = new_version
+
+
+def fetch_rows(ids: Sequence[int], fields: Iterable[str] = (), **filters) -> List[Data]:
+    """id 목록으로 Data 를 나눠 조회 (id 오름차순)."""
+    fields = tuple(fields)
+    out: List[Data] = []
+    for i in range(0, len(ids), ID_CHUNK):
+        qs = Data.objects.filter(id__in=ids[i:i + ID_CHUNK], **filters)
+        if fields:
+            qs = qs.only(*fields)
+        out.extend(qs)
+    out.sort(key=lambda d: d.id)
+    return out
+
+
+def fetch_values(ids: Sequence[int], fields: Iterable[str]) -> List[dict]:
+    """id 목록으로 Data 필드 dict 를 나눠 조회 (id 오름차순). 모델 인스턴스를 만들지 않는다."""
+    fields = tuple(fields)
+    out: List[dict] = []
+    for i in range(0, len(ids), ID_CHUNK):
+        out.extend(Data.objects.filter(id__in=ids[i:i + ID_CHUNK]).values(*fields))
+    out.sort(key=lambda d: d["id"])
+    return out
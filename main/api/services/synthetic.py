@@ -0,0 +1,86 @@
+# api/services/synthetic.py
+# 벤치마크용 가상 상가 데이터. 서울 주요 상권 주변에 몰리도록 생성 (seed 고정이면 항상 같은 결과).
+from __future__ import annotations
+
+import csv
+import random
+from typing import Dict, Iterator, Optional
+
+# (이름, 위도, 경도, 가중치)
+HOTSPOTS = (
+    ("강남역", 37.4979, 127.0276, 5),
+    ("홍대입구", 37.5572, 126.9245, 4),
+    ("명동", 37.5636, 126.9827, 3),
+    ("잠실", 37.5133, 127.1001, 3),
+    ("신촌", 37.5551, 126.9368, 2),
+    ("건대입구", 37.5404, 127.0692, 2),
+    ("성수", 37.5446, 127.0557, 2),
+    ("종로", 37.5704, 126.9910, 2),
+    ("여의도", 37.5219, 126.9245, 1),
+    ("노원", 37.6542, 127.0568, 1),
+)
+TYPES = (
+    "카페", "커피전문점", "한식 음식점", "중식 음식점", "일식 음식점", "편의점", "미용실", "헤어샵",
+    "약국", "치킨", "분식", "베이커리", "학원", "세탁소", "꽃집", "네일샵",
+)
+# 서울 전역 (핫스팟 밖 행은 여기서 균등 분포)
+SEOUL_BBOX = (37.43, 37.70, 126.80, 127.18)
+
+
+def rows(n: int, seed: int = 1, prefix: str = "S", spread_km: float = 1.5) -> Iterator[Dict]:
+    """Data 생성 인자 dict 를 n 개 생성. 80% 는 핫스팟 주변 정규분포, 나머지는 서울 전역."""
+    rnd = random.Random(seed)
+    spots = [h for h in HOTSPOTS for _ in range(h[3])]
+    sd = spread_km / 111.0
+    min_lat, max_lat, min_lon, max_lon = SEOUL_BBOX
+    for i in range(n):
+        if rnd.random() < 0.8:
+            _, lat0, lon0, _ = rnd.choice(spots)
+            lat = rnd.gauss(lat0, sd)
+            lon = rnd.gauss(lon0, sd * 1.25)
+            foot = int(rnd.lognormvariate(9.0, 0.6))
+        else:
+            lat = rnd.uniform(min_lat, max_lat)
+            lon = rnd.uniform(min_lon, max_lon)
+            foot = int(rnd.lognormvariate(8.0, 0.7))
+        floor: Optional[int] = rnd.choice((None, 1, 1, 1, 2, 2, 3, 4, 5))
+        yield {
+            "code": f"{prefix}{i:09d}",
+            "business_code": f"Q{rnd.randint(1, 99):02d}",
+            "business_types": rnd.choice(TYPES),
+            "address": f"서울특별시 가상로 {i}",
+            "region_code": "11000",
+            "region": "가상동",
+            "floor": floor,
+            "latitude": lat,
+            "longitude": lon,
+            "monthly_rent": rnd.randint(50, 800),
+            "deposit": rnd.randint(500, 30000),
+            "daily_footfall_avg": foot,
+        }
+
+
+# import_data 가 읽는 상권정보 CSV 헤더 (rows() 의 키와 같은 순서)
+CSV_COLUMNS = (
+    ("상가업소번호", "code"),
+    ("상권업종소분류코드", "business_code"),
+    ("상권업종소분류명", "business_types"),
+    ("도로명주소", "address"),
+    ("법정동코드", "region_code"),
+    ("법정동명", "region"),
+    ("층정보", "floor"),
+    ("위도", "latitude"),
+    ("경도", "longitude"),
+    ("예상월세", "monthly_rent"),
+    ("예상보증금", "deposit"),
+    ("예상유동인구", "daily_footfall_avg"),
+)
+
+
+def write_csv(path: str, n: int, seed: int = 1, prefix: str = "S") -> None:
+    """rows() 와 같은 가상 데이터를 import_data 로 읽을 수 있는 UTF-8 CSV 로 저장."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow([h for h, _ in CSV_COLUMNS])
+        for row in rows(n, seed=seed, prefix=prefix):
+            w.writerow(["" if row[k] is None else row[k] for _, k in CSV_COLUMNS])
@@ -0,0 +1,94 @@
+# api/services/taxonomy.py
+# 업종 검색어 → 업종 키(DataFeature.type_key, 업종명 해시). 동의어 묶음과 글자 n-gram 역색인으로 찾고,
+# 검색어별 결과를 기억한다.
+from __future__ import annotations
+
+import threading
+from typing import Dict, FrozenSet, Set, Tuple
+
+# 같은 업종을 가리키는 검색어 묶음 (정규화된 형태로 비교)
+SYNONYMS: Tuple[Tuple[str, ...], ...] = (
+    ("카페", "커피전문점", "커피"),
+    ("음식점", "식당"),
+    ("미용실", "헤어샵", "헤어", "미용"),
+    ("베이커리", "제과점", "빵집"),
+    ("치킨", "통닭"),
+)
+
+# 검색어별 결과 캐시 상한 (넘으면 비움)
+MAX_CACHED_QUERIES = 4096
+
+
+def normalize(text: str | None) -> str:
+    return " ".join((text or "").split()).casefold()
+
+
+_SYNONYM_OF: Dict[str, FrozenSet[str]] = {
+    normalize(term): frozenset(normalize(t) for t in group) for group in SYNONYMS for term in group
+}
+
+
+def expand(query: str) -> FrozenSet[str]:
+    """검색어 + 동의어 (정규화된 형태)."""
+    q = normalize(query)
+    return _SYNONYM_OF.get(q, frozenset((q,)))
+
+
+def grams(text: str) -> Set[str]:
+    """글자 1-gram + 2-gram. 부분 일치 후보를 역색인으로 좁히는 데 쓴다."""
+    return set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class TypeIndex:
+    """
+    업종 키(features.type_key) → 업종명 목록으로 만든 역색인.
+    - postings : 정규화된 업종명의 글자 1-gram/2-gram → 업종 키
+    - resolve  : 검색어와 동의어마다 이름 부분 일치(기존 icontains 범위) 업종 키를 합친다.
+                 2-gram 목록을 교집합해 후보를 좁힌 뒤 후보 이름만 확인하고, 같은 검색어는 캐시에서 바로 돌려준다.
+    """
+
+    def __init__(self, names: Dict[int, str]):
+        self.names = dict(names)
+        self.postings: Dict[str, Set[int]] = {}
+        self._folded: Dict[int, str] = {}
+        for tid, name in self.names.items():
+            folded = normalize(name)
+            self._folded[tid] = folded
+            for g in grams(folded):
+                self.postings.setdefault(g, set()).add(tid)
+        self._cache: Dict[str, FrozenSet[int]] = {}
+        self._lock = threading.Lock()
+
+    def _containing(self, term: str) -> Set[int]:
+        """이름에 term 이 들어가는 업종 키."""
+        if len(term) == 1:
+            return set(self.postings.get(term, ()))
+        lists = []
+        for i in range(len(term) - 1):
+            tids = self.postings.get(term[i:i + 2])
+            if not tids:
+                return set()
+            lists.append(tids)
+        lists.sort(key=len)
+        found = set(lists[0]).intersection(*lists[1:])
+        # 2-gram 이 모두 있어도 이어져 있지 않을 수 있으므로 후보 이름만 확인 (3글자 이상)
+        if len(term) > 2:
+            found = {tid for tid in found if term in self._folded[tid]}
+        return found
+
+    def resolve(self, query: str) -> FrozenSet[int]:
+        """검색어(와 동의어)에 맞는 업종 키 집합."""
+        q = normalize(query)
+        hit = self._cache.get(q)
+        if hit is not None:
+            return hit
+        ids: Set[int] = set()
+        for term in expand(q):
+            if term:
+                ids |= self._containing(term)
+        out = frozenset(ids)
+        with self._lock:
+            if len(self._cache) >= MAX_CACHED_QUERIES:
+                self._cache.clear()
+            self._cache[q] = out
+        return out
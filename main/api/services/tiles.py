@@ -0,0 +1,94 @@
+# api/services/tiles.py
+from __future__ import annotations
+
+import math
+from typing import Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+from api.models import Data, RecommendationTile
+from api.services.dataset import current_epoch
+from api.services.ranking import CANDIDATE_FIELDS, type_features
+from api.services.recommender import Recommender
+
+GRID_DEG = settings.RECOMMEND_TILE_GRID_DEG
+RADII = settings.RECOMMEND_TILE_RADII
+BBOX = settings.RECOMMEND_TILE_BBOX
+
+
+def cell_of(lat: float, lon: float) -> Tuple[int, int]:
+    """좌표가 속한 타일 (행, 열). 타일 중심 = (행, 열) x GRID_DEG."""
+    return round(lat / GRID_DEG), round(lon / GRID_DEG)
+
+
+def center(row: int, col: int) -> Tuple[float, float]:
+    return round(row * GRID_DEG, 6), round(col * GRID_DEG, 6)
+
+
+def covers(lat: float, lon: float, radius_km: float) -> bool:
+    min_lat, max_lat, min_lon, max_lon = BBOX
+    return (min_lat <= lat <= max_lat and min_lon <= lon <= max_lon
+            and round(radius_km, 1) in RADII)
+
+
+def grid_rows_cols() -> Tuple[range, range]:
+    min_lat, max_lat, min_lon, max_lon = BBOX
+    return (range(math.floor(min_lat / GRID_DEG), math.ceil(max_lat / GRID_DEG) + 1),
+            range(math.floor(min_lon / GRID_DEG), math.ceil(max_lon / GRID_DEG) + 1))
+
+
+def compact(results: List[dict], features_list: List[dict]) -> List[list]:
+    """rank_types 결과를 저장용 목록으로 (Data 값은 응답 시 다시 읽는다)."""
+    return [[r["business_type"], r["score"], r["count"], r["spot_id"], f["distance_km"], f["assumed_visit_rate"]]
+            for r, f in zip(results, features_list)]
+
+
+def lookup(lat: float, lon: float, radius_km: float):
+    """
+    사전 계산 타일이 있으면 (타일 중심 lat, lon, 결과 목록, 설명용 지표 목록, 실제 적용 반경 km), 없으면 None.
+    점수와 거리는 요청 좌표가 아닌 타일 중심 기준이다 (응답 origin 에 그 좌표를 싣는다).
+    타일은 데이터 세대(epoch)로 유효성을 보므로 단건 수정으로는 버리지 않는다. 대신 Data 값은 응답 때 다시 읽고,
+    대표 후보가 지워졌거나 비활성이면 None (실시간 계산으로). 범위 밖/버킷 아닌 반경/세대가 바뀐 경우도 None.
+    """
+    if not covers(lat, lon, radius_km):
+        return None
+    row, col = cell_of(lat, lon)
+    tile = (RecommendationTile.objects
+            .filter(epoch=current_epoch(), grid_deg=GRID_DEG, radius_km=round(radius_km, 1), row=row, col=col)
+            .values_list("payload", "effective_km").first())
+    if tile is None:
+        return None
+    payload, effective_km = tile
+    spots = Data.objects.filter(is_active=True).only(*CANDIDATE_FIELDS).in_bulk([p[3] for p in payload])
+    results, features_list = [], []
+    for btype, sc, count, spot_id, dist, rate in payload:
+        spot = spots.get(spot_id)
+        if spot is None:
+            return None
+        results.append({"business_type": btype, "score": sc, "count": count, "spot_id": spot_id})
+        features_list.append(type_features(btype, spot, dist, rate))
+    clat, clon = center(row, col)
+    return clat, clon, results, features_list, effective_km if effective_km is not None else round(radius_km, 1)
+
+
+# --- build_tiles 명령용 (워커 프로세스는 fork 로 아래 상태를 물려받는다) ---
+
+_engine: Optional[Recommender] = None
+
+
+def load_state() -> int:
+    """활성 Data 전체를 추천 엔진 스냅샷으로 한 번 적재한다. 행 수 반환."""
+    global _engine
+    _engine = Recommender.load()
+    return len(_engine)
+
+
+def rank_cell(row: int, col: int, radius_km: float) -> Tuple[List[list], float]:
+    """(저장용 결과 목록, 실제 적용 반경 km)"""
+    results, features_list, effective_km = _engine.recommend_types(*center(row, col), radius_km)
+    return compact(results, features_list), effective_km
+
+
+def build_row(row: int, cols: Iterable[int], radii: Iterable[float]) -> List[tuple]:
+    """격자 한 행의 모든 (열, 반경) 타일. [(row, col, radius_km, payload, effective_km), ...]"""
+    return [(row, col, r, *rank_cell(row, col, r)) for col in cols for r in radii]
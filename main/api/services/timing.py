@@ -0,0 +1,105 @@
+# api/services/timing.py
+# 요청 단계별 소요 시간 (후보 조회/점수/집계/설명/직렬화). Server-Timing 헤더, 구조화 로그, Prometheus 지표에 쓴다.
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# 히스토그램 상한(초). 마지막 +Inf 는 count 로 대신한다
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 현재 요청의 단계 → 누적 초. 미들웨어 밖(명령, 벤치마크)에서는 None 이라 지표만 남는다
+_spans: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_spans", default=None)
+
+
+class Histogram:
+    """누적 버킷 히스토그램 (프로세스 로컬, 스레드 안전)."""
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        i = bisect_left(BUCKETS, seconds)
+        with _lock:
+            if i < len(BUCKETS):
+                self.buckets[i] += 1
+            self.sum += seconds
+            self.count += 1
+
+
+_lock = threading.Lock()
+# (지표 이름, 레이블 이름, 레이블 값) → 히스토그램
+_hists: Dict[Tuple[str, str, str], Histogram] = {}
+
+
+def _hist(metric: str, label: str, value: str) -> Histogram:
+    key = (metric, label, value)
+    h = _hists.get(key)
+    if h is None:
+        with _lock:
+            h = _hists.setdefault(key, Histogram())
+    return h
+
+
+def begin() -> Token:
+    return _spans.set({})
+
+
+def end(token: Token) -> Dict[str, float]:
+    spans = _spans.get() or {}
+    _spans.reset(token)
+    return spans
+
+
+def record(stage: str, seconds: float) -> None:
+    """단계 시간을 현재 요청(있으면)과 단계별 히스토그램에 더한다."""
+    spans = _spans.get()
+    if spans is not None:
+        spans[stage] = spans.get(stage, 0.0) + seconds
+    _hist("api_stage_seconds", "stage", stage).observe(seconds)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - t0)
+
+
+def observe_request(route: str, seconds: float) -> None:
+    _hist("api_request_seconds", "route", route).observe(seconds)
+
+
+def server_timing(spans: Dict[str, float], total: float) -> str:
+    """Server-Timing 헤더 값 (ms)."""
+    parts = [f"{name};dur={sec * 1000:.1f}" for name, sec in spans.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def render_prometheus() -> str:
+    """Prometheus 텍스트 형식. 워커 프로세스마다 따로 집계된다."""
+    lines: List[str] = []
+    with _lock:
+        items = sorted((k, (list(h.buckets), h.sum, h.count)) for k, h in _hists.items())
+    seen = set()
+    for (metric, label, value), (buckets, total, count) in items:
+        if metric not in seen:
+            seen.add(metric)
+            lines.append(f"# TYPE {metric} histogram")
+        cum = 0
+        for le, n in zip(BUCKETS, buckets):
+            cum += n
+            lines.append(f'{metric}_bucket{{{label}="{value}",le="{le}"}} {cum}')
+        lines.append(f'{metric}_bucket{{{label}="{value}",le="+Inf"}} {count}')
+        lines.append(f'{metric}_sum{{{label}="{value}"}} {total:.6f}')
+        lines.append(f'{metric}_count{{{label}="{value}"}} {count}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,43 @@
+# api/signals.py
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Data
+from .services import spatial
+from .services.dataset import bump_version
+from .services.features import refresh_features
+
+_muted: ContextVar[bool] = ContextVar("data_signals_muted", default=False)
+
+
+@contextmanager
+def muted():
+    """대량 작업 중 행 단위 갱신을 끈다. 끝나면 호출한 쪽에서 bump_version() 할 것."""
+    token = _muted.set(True)
+    try:
+        yield
+    finally:
+        _muted.reset(token)
+
+
+@receiver(post_save, sender=Data)
+def data_saved(sender, instance: Data, **kwargs):
+    if _muted.get():
+        return
+    version = bump_version()
+    if instance.is_active:
+        spatial.apply_write(instance.pk, instance.latitude, instance.longitude, version)
+    else:
+        spatial.apply_write(instance.pk, None, None, version)
+    refresh_features([instance.pk])
+
+
+@receiver(post_delete, sender=Data)
+def data_deleted(sender, instance: Data, **kwargs):
+    if _muted.get():
+        return
+    version = bump_version()
+    spatial.apply_write(instance.pk, None, None, version)
@@ -0,0 +1,786 @@
+# api/tests.py
+# python manage.py test api
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+
+import numpy as np
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase
+from django.utils import timezone
+
+# llm_openai 는 import 할 때 OpenAI 클라이언트를 만든다 (키가 없으면 실패). 테스트는 가짜 클라이언트만 쓴다
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from api.models import (  # noqa: E402
+    AnalysisJob, AnalysisRequest, BusinessType, Data, FavoriteSpot, FavoriteType, RecommendationTile,
+    SpotRecommendation, TypeRecommendation, User,
+)
+from api import async_views, views  # noqa: E402
+from api.services import (  # noqa: E402
+    clusters, dataset, explain_cache, jobs, llm_openai, persistence, ranking, recommender, response_cache, spatial, synthetic,
+    tiles,
+)
+from api.services.scoring import aggregate_by_type, get_visit_rate, top_k  # noqa: E402
+from api.renderers import MARKER_COLUMNS  # noqa: E402
+from api.services.spatial import GridIndex  # noqa: E402
+from api.services.taxonomy import TypeIndex  # noqa: E402
+
+
+class GridIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.idx = GridIndex(cell_deg=0.01)
+        # 서울시청 근처 격자 3x3 (0.004도 간격) + 멀리 떨어진 점 하나
+        pk = 1
+        for i in range(3):
+            for j in range(3):
+                self.idx.add(pk, 37.560 + i * 0.004, 126.970 + j * 0.004)
+                pk += 1
+        self.idx.add(100, 37.700, 127.100)
+
+    def test_bbox_returns_sorted_ids_inside(self):
+        self.assertEqual(self.idx.bbox(37.559, 37.565, 126.969, 126.975), [1, 2, 4, 5])
+        self.assertEqual(self.idx.bbox(37.0, 38.0, 126.0, 128.0), [1, 2, 3, 4, 5, 6, 7, 8, 9, 100])
+        self.assertEqual(self.idx.bbox(37.565, 37.559, 126.969, 126.975), [])
+
+    def test_add_moves_and_remove_drops(self):
+        self.idx.add(1, 37.700, 127.100)
+        self.assertNotIn(1, self.idx.bbox(37.559, 37.565, 126.969, 126.975))
+        self.assertEqual(self.idx.bbox(37.699, 37.701, 127.099, 127.101), [1, 100])
+        self.idx.remove(100)
+        self.idx.remove(100)
+        self.assertEqual(self.idx.bbox(37.699, 37.701, 127.099, 127.101), [1])
+        self.assertEqual(len(self.idx), 10 - 1)
+
+    def test_radius_matches_bounding_box(self):
+        ids = self.idx.radius(37.564, 126.974, 0.3)
+        self.assertEqual(ids, [5])
+        self.assertEqual(self.idx.radius(37.564, 126.974, 2.0), list(range(1, 10)))
+
+    def test_nearest_keeps_radius_when_enough(self):
+        ids, km = self.idx.nearest(37.564, 126.974, 2.0, min_count=5)
+        self.assertEqual((ids, km), (list(range(1, 10)), 2.0))
+
+    def test_nearest_grows_until_min_count(self):
+        ids, km = self.idx.nearest(37.564, 126.974, 0.1, min_count=10, max_km=30.0)
+        self.assertEqual(ids, [1, 2, 3, 4, 5, 6, 7, 8, 9, 100])
+        self.assertGreater(km, 10.0)
+        self.assertLessEqual(km, 30.0)
+
+    def test_nearest_stops_at_max_km(self):
+        # max_km 안에 min_count 개가 없으면 찾은 것만, 반경은 가장 먼 점까지
+        ids, km = self.idx.nearest(37.564, 126.974, 0.1, min_count=10, max_km=2.0)
+        self.assertEqual(ids, list(range(1, 10)))
+        self.assertGreater(km, 0.5)
+        self.assertLess(km, 0.6)
+
+
+class ScoringTests(SimpleTestCase):
+    def test_top_k_orders_by_score_then_index(self):
+        scores = np.array([0.5, 0.9, 0.5, 0.1, 0.9])
+        self.assertEqual(top_k(scores, 3).tolist(), [1, 4, 0])
+        self.assertEqual(top_k(scores, 10).tolist(), [1, 4, 0, 2, 3])
+        self.assertEqual(top_k(scores, 0).tolist(), [])
+        self.assertEqual(top_k(np.array([]), 3).tolist(), [])
+
+    def test_aggregate_by_type_top3_mean_plus_count_bonus(self):
+        keys = [7, 3, 7, 7, 7, 3]
+        scores = np.array([0.1, 0.4, 0.9, 0.5, 0.7, 0.2])
+        out = aggregate_by_type(keys, scores)
+        # 등장 순서대로 (업종, 집계 점수, 개수, 최고점 후보 인덱스)
+        self.assertEqual([(k, n, best) for k, _, n, best in out], [(7, 4, 2), (3, 2, 1)])
+        self.assertAlmostEqual(out[0][1], (0.9 + 0.7 + 0.5) / 3 + np.log1p(4) * 0.02)
+        self.assertAlmostEqual(out[1][1], (0.4 + 0.2) / 2 + np.log1p(2) * 0.02)
+        self.assertEqual(aggregate_by_type([], np.array([])), [])
+
+
+class ImportDataTests(TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.rows = list(synthetic.rows(20, seed=3))
+
+    def _import(self, rows, **opts):
+        path = os.path.join(self.dir, "data.csv")
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            w = csv.writer(f)
+            w.writerow([h for h, _ in synthetic.CSV_COLUMNS])
+            for row in rows:
+                w.writerow(["" if row[k] is None else row[k] for _, k in synthetic.CSV_COLUMNS])
+        out = io.StringIO()
+        call_command("import_data", path=path, encoding="utf-8", stdout=out, **opts)
+        return out.getvalue()
+
+    def test_upsert_updates_changed_rows_only(self):
+        self._import(self.rows)
+        self.assertEqual(Data.objects.count(), 20)
+        ids = dict(Data.objects.values_list("code", "id"))
+
+        changed = [dict(r) for r in self.rows]
+        changed[0]["monthly_rent"] = 12345
+        out = self._import(changed, upsert=True)
+        self.assertIn("0 new, 1 updated, 19 unchanged", out)
+        self.assertEqual(dict(Data.objects.values_list("code", "id")), ids)
+        self.assertEqual(Data.objects.get(code=changed[0]["code"]).monthly_rent, 12345)
+
+    def test_tombstone_deactivates_missing_rows_and_revives_them(self):
+        self._import(self.rows)
+        out = self._import(self.rows[:15], upsert=True, tombstone=True)
+        self.assertIn("5 tombstoned", out)
+        inactive = set(Data.objects.filter(is_active=False).values_list("code", flat=True))
+        self.assertEqual(inactive, {r["code"] for r in self.rows[15:]})
+
+        out = self._import(self.rows, upsert=True, tombstone=True)
+        self.assertIn("5 updated", out)
+        self.assertIn("0 tombstoned", out)
+        self.assertFalse(Data.objects.filter(is_active=False).exists())
+
+
+class _JobFixture(TestCase):
+    def setUp(self):
+        self.user = User.objects.create()
+        self.bt = BusinessType.objects.create(name="카페")
+        self.ar = AnalysisRequest.objects.create(user=self.user, plan="A", latitude=37.5, longitude=127.0,
+                                                 business_type=self.bt)
+
+
+class JobClaimTests(_JobFixture):
+    def setUp(self):
+        super().setUp()
+        self.job = jobs.enqueue(self.ar)
+
+    def test_claim_takes_a_job_once(self):
+        job = jobs.claim("w1")
+        self.assertEqual(job.pk, self.job.pk)
+        self.assertEqual((job.status, job.locked_by, job.attempts), (AnalysisJob.RUNNING, "w1", 1))
+        self.assertIsNone(jobs.claim("w2"))
+
+    def test_claim_skips_jobs_waiting_for_retry(self):
+        AnalysisJob.objects.filter(pk=self.job.pk).update(available_at=timezone.now() + timedelta(seconds=60))
+        self.assertIsNone(jobs.claim("w1"))
+
+    def test_stale_lock_is_reclaimed(self):
+        jobs.claim("w1")
+        stale = timezone.now() - timedelta(seconds=settings.ANALYSIS_JOB_LOCK_TIMEOUT + 1)
+        AnalysisJob.objects.filter(pk=self.job.pk).update(locked_at=stale)
+        job = jobs.claim("w2")
+        self.assertEqual((job.locked_by, job.attempts), ("w2", 2))
+        # 잠금을 잃은 워커의 결과는 완료로 표시되지 않는다
+        with mock.patch.object(jobs, "compute", return_value=([], [])):
+            self.assertFalse(jobs.process(AnalysisJob.objects.get(pk=self.job.pk), "w1"))
+            self.assertTrue(jobs.process(job, "w2"))
+        self.assertEqual(AnalysisJob.objects.get(pk=self.job.pk).status, AnalysisJob.DONE)
+
+    def test_failures_back_off_then_fail(self):
+        with mock.patch.object(jobs, "compute", side_effect=RuntimeError("boom")):
+            for attempt in range(1, settings.ANALYSIS_JOB_MAX_ATTEMPTS + 1):
+                AnalysisJob.objects.filter(pk=self.job.pk).update(available_at=timezone.now())
+                job = jobs.claim("w1")
+                self.assertEqual(job.attempts, attempt)
+                self.assertFalse(jobs.process(job, "w1"))
+        job = AnalysisJob.objects.get(pk=self.job.pk)
+        self.assertEqual(job.status, AnalysisJob.FAILED)
+        self.assertIn("boom", job.error)
+        self.assertTrue(jobs.retry(job))
+        self.assertEqual(AnalysisJob.objects.get(pk=self.job.pk).status, AnalysisJob.QUEUED)
+
+
+def _fake_explain_many(features_list, lang="ko"):
+    return [f"why-{f['n']}" for f in features_list]
+
+
+@mock.patch("api.services.llm_openai.explain_many", _fake_explain_many)
+class PersistenceWriteTests(_JobFixture):
+    def setUp(self):
+        super().setUp()
+        self.spots = [Data.objects.create(code=f"T{i}", business_code="Q", business_types="카페", address=f"a{i}",
+                                          region_code="1", region="r", latitude=37.5, longitude=127.0, monthly_rent=10)
+                      for i in range(3)]
+
+    def _spot(self, i, score):
+        return persistence.Item(self.bt.id, score, {"n": i}, spot_id=self.spots[i].id)
+
+    def test_duplicates_collapse_to_one_row(self):
+        written = persistence.save_recommendations(
+            self.ar, [persistence.Item(self.bt.id, 2.0, {"n": 9}), persistence.Item(self.bt.id, 1.0, {"n": 8})],
+            [self._spot(0, 3.0), self._spot(0, 1.0), self._spot(1, 2.0)])
+        self.assertEqual(written, (1, 2))
+        self.assertEqual(list(TypeRecommendation.objects.values_list("score", "description")), [(2.0, "why-9")])
+        self.assertEqual(
+            list(SpotRecommendation.objects.order_by("spot_id").values_list("spot_id", "score", "description")),
+            [(self.spots[0].id, 3.0, "why-0"), (self.spots[1].id, 2.0, "why-1")])
+
+    def test_rewrite_updates_in_place_and_keeps_favorites(self):
+        persistence.save_recommendations(self.ar, [], [self._spot(0, 1.0), self._spot(1, 1.0), self._spot(2, 1.0)])
+        first = dict(SpotRecommendation.objects.values_list("spot_id", "id"))
+        saved = SpotRecommendation.objects.get(spot=self.spots[0])
+        saved.check_save = True
+        saved.save()
+        FavoriteSpot.objects.create(user=self.user, recommendation_id=first[self.spots[1].id])
+
+        # 다시 계산: 0 은 점수만 바뀜, 1/2 는 결과에서 빠짐
+        persistence.save_recommendations(self.ar, [], [self._spot(0, 5.0)])
+        rows = {r[0]: r[1:] for r in SpotRecommendation.objects.values_list("spot_id", "id", "score", "check_save", "description")}
+        self.assertEqual(rows[self.spots[0].id], (first[self.spots[0].id], 5.0, True, "why-0"))
+        # 즐겨찾기가 있는 행은 결과에서 빠져도 남고, 없는 미저장 행만 지운다
+        self.assertIn(self.spots[1].id, rows)
+        self.assertNotIn(self.spots[2].id, rows)
+        self.assertEqual(FavoriteSpot.objects.count(), 1)
+
+    def test_existing_description_is_reused(self):
+        persistence.save_recommendations(self.ar, [persistence.Item(self.bt.id, 1.0, {"n": 1})], [])
+        TypeRecommendation.objects.update(description="kept")
+        FavoriteType.objects.create(user=self.user, recommendation=TypeRecommendation.objects.get())
+        with mock.patch("api.services.llm_openai.explain_many") as explain:
+            persistence.save_recommendations(self.ar, [persistence.Item(self.bt.id, 4.0, {"n": 2})], [])
+        explain.assert_not_called()
+        self.assertEqual(list(TypeRecommendation.objects.values_list("score", "description")), [(4.0, "kept")])
+
+
+class FakeAsyncOpenAI:
+    """chat.completions.create 만 흉내. fail 에 든 n 은 예외, 나머지는 "llm-n"."""
+    calls = []
+    fail = set()
+
+    def __init__(self, **kwargs):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def _create(self, model, messages, **kwargs):
+        n = json.loads(messages[-1]["content"].split("JSON:\n", 1)[1])["n"]
+        FakeAsyncOpenAI.calls.append(n)
+        if n in FakeAsyncOpenAI.fail:
+            raise RuntimeError("rate limited")
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=f" llm-{n} "))])
+
+
+@mock.patch("api.services.llm_openai.AsyncOpenAI", FakeAsyncOpenAI)
+class ExplainManyTests(TestCase):
+    def setUp(self):
+        explain_cache.clear_local()
+        FakeAsyncOpenAI.calls = []
+        FakeAsyncOpenAI.fail = set()
+
+    def test_order_dedup_and_cache(self):
+        feats = [{"n": 1}, {"n": 2}, {"n": 1}]
+        self.assertEqual(llm_openai.explain_many(feats), ["llm-1", "llm-2", "llm-1"])
+        self.assertEqual(sorted(FakeAsyncOpenAI.calls), [1, 2])
+
+        # 두 번째는 캐시에서 (LLM 호출 없음)
+        FakeAsyncOpenAI.calls = []
+        self.assertEqual(llm_openai.explain_many([{"n": 2}, {"n": 1}]), ["llm-2", "llm-1"])
+        self.assertEqual(FakeAsyncOpenAI.calls, [])
+        # 프로세스 캐시를 비워도 DB 캐시에서
+        explain_cache.clear_local()
+        self.assertEqual(llm_openai.explain_many([{"n": 1}]), ["llm-1"])
+        self.assertEqual(FakeAsyncOpenAI.calls, [])
+
+    def test_failures_fall_back_and_are_not_cached(self):
+        FakeAsyncOpenAI.fail = {3}
+        feats = [{"n": 3, "business_type": "카페", "daily_footfall_avg": 1000}, {"n": 4}]
+        out = llm_openai.explain_many(feats)
+        self.assertEqual(out[0], llm_openai._fallback(feats[0]))
+        self.assertEqual(out[1], "llm-4")
+
+        FakeAsyncOpenAI.fail = set()
+        FakeAsyncOpenAI.calls = []
+        self.assertEqual(llm_openai.explain_many(feats), ["llm-3", "llm-4"])
+        self.assertEqual(FakeAsyncOpenAI.calls, [3])
+
+
+class BuildTilesTests(TransactionTestCase):
+    # 워커 fork 전 연결 정리가 트랜잭션 안에서 일어나지 않는지 보려면 실제 커밋이 필요하다
+    def setUp(self):
+        for i, btype in enumerate(["카페", "카페", "편의점"]):
+            Data.objects.create(code=f"T{i}", business_code="Q", business_types=btype, address=f"a{i}",
+                                region_code="1", region="r", latitude=37.5 + i * 0.001, longitude=127.0,
+                                monthly_rent=10, daily_footfall_avg=1000)
+        row, col = tiles.cell_of(37.5, 127.0)
+        grid = mock.patch("api.services.tiles.grid_rows_cols", return_value=(range(row, row + 2), range(col, col + 2)))
+        grid.start()
+        self.addCleanup(grid.stop)
+
+    def test_workers_compute_outside_the_transaction(self):
+        close_all = connections.close_all
+
+        def closing():
+            self.assertFalse(connection.in_atomic_block)
+            close_all()
+
+        with mock.patch.object(connections, "close_all", side_effect=closing) as closed:
+            call_command("build_tiles", workers=2, stdout=io.StringIO())
+        closed.assert_called()
+        self.assertEqual(RecommendationTile.objects.count(), 2 * 2 * len(tiles.RADII))
+
+        found = tiles.lookup(37.5, 127.0, tiles.RADII[0])
+        self.assertIsNotNone(found)
+        self.assertEqual({r["business_type"] for r in found[2]}, {"카페", "편의점"})
+
+
+SPOTS = [("카페", 0.000), ("커피전문점", 0.002), ("편의점", 0.004), ("음식점", 0.006), ("카페", 0.008)]
+
+
+def _add_spots():
+    """37.5, 127.0 에서 북쪽으로 줄지어 선 후보 입지."""
+    return [Data.objects.create(code=f"S{i}", business_code="Q", business_types=btype, address=f"a{i}",
+                                region_code="1", region="r", latitude=37.5 + dlat, longitude=127.0,
+                                monthly_rent=100 + i, daily_footfall_avg=1000 * (i + 1), floor=1)
+            for i, (btype, dlat) in enumerate(SPOTS)]
+
+
+def _reset_engine():
+    # 테스트마다 DB 가 되돌아가 같은 데이터 버전 번호가 다시 나오므로 프로세스 안 스냅샷/캐시를 비운다
+    spatial._index = None
+    recommender._engine = None
+    clusters._clusters = None
+    response_cache.clear()
+
+
+def _fake_why(features_list, lang="ko"):
+    return [f"why-{f['distance_km']}" for f in features_list]
+
+
+async def _afake_why(features_list, lang="ko"):
+    return _fake_why(features_list, lang)
+
+
+@mock.patch.multiple("api.services.llm_openai", explain_many=_fake_why, aexplain_many=_afake_why)
+class AsyncRecommendViewTests(TransactionTestCase):
+    # 풀 스레드가 따로 연결을 열므로 커밋된 데이터가 필요하다
+    def setUp(self):
+        _add_spots()
+        _reset_engine()
+
+    async def _both(self, sync_view, async_view, params, **headers):
+        sync_resp = await sync_to_async(
+            lambda: sync_view.as_view()(RequestFactory().get("/", params, headers=headers)).render())()
+        async_resp = await async_view.as_view()(AsyncRequestFactory().get("/", params, headers=headers))
+        return sync_resp, async_resp
+
+    async def test_types_match_the_sync_view(self):
+        sync_resp, async_resp = await self._both(views.RecommendBusinessTypes, async_views.RecommendBusinessTypesAsync,
+                                                 {"lat": 37.5, "lon": 127.0, "radius_km": 1})
+        body = json.loads(async_resp.content)
+        self.assertEqual(async_resp.status_code, 200)
+        self.assertEqual(body, json.loads(sync_resp.content))
+        self.assertTrue(body["results"])
+        self.assertLessEqual({r["business_type"] for r in body["results"]}, {"카페", "커피전문점", "편의점", "음식점"})
+        self.assertTrue(all(r["why"].startswith("why-") for r in body["results"]))
+        self.assertEqual(async_resp["Content-Type"], sync_resp["Content-Type"])
+        self.assertEqual(async_resp["Vary"], sync_resp["Vary"])
+
+    async def test_spots_match_the_sync_view(self):
+        sync_resp, async_resp = await self._both(views.RecommendSpotsByType, async_views.RecommendSpotsByTypeAsync,
+                                                 {"type": "카페", "lat": 37.5, "lon": 127.0, "why": "lazy"})
+        body = json.loads(async_resp.content)
+        self.assertEqual(body, json.loads(sync_resp.content))
+        self.assertTrue(all(r["why"] is None and r["why_url"] for r in body["results"]))
+
+    async def test_errors_and_unacceptable_formats(self):
+        sync_resp, async_resp = await self._both(views.RecommendBusinessTypes, async_views.RecommendBusinessTypesAsync,
+                                                 {"lat": "x", "lon": 127.0})
+        self.assertEqual((async_resp.status_code, json.loads(async_resp.content)),
+                         (sync_resp.status_code, json.loads(sync_resp.content)))
+        sync_resp, async_resp = await self._both(views.RecommendBusinessTypes, async_views.RecommendBusinessTypesAsync,
+                                                 {"lat": 37.5, "lon": 127.0}, Accept="text/csv")
+        self.assertEqual((async_resp.status_code, sync_resp.status_code), (406, 406))
+
+    async def test_pool_closes_stale_connections_around_each_call(self):
+        with mock.patch("api.async_views.close_old_connections") as close:
+            self.assertEqual(await async_views._in_pool(lambda x: x + 1)(1), 2)
+        self.assertEqual(close.call_count, 2)
+
+    def test_base_view_requires_respond(self):
+        with self.assertRaises(TypeError):
+            async_views._AsyncRecommendView()
+
+
+class TypeIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.idx = TypeIndex({1: "카페", 2: "커피전문점", 3: "편의점", 4: "한식 음식점", 5: "Bakery Cafe", 6: "분식"})
+
+    def test_substring_and_synonyms(self):
+        self.assertEqual(self.idx.resolve("카페"), {1, 2})
+        self.assertEqual(self.idx.resolve(" 커피 "), {1, 2})
+        self.assertEqual(self.idx.resolve("식당"), {4})
+        self.assertEqual(self.idx.resolve("CAFE"), {5})
+        self.assertEqual(self.idx.resolve("편의"), {3})
+
+    def test_every_gram_must_line_up(self):
+        # "분식" 과 "식점" 은 각각 다른 이름에만 있다
+        self.assertEqual(self.idx.resolve("분식점"), set())
+        self.assertEqual(self.idx.resolve("없는업종"), set())
+
+    def test_synonyms_share_the_visit_rate(self):
+        self.assertEqual(get_visit_rate("커피"), get_visit_rate("카페"))
+        self.assertEqual(get_visit_rate("커피전문점"), get_visit_rate("카페"))
+        self.assertEqual(get_visit_rate("헤어샵"), get_visit_rate("미용실"))
+        self.assertEqual(get_visit_rate("분식"), 0.025)
+
+
+class TypeCandidateTests(SimpleTestCase):
+    def setUp(self):
+        self.idx = GridIndex(cell_deg=0.01)
+        # 0.5km, 1km, 2km 북쪽
+        for pk, dlat in ((1, 0.0045), (2, 0.009), (3, 0.018)):
+            self.idx.add(pk, 37.5 + dlat, 127.0)
+
+    def test_radius_grows_only_when_empty_by_default(self):
+        self.assertEqual(ranking.type_candidate_ids(self.idx, 37.5, 127.0, 0.7), ([1], 0.7))
+        ids, km = ranking.type_candidate_ids(self.idx, 37.5, 127.0, 0.2)
+        self.assertEqual(ids, [1])
+        self.assertTrue(0.2 < km < 0.6)
+
+    @mock.patch("api.services.ranking.MIN_TYPE_CANDIDATES", 3)
+    def test_threshold_fills_up_to_the_setting(self):
+        ids, km = ranking.type_candidate_ids(self.idx, 37.5, 127.0, 0.7)
+        self.assertEqual(ids, [1, 2, 3])
+        self.assertTrue(1.9 < km < 2.1)
+
+
+class DataPaginationTests(TestCase):
+    BBOX = {"min_lat": 37.4, "max_lat": 37.6, "min_lon": 126.9, "max_lon": 127.1}
+
+    def setUp(self):
+        self.ids = [d.id for d in _add_spots()]
+        _reset_engine()
+
+    def _walk(self, url, params, key):
+        pages, body = [], self.client.get(url, params).json()
+        while True:
+            pages.append([r["id"] for r in body["results"]])
+            if not body[key]:
+                return pages, body
+            body = self.client.get(body[key]).json()
+
+    def test_bbox_pages_forward_and_back(self):
+        pages, last = self._walk("/api/v1/data/by_bbox/", {**self.BBOX, "page_size": 2}, "next")
+        self.assertEqual(pages, [self.ids[0:2], self.ids[2:4], self.ids[4:5]])
+        back, first = self._walk(last["previous"], {}, "previous")
+        self.assertEqual(back, [self.ids[2:4], self.ids[0:2]])
+        self.assertIsNone(first["previous"])
+        self.assertEqual(self.client.get(first["next"]).json()["results"][0]["id"], self.ids[2])
+
+    def test_bbox_and_list_share_the_page_shape(self):
+        listed = self.client.get("/api/v1/data/", {"page_size": 2}).json()
+        boxed = self.client.get("/api/v1/data/by_bbox/", {**self.BBOX, "page_size": 2}).json()
+        self.assertEqual(listed["results"], boxed["results"])
+        self.assertEqual(set(listed), set(boxed))
+
+    def test_markers_carry_cursor_headers(self):
+        resp = self.client.get("/api/v1/data/by_bbox/", {**self.BBOX, "page_size": 2, "format": "columnar"})
+        body = resp.json()
+        self.assertEqual(body["id"], self.ids[0:2])
+        self.assertEqual(resp["X-Next"], body["next"])
+        self.assertNotIn("X-Previous", resp)
+        resp = self.client.get(body["next"])
+        self.assertEqual(resp.json()["id"], self.ids[2:4])
+        self.assertEqual(resp["X-Previous"], resp.json()["previous"])
+
+
+class _RecommendFixture(TestCase):
+    def setUp(self):
+        self.spots = _add_spots()
+        _reset_engine()
+
+    def get(self, url, params):
+        resp = self.client.get(url, params)
+        self.assertEqual(resp.status_code, 200, resp.content)
+        return resp.json()
+
+
+@mock.patch("api.services.llm_openai.explain_many", side_effect=_fake_why)
+class LazyWhyTests(_RecommendFixture):
+    def test_only_the_returned_types_are_explained(self, explain):
+        body = self.get("/api/v1/recommendations/types/", {"lat": 37.5, "lon": 127.0, "radius_km": 1})
+        self.assertEqual(len(body["results"]), 3)
+        explain.assert_called_once()
+        self.assertEqual(len(explain.call_args.args[0]), 3)
+        self.assertTrue(all(r["why"].startswith("why-") for r in body["results"]))
+
+    def test_lazy_why_defers_to_the_why_endpoint(self, explain):
+        body = self.get("/api/v1/recommendations/spots/", {"type": "카페", "lat": 37.5, "lon": 127.0, "why": "lazy"})
+        explain.assert_not_called()
+        first = body["results"][0]
+        self.assertIsNone(first["why"])
+        why = self.get(first["why_url"], {})
+        self.assertEqual((why["spot_id"], why["business_type"]), (first["id"], "카페"))
+        self.assertTrue(why["why"].startswith("why-"))
+        explain.assert_called_once()
+
+    def test_why_endpoint_validates_its_query(self, explain):
+        self.assertEqual(self.client.get("/api/v1/recommendations/why/", {"type": "카페"}).status_code, 400)
+        resp = self.client.get("/api/v1/recommendations/why/", {"scope": "types", "spot": self.spots[0].id, "type": "카페"})
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(self.client.get("/api/v1/recommendations/why/", {"spot": 999999, "type": "카페"}).status_code, 404)
+
+
+@mock.patch("api.services.llm_openai.explain_many", _fake_why)
+class ResponseCacheTests(_RecommendFixture):
+    def _counting(self, view):
+        return mock.patch.object(view, "_rank", autospec=True, side_effect=view._rank)
+
+    def test_nearby_origins_share_one_computation(self):
+        with self._counting(views.RecommendBusinessTypes) as rank:
+            a = self.get("/api/v1/recommendations/types/", {"lat": 37.50001, "lon": 127.00002, "radius_km": 1})
+            b = self.get("/api/v1/recommendations/types/", {"lat": 37.50032, "lon": 126.99991, "radius_km": 1.04})
+            self.assertEqual(rank.call_count, 1)
+            self.assertEqual(a, b)
+            self.assertEqual(a["origin"], {"lat": 37.5, "lon": 127.0})
+            self.get("/api/v1/recommendations/types/", {"lat": 37.502, "lon": 127.0, "radius_km": 1})
+            self.assertEqual(rank.call_count, 2)
+
+    def test_type_spelling_is_normalized_into_the_key(self):
+        with self._counting(views.RecommendSpotsByType) as rank:
+            a = self.get("/api/v1/recommendations/spots/", {"type": "카페", "lat": 37.5, "lon": 127.0})
+            b = self.get("/api/v1/recommendations/spots/", {"type": "  카페 ", "lat": 37.5001, "lon": 127.0})
+        self.assertEqual(rank.call_count, 1)
+        self.assertEqual(a, b)
+
+    def test_data_changes_invalidate_cached_results(self):
+        params = {"type": "카페", "lat": 37.5, "lon": 127.0}
+        before = self.get("/api/v1/recommendations/spots/", params)
+        self.spots[0].monthly_rent = 99999
+        self.spots[0].save()
+        with self._counting(views.RecommendSpotsByType) as rank:
+            after = self.get("/api/v1/recommendations/spots/", params)
+        self.assertEqual(rank.call_count, 1)
+        rent = {r["id"]: r["monthly_rent"] for r in after["results"]}
+        self.assertEqual(rent[self.spots[0].id], 99999)
+        self.assertNotEqual(before, after)
+        self.assertGreater(self.get("/api/v1/cache/stats/", {})["responses"]["size"], 0)
+
+
+@mock.patch("api.services.llm_openai.explain_many", side_effect=_fake_why)
+class BatchRecommendTests(_RecommendFixture):
+    def post(self, payload):
+        return self.client.post("/api/v1/recommendations/batch/", payload, content_type="application/json")
+
+    def lines(self, payload):
+        resp = self.post(payload)
+        self.assertEqual(resp["Content-Type"], "application/x-ndjson")
+        return [json.loads(line) for line in b"".join(resp.streaming_content).decode().splitlines()]
+
+    def test_lines_follow_query_order_with_errors_inline(self, explain):
+        lines = self.lines({"queries": [
+            {"lat": 37.5, "lon": 127.0, "radius_km": 1},
+            {"type": "카페"},
+            {"lat": 37.5},
+            "nope",
+        ]})
+        self.assertEqual([line["index"] for line in lines], [0, 1, 2, 3])
+        self.assertEqual((lines[0]["scope"], lines[1]["scope"]), ("types", "spots"))
+        self.assertIn("effective_radius_km", lines[0])
+        self.assertTrue(lines[0]["results"] and lines[1]["results"])
+        self.assertIn("error", lines[2])
+        self.assertIn("error", lines[3])
+        # 기본은 why=lazy: 설명 없이 why_url 만
+        explain.assert_not_called()
+        self.assertTrue(all(r["why"] is None and r["why_url"] for r in lines[0]["results"]))
+
+    def test_single_and_batch_answers_agree(self, explain):
+        single = self.get("/api/v1/recommendations/types/", {"lat": 37.5, "lon": 127.0, "radius_km": 1, "why": "lazy"})
+        line = self.lines({"queries": [{"lat": 37.5, "lon": 127.0, "radius_km": 1}]})[0]
+        self.assertEqual(line["results"], single["results"])
+
+    def test_full_why_explains_in_groups(self, explain):
+        n = views.RecommendBatch.EXPLAIN_GROUP + 1
+        lines = self.lines({"queries": [{"type": "카페", "lat": 37.5, "lon": 127.0}] * n, "why": "full"})
+        self.assertEqual(len(lines), n)
+        self.assertEqual(explain.call_count, 2)
+        self.assertTrue(all(r["why"].startswith("why-") for line in lines for r in line["results"]))
+
+    def test_rejects_missing_or_oversized_batches(self, explain):
+        self.assertEqual(self.post({}).status_code, 400)
+        self.assertEqual(self.post({"queries": []}).status_code, 400)
+        with mock.patch.object(views.RecommendBatch, "MAX_QUERIES", 2):
+            self.assertEqual(self.post({"queries": [{"type": "카페"}] * 3}).status_code, 400)
+
+
+@mock.patch("api.services.llm_openai.explain_many", _fake_why)
+class TileLookupTests(_RecommendFixture):
+    def setUp(self):
+        super().setUp()
+        self.row, self.col = tiles.cell_of(37.5003, 127.0003)
+        with mock.patch("api.services.tiles.grid_rows_cols",
+                        return_value=(range(self.row, self.row + 1), range(self.col, self.col + 1))):
+            call_command("build_tiles", workers=1, stdout=io.StringIO())
+
+    def _types(self, radius_km=1):
+        with mock.patch.object(views.RecommendBusinessTypes, "_rank", autospec=True,
+                               side_effect=views.RecommendBusinessTypes._rank) as rank:
+            body = self.get("/api/v1/recommendations/types/", {"lat": 37.5003, "lon": 127.0003, "radius_km": radius_km})
+        return body, rank.call_count
+
+    def test_bucket_radius_is_served_from_the_tile(self):
+        body, computed = self._types()
+        self.assertEqual(computed, 0)
+        self.assertEqual(body["origin"], dict(zip(("lat", "lon"), tiles.center(self.row, self.col))))
+        self.assertTrue(body["results"])
+        # 버킷이 아닌 반경은 실시간 계산
+        self.assertEqual(self._types(radius_km=2)[1], 1)
+
+    def test_tiles_stay_valid_across_single_edits(self):
+        self.spots[1].monthly_rent = 5
+        self.spots[1].save()
+        body, computed = self._types()
+        self.assertEqual(computed, 0)
+        self.assertTrue(body["results"])
+
+    def test_new_epoch_or_missing_spot_falls_back_to_live_scoring(self):
+        payload = RecommendationTile.objects.get(radius_km=1.0).payload
+        Data.objects.filter(id=payload[0][3]).update(is_active=False)
+        self.assertEqual(self._types()[1], 1)
+        Data.objects.filter(id=payload[0][3]).update(is_active=True)
+        dataset.bump_epoch()
+        self.assertIsNone(tiles.lookup(37.5003, 127.0003, 1))
+
+
+class MarkerFormatTests(_RecommendFixture):
+    BBOX = DataPaginationTests.BBOX
+
+    def test_columnar_matches_the_row_listing(self):
+        rows = self.get("/api/v1/data/by_bbox/", self.BBOX)["results"]
+        cols = self.get("/api/v1/data/by_bbox/", {**self.BBOX, "format": "columnar"})
+        self.assertEqual(cols["count"], len(rows))
+        self.assertEqual(cols["id"], [r["id"] for r in rows])
+        self.assertEqual(cols["lat"], [r["latitude"] for r in rows])
+        self.assertEqual(cols["rent"], [r["monthly_rent"] for r in rows])
+        self.assertEqual(cols["floor"], [1] * len(rows))
+
+    def test_binary_packs_typed_columns(self):
+        Data.objects.filter(id=self.spots[0].id).update(floor=None)
+        resp = self.client.get("/api/v1/data/by_bbox/", {**self.BBOX, "format": "bin"})
+        self.assertEqual(resp["Content-Type"], "application/octet-stream")
+        buf = resp.content
+        n = int(np.frombuffer(buf, dtype="<u4", count=1)[0])
+        self.assertEqual(n, len(self.spots))
+        offset, cols = 4, {}
+        for name, dtype in MARKER_COLUMNS:
+            cols[name] = np.frombuffer(buf, dtype=dtype, count=n, offset=offset)
+            offset += cols[name].nbytes
+        self.assertEqual(offset, len(buf))
+        self.assertEqual(cols["id"].tolist(), [d.id for d in self.spots])
+        np.testing.assert_allclose(cols["lat"], [d.latitude for d in self.spots], atol=1e-5)
+        self.assertEqual(cols["floor"].tolist(), [-1] + [1] * (n - 1))
+        self.assertEqual(cols["footfall"].tolist(), [d.daily_footfall_avg for d in self.spots])
+
+    def test_binary_errors_stay_json(self):
+        resp = self.client.get("/api/v1/data/by_bbox/", {"format": "bin"})
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp["Content-Type"], "application/json")
+        self.assertIn("detail", resp.json())
+
+
+class ClusterTests(_RecommendFixture):
+    BBOX = DataPaginationTests.BBOX
+
+    def clusters(self, zoom, **params):
+        return self.get("/api/v1/data/by_bbox/", {**self.BBOX, "zoom": zoom, **params})
+
+    def test_low_zoom_aggregates_and_high_zoom_lists_points(self):
+        call_command("build_clusters", stdout=io.StringIO())
+        far = self.clusters(clusters.MIN_ZOOM + 4)
+        self.assertEqual(len(far["clusters"]), 1)
+        self.assertEqual(far["clusters"][0]["count"], len(self.spots))
+        self.assertEqual(far["clusters"][0]["avg_rent"], 102.0)
+        self.assertAlmostEqual(far["clusters"][0]["lat"], 37.504, places=6)
+
+        near = self.clusters(clusters.MAX_ZOOM - 1)
+        self.assertGreater(len(near["clusters"]), 1)
+        self.assertEqual(sum(c["count"] for c in near["clusters"]), len(self.spots))
+        self.assertEqual(len(self.clusters(clusters.MAX_ZOOM)["results"]), len(self.spots))
+
+    def test_columnar_clusters_and_no_binary(self):
+        call_command("build_clusters", stdout=io.StringIO())
+        cols = self.clusters(clusters.MIN_ZOOM, format="columnar")
+        self.assertEqual((cols["clusters"], cols["count"]), (1, [len(self.spots)]))
+        resp = self.client.get("/api/v1/data/by_bbox/", {**self.BBOX, "zoom": clusters.MIN_ZOOM, "format": "bin"})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_missing_build_falls_back_to_memory(self):
+        with self.assertLogs("api.services.clusters", "WARNING"):
+            live = self.clusters(clusters.MAX_ZOOM - 1)
+        call_command("build_clusters", stdout=io.StringIO())
+        self.assertEqual(self.clusters(clusters.MAX_ZOOM - 1), live)
+
+
+async def _afake_stream(features_list, lang="ko", deltas=False):
+    # 뒤에서부터 끝나는 것처럼
+    for i in reversed(range(len(features_list))):
+        if deltas:
+            yield i, "wh", False
+        yield i, f"why-{i}", True
+
+
+async def _afail_stream(features_list, lang="ko", deltas=False):
+    yield 0, "why-0", True
+    raise RuntimeError("stream dropped")
+
+
+@mock.patch("api.services.llm_openai.astream_many", _afake_stream)
+class StreamingRecommendTests(TransactionTestCase):
+    def setUp(self):
+        _add_spots()
+        _reset_engine()
+
+    async def stream(self, **params):
+        view = async_views.RecommendSpotsByTypeAsync if "type" in params else async_views.RecommendBusinessTypesAsync
+        resp = await view.as_view()(AsyncRequestFactory().get("/", {"lat": 37.5, "lon": 127.0, **params}))
+        self.assertEqual(resp["Cache-Control"], "no-cache")
+        return resp, b"".join([chunk async for chunk in resp.streaming_content]).decode()
+
+    async def test_ndjson_sends_scores_first_then_whys(self):
+        resp, body = await self.stream(radius_km=1, stream="ndjson")
+        self.assertEqual(resp["Content-Type"], "application/x-ndjson; charset=utf-8")
+        events = [json.loads(line) for line in body.splitlines()]
+        head, *whys, done = events
+        self.assertEqual(head["event"], "results")
+        self.assertTrue(all(r["why"] is None for r in head["results"]))
+        self.assertEqual(head["origin"], {"lat": 37.5, "lon": 127.0})
+        self.assertEqual([(e["event"], e["index"]) for e in whys],
+                         [("why", i) for i in reversed(range(len(head["results"])))])
+        self.assertEqual(done, {"event": "done"})
+
+    async def test_sse_frames_and_deltas(self):
+        resp, body = await self.stream(type="카페", stream="sse", deltas="1")
+        self.assertEqual(resp["Content-Type"], "text/event-stream; charset=utf-8")
+        frames = [f.split("\n") for f in body.strip().split("\n\n")]
+        names = [f[0].removeprefix("event: ") for f in frames]
+        self.assertEqual((names[0], names[-1]), ("results", "done"))
+        self.assertIn("delta", names)
+        n = len(json.loads(frames[0][1].removeprefix("data: "))["results"])
+        self.assertEqual(names.count("why"), n)
+
+    async def test_lazy_stream_ends_after_results(self):
+        _, body = await self.stream(type="카페", stream="ndjson", why="lazy")
+        events = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([e["event"] for e in events], ["results", "done"])
+        self.assertTrue(all(r["why_url"] for r in events[0]["results"]))
+
+    async def test_broken_stream_falls_back_for_the_rest(self):
+        with mock.patch("api.services.llm_openai.astream_many", _afail_stream):
+            _, body = await self.stream(radius_km=1, stream="ndjson")
+        events = [json.loads(line) for line in body.splitlines()]
+        whys = {e["index"]: e["why"] for e in events if e["event"] == "why"}
+        self.assertEqual(whys.pop(0), "why-0")
+        self.assertEqual(len(whys), len(events[0]["results"]) - 1)
+        self.assertTrue(all(not w.startswith("why-") for w in whys.values()))
+        self.assertEqual(events[-1]["event"], "done")
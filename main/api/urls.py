@@ -1,12 +1,15 @@
 # api/urls.py
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     UserViewSet, BusinessTypeViewSet, DataViewSet,
     AnalysisRequestViewSet, TypeRecommendationViewSet, SpotRecommendationViewSet,
     FavoriteTypeViewSet, FavoriteSpotViewSet,
-    RecommendBusinessTypes, RecommendSpotsByType
+    RecommendBusinessTypes, RecommendSpotsByType, RecommendBatch, RecommendWhy,
+    CacheStats, metrics,
 )
+from .async_views import RecommendBusinessTypesAsync, RecommendSpotsByTypeAsync
 
 router = DefaultRouter()
 router.register(r"users", UserViewSet, basename="user")
@@ -21,6 +24,14 @@ router.register(r"favorite-spots", FavoriteSpotViewSet, basename="favorite-spot"
 urlpatterns = [
     path("", include(router.urls)),  # 여기에는 api/v1/ 안 붙임
 
-    path("recommendations/types/", RecommendBusinessTypes.as_view(), name="recommend-types"),
-    path("recommendations/spots/", RecommendSpotsByType.as_view(), name="recommend-spots-by-type"),
+    path("recommendations/types/",
+         (RecommendBusinessTypesAsync if settings.RECOMMEND_ASYNC else RecommendBusinessTypes).as_view(),
+         name="recommend-types"),
+    path("recommendations/spots/",
+         (RecommendSpotsByTypeAsync if settings.RECOMMEND_ASYNC else RecommendSpotsByType).as_view(),
+         name="recommend-spots-by-type"),
+    path("recommendations/batch/", RecommendBatch.as_view(), name="recommend-batch"),
+    path("recommendations/why/", RecommendWhy.as_view(), name="recommend-why"),
+    path("cache/stats/", CacheStats.as_view(), name="cache-stats"),
+    path("metrics/", metrics, name="metrics"),
 ]
@@ -1,94 +1,44 @@
 from __future__ import annotations
 
+import json
+import logging
 import math
-from typing import List, Dict, Any
-from collections import defaultdict
+from typing import List
+from urllib.parse import urlencode
 
+import numpy as np
+from django.conf import settings
 from django.db import transaction
-from django.db.models import QuerySet
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import viewsets, status
+from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
 from .models import (
-    User, BusinessType, Data, AnalysisRequest,
+    User, BusinessType, Data, AnalysisRequest, AnalysisJob,
     TypeRecommendation, SpotRecommendation,
     FavoriteType, FavoriteSpot,
 )
 from .serializers import (
     UserSerializer, BusinessTypeSerializer, DataSerializer, AnalysisRequestSerializer,
     TypeRecommendationSerializer, SpotRecommendationSerializer,
-    FavoriteTypeSerializer, FavoriteSpotSerializer,
+    FavoriteTypeSerializer, FavoriteSpotSerializer, DATA_FIELDS,
 )
+from .pagination import IdCursorPagination
+from .renderers import ColumnarJSONRenderer, MarkerBinaryRenderer
+from .services.spatial import get_index, fetch_values
+from .services import clusters, jobs, response_cache, scoring, tiles, timing
+from .services.scoring import get_visit_rate
+from .services.recommender import get_recommender
+from .services.ranking import int_or_none as _int_or_none, spot_features, type_features
 
-VISIT_RATE_BY_TYPE = {
-    "편의점": 0.040,
-    "카페": 0.035,
-    "음식점": 0.050,
-    "식당": 0.050,
-    "미용": 0.015,
-    "헤어": 0.015,
-    "약국": 0.020,
-}
-DEFAULT_VISIT_RATE = 0.025
-
-def get_visit_rate(btype: str | None) -> float:
-    bt = (btype or "").strip()
-    for k, v in VISIT_RATE_BY_TYPE.items():
-        if k in bt:
-            return float(v)
-    return float(DEFAULT_VISIT_RATE)
-
-def _int_or_none(x):
-    try:
-        return int(x) if x is not None else None
-    except:
-        return None
-    
-def _to_five_point_scaler(values: list[float]):
-    if not values:
-        return lambda x: "0.00"
-    vmin = min(values)
-    vmax = max(values)
-    denom = vmax - vmin
-    def _scale(x: float) -> str:
-        if denom <= 1e-12:
-            val = 5.0
-        else:
-            n = (x - vmin) / denom
-            n = max(0.0, min(1.0, n))
-            val = n * 5.0
-        return f"{val:.2f}"
-    return _scale
-
-def haversine_km(lat1, lon1, lat2, lon2):
-    R = 6371.0
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    a = (math.sin(dlat/2)**2 +
-         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon/2)**2)
-    return 2 * R * math.asin(math.sqrt(a))
-
-def minmax(vals: List[float]):
-    vals = [v for v in vals if v is not None]
-    if not vals:
-        return (0.0, 1.0)
-    vmin, vmax = min(vals), max(vals)
-    if vmax == vmin:
-        return (vmin, vmax + 1e-9)
-    return vmin, vmax
-
-def norm(x, a, b):
-    return (x - a) / (b - a) if b > a else 0.0
-
-def _int_or_none(v):
-    try:
-        return int(v) if v is not None else None
-    except (TypeError, ValueError):
-        return None
+logger = logging.getLogger(__name__)
 
 def _float_or_default(v, default):
     try:
@@ -96,11 +46,6 @@ def _float_or_default(v, default):
     except (TypeError, ValueError):
         return default
 
-try:
-    from api.services.llm_openai import explain as _llm_explain
-except Exception:
-    _llm_explain = None
-
 def _fallback_explain(features: dict, lang: str = "ko") -> str:
     parts = []
     dk = features.get("distance_km")
@@ -132,11 +77,42 @@ def _fallback_explain(features: dict, lang: str = "ko") -> str:
 def safe_explain(features: dict, lang: str = "ko") -> str:
     try:
         from api.services.llm_openai import explain as _llm_explain
-        return _llm_explain(features, lang=lang)
+        with timing.span("explain"):
+            return _llm_explain(features, lang=lang)
     except Exception as e:
-        print(">>> fallback because:", e)
+        logger.warning("explain fallback: %r", e)
         return _fallback_explain(features, lang)
 
+def safe_explain_many(features_list: List[dict], lang: str = "ko") -> List[str]:
+    """응답 하나에 필요한 설명을 한꺼번에 동시 요청 (LLM 왕복 1회 수준)."""
+    if not features_list:
+        return []
+    try:
+        from api.services.llm_openai import explain_many as _llm_explain_many
+        with timing.span("explain"):
+            return _llm_explain_many(features_list, lang=lang)
+    except Exception as e:
+        logger.warning("explain fallback: %r", e)
+        return [_fallback_explain(f, lang) for f in features_list]
+
+def _lazy_why(params) -> bool:
+    return (params.get("why") or "").strip().lower() == "lazy"
+
+def _why_url(scope: str, spot_id: int, btype: str, lat, lon) -> str:
+    params = {"scope": scope, "spot": spot_id, "type": btype}
+    if lat is not None and lon is not None:
+        params.update(lat=lat, lon=lon)
+    return f"{reverse('recommend-why')}?{urlencode(params)}"
+
+def _set_lazy_why(scope: str, results: List[dict], lat, lon, qtype: str = "") -> None:
+    """why=lazy: 설명 대신 /recommendations/why/ 주소를 넣는다."""
+    for r in results:
+        r["why"] = None
+        if scope == "types":
+            r["why_url"] = _why_url("types", r["spot_id"], r["business_type"], lat, lon)
+        else:
+            r["why_url"] = _why_url("spots", r["id"], qtype, lat, lon)
+
 class BaseModelViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
 
@@ -175,15 +151,26 @@ class BusinessTypeViewSet(BaseModelViewSet):
 class DataViewSet(BaseModelViewSet):
     queryset = Data.objects.all().order_by("id")
     serializer_class = DataSerializer
+    # 전체 목록은 id 커서로 끊어서 (?cursor=, ?page_size= 최대 DATA_MAX_PAGE_SIZE)
+    pagination_class = IdCursorPagination
     filterset_fields = [
         "business_code", "business_types", "region_code", "region", "floor",
-        "monthly_rent", "deposit",
+        "monthly_rent", "deposit", "is_active",
     ]
     search_fields = ["business_code", "business_types", "address", "region"]
     ordering_fields = ["id", "monthly_rent", "deposit", "daily_footfall_avg", "latitude", "longitude"]
 
-    # GET /api/v1/data/by_bbox?min_lat=&max_lat=&min_lon=&max_lon=
-    @action(detail=False, methods=["get"])
+    def list(self, request, *args, **kwargs):
+        # 읽기 전용 목록은 serializer 대신 .values() dict 로 (필드 구성은 DataSerializer 와 같음)
+        qs = self.filter_queryset(self.get_queryset()).values(*DATA_FIELDS)
+        page = self.paginate_queryset(qs)
+        return self.get_paginated_response(page)
+
+    # GET /api/v1/data/by_bbox?min_lat=&max_lat=&min_lon=&max_lon=&cursor=&page_size=
+    #   &format=columnar (열 배열 JSON) | bin (마커 열 바이너리, renderers.MarkerBinaryRenderer 참고)
+    #   &zoom= 이 CLUSTER_MAX_ZOOM 미만이면 점 대신 클러스터 (개수, 중심, 평균 월세/유동인구)
+    @action(detail=False, methods=["get"],
+            renderer_classes=[*api_settings.DEFAULT_RENDERER_CLASSES, ColumnarJSONRenderer, MarkerBinaryRenderer])
     def by_bbox(self, request):
         try:
             min_lat = float(request.query_params.get("min_lat"))
@@ -193,29 +180,116 @@ class DataViewSet(BaseModelViewSet):
         except (TypeError, ValueError):
             return Response({"detail": "min/max_lat, min/max_lon 쿼리 파라미터 필요"}, status=400)
 
-        qs = self.get_queryset().filter(
-            latitude__gte=min_lat, latitude__lte=max_lat,
-            longitude__gte=min_lon, longitude__lte=max_lon,
-        )
-        page = self.paginate_queryset(qs)
-        if page is not None:
-            ser = self.get_serializer(page, many=True)
-            return self.get_paginated_response(ser.data)
-        ser = self.get_serializer(qs, many=True)
-        return Response(ser.data)
+        # 위경도 범위는 메모리 격자 인덱스로 거르고, DB 는 이번 페이지 pk 로만 조회
+        zoom = _int_or_none(request.query_params.get("zoom"))
+        if clusters.clusters_wanted(zoom):
+            return self._clusters(request, zoom, min_lat, max_lat, min_lon, max_lon)
+
+        with timing.span("fetch"):
+            ids = get_index().bbox(min_lat, max_lat, min_lon, max_lon)
+        # list 와 같은 페이지네이터(?cursor=). id 목록은 이미 있으므로 DB 대신 목록을 자른다
+        markers = request.accepted_renderer.format in ("columnar", "bin")
+        page_ids = self.paginator.paginate_ids(
+            ids, request, settings.MARKER_MAX_PAGE_SIZE if markers else settings.DATA_MAX_PAGE_SIZE)
+        if markers:
+            return self._markers(page_ids)
+        with timing.span("fetch"):
+            rows = fetch_values(page_ids, DATA_FIELDS)
+        return self.paginator.get_ids_response(rows)
+
+    def _clusters(self, request, zoom: int, min_lat, max_lat, min_lon, max_lon) -> Response:
+        """줌별로 미리 집계한 격자 클러스터. 화면 안 칸 수만큼이라 페이지를 나누지 않는다."""
+        fmt = request.accepted_renderer.format
+        if fmt == "bin":
+            return Response({"detail": "클러스터 응답은 format=bin 을 지원하지 않습니다. json 또는 columnar 로 요청해주세요."}, status=400)
+        with timing.span("cluster"):
+            items = clusters.bbox(zoom, min_lat, max_lat, min_lon, max_lon)
+        if fmt == "columnar":
+            keys = ("lat", "lon", "count", "avg_rent", "avg_footfall")
+            return Response({"zoom": zoom, "clusters": len(items), **{k: [c[k] for c in items] for k in keys}})
+        return Response({"zoom": zoom, "clusters": items})
+
+    def _markers(self, page_ids: List[int]) -> Response:
+        """지도 마커에 필요한 열만 열 배열로. 다음/이전 페이지 URL 은 본문 next/previous 와 X-Next/X-Previous 헤더 둘 다."""
+        with timing.span("fetch"):
+            rows = fetch_values(page_ids, ("id", "latitude", "longitude", "floor", "monthly_rent", "daily_footfall_avg"))
+        data = {
+            "id": [r["id"] for r in rows],
+            "lat": [r["latitude"] for r in rows],
+            "lon": [r["longitude"] for r in rows],
+            "floor": [-1 if r["floor"] is None else r["floor"] for r in rows],
+            "rent": [r["monthly_rent"] for r in rows],
+            "footfall": [r["daily_footfall_avg"] for r in rows],
+        }
+        nxt, prev = self.paginator.ids_next_link(), self.paginator.ids_previous_link()
+        resp = Response({"count": len(rows), "next": nxt, "previous": prev, **data})
+        if nxt:
+            resp["X-Next"] = nxt
+        if prev:
+            resp["X-Previous"] = prev
+        return resp
 
 # Endpoints:
 # GET    /api/v1/analysis-requests
-# POST   /api/v1/analysis-requests
+# POST   /api/v1/analysis-requests          (추천 계산 작업을 대기열에 넣고 바로 응답, status="queued")
 # GET    /api/v1/analysis-requests/{id}
 # PATCH  /api/v1/analysis-requests/{id}
 # DELETE /api/v1/analysis-requests/{id}
+# GET    /api/v1/analysis-requests/{id}/job/           (작업 상태. 안 끝났으면 Retry-After 초 뒤에 다시)
+# POST   /api/v1/analysis-requests/{id}/retry/         (실패한 작업 다시 넣기)
 class AnalysisRequestViewSet(BaseModelViewSet):
-    queryset = AnalysisRequest.objects.select_related("user", "business_type").all()
+    queryset = AnalysisRequest.objects.select_related("user", "business_type", "job").all()
     serializer_class = AnalysisRequestSerializer
     filterset_fields = ["plan", "user", "business_type"]
     search_fields = ["address", "user__uuid"]
     ordering_fields = ["id", "created_at"]
+    # 작업이 안 끝났을 때 Retry-After 기본값(초)
+    JOB_RETRY_AFTER = 2
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            ar = serializer.save()
+            jobs.enqueue(ar)
+
+    @staticmethod
+    def _job_payload(job: AnalysisJob) -> dict:
+        data = {
+            "analysis_request": job.analysis_request_id,
+            "status": job.status,
+            "attempts": job.attempts,
+            "error": job.error or None,
+            "finished_at": job.finished_at,
+        }
+        if job.status == AnalysisJob.DONE:
+            data["type_recommendations"] = TypeRecommendation.objects.filter(analysis_request_id=job.analysis_request_id).count()
+            data["spot_recommendations"] = SpotRecommendation.objects.filter(analysis_request_id=job.analysis_request_id).count()
+        return data
+
+    @action(detail=True, methods=["get"])
+    def job(self, request, pk=None):
+        """기다리지 않고 지금 상태를 돌려준다. 대기/처리 중이면 Retry-After (재시도 대기 중이면 그 시각까지)."""
+        ar = self.get_object()
+        job = AnalysisJob.objects.filter(analysis_request=ar).first()
+        if job is None:
+            return Response({"detail": "작업이 없습니다."}, status=404)
+        resp = Response(self._job_payload(job))
+        if job.status in (AnalysisJob.QUEUED, AnalysisJob.RUNNING):
+            delay = self.JOB_RETRY_AFTER
+            if job.status == AnalysisJob.QUEUED:
+                delay = max(delay, math.ceil((job.available_at - timezone.now()).total_seconds()))
+            resp["Retry-After"] = str(delay)
+        return resp
+
+    @action(detail=True, methods=["post"])
+    def retry(self, request, pk=None):
+        ar = self.get_object()
+        job = AnalysisJob.objects.filter(analysis_request=ar).first()
+        if job is None:
+            job = jobs.enqueue(ar)
+        elif not jobs.retry(job):
+            return Response({"detail": f"실패한 작업만 다시 넣을 수 있습니다 (현재 {job.status})."}, status=409)
+        job.refresh_from_db()
+        return Response(self._job_payload(job), status=202)
 
 # Endpoints:
 # GET    /api/v1/type-recommendations
@@ -317,254 +391,227 @@ class FavoriteSpotViewSet(BaseModelViewSet):
 # Endpoints (추천 전용):
 # GET /api/v1/recommendations/types/?lat=&lon=&radius_km=3
 class RecommendBusinessTypes(APIView):
-    TARGET_TYPE_COUNT = 3
+    def _rank(self, lat: float, lon: float, radius_km: float):
+        """(결과 목록, 설명용 지표 목록, 실제 적용 반경 km). 설명(why) 생성 전 단계까지."""
+        return get_recommender().recommend_types(lat, lon, radius_km)
 
-    def get(self, request):
+    @staticmethod
+    def parse(params):
+        """((lat, lon, radius_km), None) 또는 (None, 오류 메시지). 비동기 버전과 공용."""
         try:
-            lat = float(request.query_params.get("lat"))
-            lon = float(request.query_params.get("lon"))
+            lat = float(params.get("lat"))
+            lon = float(params.get("lon"))
         except Exception:
-            return Response({"detail": "lat, lon 쿼리에 숫자로 넣어주세요."}, status=400)
-
-        radius_km = _float_or_default(request.query_params.get("radius_km", 3.0), 3.0)
-        radius_km = max(0.1, min(50.0, radius_km))
-
-        # 후보 수집 (반경 확장)
-        def fetch(radius) -> List[Data]:
-            lat_deg = radius / 111.0
-            lon_deg = radius / (111.320 * max(0.0001, math.cos(math.radians(lat))))
-            qs: QuerySet[Data] = Data.objects.filter(
-                latitude__gte=lat - lat_deg, latitude__lte=lat + lat_deg,
-                longitude__gte=lon - lon_deg, longitude__lte=lon + lon_deg,
-            ).only("id","code","business_types","address","latitude","longitude","monthly_rent","deposit","daily_footfall_avg","floor")
-            return list(qs)
-
-        grow = [radius_km, 5, 10, 20, 30]
-        candidates: List[Data] = []
-        for r in grow:
-            candidates = fetch(r)
-            if candidates:
-                break
-        if not candidates:
-            return Response({"results": []})
+            return None, "lat, lon 쿼리에 숫자로 넣어주세요."
+        radius_km = _float_or_default(params.get("radius_km", 3.0), 3.0)
+        return (lat, lon, max(0.1, min(50.0, radius_km))), None
+
+    def compute(self, lat: float, lon: float, radius_km: float):
+        """(lat, lon, 결과 목록 사본, 설명용 지표 목록, 실제 적용 반경 km). 좌표는 타일/캐시 격자에 맞춘 값."""
+        # 서울 범위 + 반경 버킷이면 build_tiles 로 미리 계산한 타일을 그대로 사용 (좌표는 타일 중심)
+        with timing.span("tile"):
+            tile = tiles.lookup(lat, lon, radius_km)
+        if tile is not None:
+            lat, lon, results, features_list, effective_km = tile
+        else:
+            # 근처 좌표 요청은 같은 격자 칸으로 맞춰 점수 결과를 캐시에서 재사용
+            lat, lon = response_cache.snap(lat), response_cache.snap(lon)
+            radius_km = response_cache.norm_radius(radius_km)
+            results, features_list, effective_km = response_cache.get_or_compute(
+                ("types", lat, lon, radius_km), lambda: self._rank(lat, lon, radius_km))
+        return lat, lon, [dict(r) for r in results], features_list, effective_km
+
+    def get(self, request):
+        args, error = self.parse(request.query_params)
+        if error:
+            return Response({"detail": error}, status=400)
+        lat, lon, results, features_list, effective_km = self.compute(*args)
+        # 점수/거리를 잰 좌표 (타일 중심 또는 캐시 격자에 맞춘 값이라 요청 좌표와 조금 다를 수 있음)
+        origin = {"lat": lat, "lon": lon}
+        if not results:
+            return Response({"results": [], "effective_radius_km": effective_km, "origin": origin})
+
+        # 2단계: 살아남은 상위 N 개만 설명 생성 (why=lazy 면 나중에 /recommendations/why/ 로)
+        if _lazy_why(request.query_params):
+            _set_lazy_why("types", results, lat, lon)
+        else:
+            for r, why in zip(results, safe_explain_many(features_list)):
+                r["why"] = why
+        return Response({"results": results, "effective_radius_km": effective_km, "origin": origin})
 
-        # 특징 계산 (유동인구→전환율 적용 방문자 추정)
-        enriched = []
-        for c in candidates:
-            d_km = haversine_km(lat, lon, c.latitude, c.longitude)
-            btype = (c.business_types or "").strip() or "미분류"
-            rate  = get_visit_rate(btype)
-            foot  = float(c.daily_footfall_avg or 0.0)
-            visit_est = foot * rate
-            enriched.append({
-                "obj": c,
-                "type": btype,
-                "distance_km": d_km,
-                "visit_est": visit_est,
-                "rate": rate,
-                "rent": float(c.monthly_rent or 0.0),
-                "dep":  float(c.deposit or 0.0),
-                "floor": c.floor,
-            })
-
-        dmin, dmax = minmax([e["distance_km"] for e in enriched])
-        vmin, vmax = minmax([e["visit_est"]   for e in enriched])
-        rmin, rmax = minmax([e["rent"]        for e in enriched])
-        pmin, pmax = minmax([e["dep"]         for e in enriched])
-
-        # 가중치
-        W_VISIT, W_DIST, W_RENT, W_DEP = 0.42, 0.25, 0.23, 0.10
-
-        # 점수화 (raw)
-        items = []
-        for e in enriched:
-            visit_n = norm(e["visit_est"], vmin, vmax)
-            dist_n  = 1.0 - norm(e["distance_km"], dmin, dmax)
-            rent_n  = 1.0 - norm(e["rent"], rmin, rmax)
-            dep_n   = 1.0 - norm(e["dep"],  pmin, pmax)
-
-            floor_bonus = 0.0
-            if isinstance(e["floor"], int):
-                if e["floor"] == 1: floor_bonus = 0.03
-                elif 2 <= e["floor"] <= 3: floor_bonus = 0.015
-
-            raw = (W_VISIT*visit_n + W_DIST*dist_n + W_RENT*rent_n + W_DEP*dep_n) + floor_bonus
-            items.append({
-                "type": e["type"],
-                "score_raw": float(raw),
-                "distance_km": e["distance_km"],
-                "rate": e["rate"],
-                "obj": e["obj"],
-            })
-
-        # 업종별 집계 (raw agg)
-        by_type: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
-        for it in items:
-            by_type[it["type"]].append(it)
-
-        rows = []
-        for t, rows_items in by_type.items():
-            rows_items.sort(key=lambda x: x["score_raw"], reverse=True)
-            topk = rows_items[:3]
-            base = sum(r["score_raw"] for r in topk) / max(1, len(topk))
-            bonus = math.log(1 + len(rows_items)) * 0.02
-            agg_raw = base + bonus
-
-            first = topk[0] if topk else None
-            daily_foot = _int_or_none(first["obj"].daily_footfall_avg) if first else None
-            rate = first["rate"] if first else None
-            est_visitors = _int_or_none((daily_foot or 0) * (rate or 0)) if (daily_foot is not None and rate is not None) else None
-
-            why = safe_explain({
-                "business_type": t,
-                "distance_km": first["distance_km"] if first else None,
-                "daily_footfall_avg": daily_foot,
-                "assumed_visit_rate": rate,
-                "estimated_visitors": est_visitors,
-                "monthly_rent": _int_or_none(first["obj"].monthly_rent) if first else None,
-                "deposit": _int_or_none(first["obj"].deposit) if first else None,
-                "floor": first["obj"].floor if first else None,
-            })
-
-            rows.append({
-                "business_type": t,
-                "score_raw": float(agg_raw),
-                "count": len(rows_items),
-                "why": why,
-            })
-
-        # 5점 스케일로 변환
-        scaler = _to_five_point_scaler([r["score_raw"] for r in rows])
-        results = []
-        for r in rows:
-            results.append({
-                "business_type": r["business_type"],
-                "score": scaler(r["score_raw"]),  # "x.xx"
-                "count": r["count"],
-                "why": r["why"],
-            })
-
-        # 정렬 및 상위 N
-        results.sort(key=lambda x: float(x["score"]), reverse=True)
-        top = results[: self.TARGET_TYPE_COUNT]
-        return Response({"results": top})
-    
 # http://127.0.0.1:8000/api/v1/recommendations/spots/?type=카페
 # Endpoints (추천 전용):z
 # GET /api/v1/recommendations/spots/?type=(또는 business_type=)&lat=&lon=&radius_km=5
 class RecommendSpotsByType(APIView):
-    TARGET_COUNT = 3
+    def _rank(self, qtype: str, lat, lon, radius_km: float):
+        """(결과 목록, 설명용 지표 목록). 설명(why) 생성 전 단계까지."""
+        return get_recommender().recommend_spots(qtype, lat, lon, radius_km)
+
+    @staticmethod
+    def parse(params):
+        """((qtype, lat, lon, radius_km), None) 또는 (None, 오류 메시지). 비동기 버전과 공용."""
+        qtype = (params.get("type") or params.get("business_type") or "").strip()
+        if not qtype:
+            return None, "type(또는 business_type) 쿼리를 넣어주세요."
+
+        lat = params.get("lat")
+        lon = params.get("lon")
+        try:
+            lat = float(lat) if lat else None
+            lon = float(lon) if lon else None
+        except ValueError:
+            return None, "lat, lon 쿼리에 숫자로 넣어주세요."
+
+        radius_km = _float_or_default(params.get("radius_km", 5.0), 5.0)
+        return (qtype, lat, lon, max(0.1, min(50.0, radius_km))), None
+
+    def compute(self, qtype: str, lat, lon, radius_km: float):
+        """(qtype, lat, lon, 결과 목록 사본, 설명용 지표 목록). 값은 캐시 키에 맞춰 정규화한 것."""
+        qtype = response_cache.norm_type(qtype)
+        lat, lon = response_cache.snap(lat), response_cache.snap(lon)
+        radius_km = response_cache.norm_radius(radius_km)
+        results, features_list = response_cache.get_or_compute(
+            ("spots", qtype.casefold(), lat, lon, radius_km), lambda: self._rank(qtype, lat, lon, radius_km))
+        return qtype, lat, lon, [dict(r) for r in results], features_list
 
     def get(self, request):
-        qtype = (request.query_params.get("type") or request.query_params.get("business_type") or "").strip()
-        if not qtype:
-            return Response({"detail": "type(또는 business_type) 쿼리를 넣어주세요."}, status=400)
-
-        lat = request.query_params.get("lat")
-        lon = request.query_params.get("lon")
-        lat = float(lat) if lat else None
-        lon = float(lon) if lon else None
-
-        radius_km = _float_or_default(request.query_params.get("radius_km", 5.0), 5.0)
-        radius_km = max(0.1, min(50.0, radius_km))
-
-        qs: QuerySet[Data] = Data.objects.filter(business_types__icontains=qtype)
-        if lat is not None and lon is not None:
-            lat_deg = radius_km / 111.0
-            lon_deg = radius_km / (111.320 * max(0.0001, math.cos(math.radians(lat))))
-            qs = qs.filter(
-                latitude__gte=lat - lat_deg, latitude__lte=lat + lat_deg,
-                longitude__gte=lon - lon_deg, longitude__lte=lon + lon_deg,
-            )
-        qs = qs.only("id","code","business_types","address","region","latitude","longitude","monthly_rent","deposit","daily_footfall_avg","floor")
-
-        candidates = list(qs[:10000])
-        if not candidates:
+        args, error = self.parse(request.query_params)
+        if error:
+            return Response({"detail": error}, status=400)
+        qtype, lat, lon, results, features_list = self.compute(*args)
+        if not results:
             return Response({"results": []})
 
-        rate = get_visit_rate(qtype)
-
-        enriched = []
-        for c in candidates:
-            d_km = (haversine_km(lat, lon, c.latitude, c.longitude) if lat is not None and lon is not None else 0.0)
-            foot = float(c.daily_footfall_avg or 0.0)
-            visit_est = foot * rate
-
-            enriched.append({
-                "obj": c,
-                "distance_km": d_km,
-                "visit_est": visit_est,
-                "rent": float(c.monthly_rent or 0.0),
-                "dep":  float(c.deposit or 0.0),
-                "floor": c.floor,
-            })
-
-        dmin, dmax = minmax([e["distance_km"] for e in enriched])
-        vmin, vmax = minmax([e["visit_est"]   for e in enriched])
-        rmin, rmax = minmax([e["rent"]        for e in enriched])
-        pmin, pmax = minmax([e["dep"]         for e in enriched])
-
-        if lat is not None and lon is not None:
-            W_VISIT, W_DIST, W_RENT, W_DEP = 0.42, 0.23, 0.25, 0.10
+        if _lazy_why(request.query_params):
+            _set_lazy_why("spots", results, lat, lon, qtype)
         else:
-            W_VISIT, W_RENT, W_DEP, W_DIST = 0.55, 0.30, 0.15, 0.0
-
-        rows = []
-        for e in enriched:
-            visit_n = norm(e["visit_est"], vmin, vmax)
-            rent_n  = 1.0 - norm(e["rent"], rmin, rmax)
-            dep_n   = 1.0 - norm(e["dep"],  pmin, pmax)
-            dist_n  = (1.0 - norm(e["distance_km"], dmin, dmax)) if W_DIST > 0 else 0.0
-
-            floor_bonus = 0.0
-            if isinstance(e["floor"], int):
-                if e["floor"] == 1: floor_bonus = 0.03
-                elif 2 <= e["floor"] <= 3: floor_bonus = 0.015
-
-            raw = (W_VISIT*visit_n + W_DIST*dist_n + W_RENT*rent_n + W_DEP*dep_n) + floor_bonus
-
-            c = e["obj"]
-            rows.append({
-                "id": c.id,
-                "code": c.code,
-                "business_type": c.business_types,
-                "address": c.address,
-                "region": c.region,
-                "latitude": c.latitude,
-                "longitude": c.longitude,
-                "monthly_rent": c.monthly_rent,
-                "deposit": c.deposit,
-                "daily_footfall_avg": c.daily_footfall_avg,
-                "assumed_visit_rate": rate,
-                "estimated_visitors": _int_or_none(e["visit_est"]),
-                "floor": c.floor,
-                "distance_km": round(e["distance_km"], 3) if W_DIST > 0 else None,
-                "score_raw": float(raw),
-            })
-
-        scaler = _to_five_point_scaler([r["score_raw"] for r in rows])
-        for r in rows:
-            r["score"] = scaler(r["score_raw"])  
-
-        rows.sort(key=lambda x: x["score_raw"], reverse=True)
-        top = rows[: self.TARGET_COUNT]
-
-
-        results = []
-        for rec in top:
-            why = safe_explain({
-                "business_type": qtype or rec["business_type"],
-                "distance_km": rec["distance_km"],
-                "daily_footfall_avg": _int_or_none(rec["daily_footfall_avg"]),
-                "assumed_visit_rate": rec["assumed_visit_rate"],
-                "estimated_visitors": rec["estimated_visitors"],
-                "monthly_rent": _int_or_none(rec["monthly_rent"]),
-                "deposit": _int_or_none(rec["deposit"]),
-                "floor": rec["floor"],
-                "address": rec["address"],
-            })
-            rec_out = {k: v for k, v in rec.items() if k != "score_raw"}
-            rec_out["why"] = why
-            results.append(rec_out)
-
-        return Response({"results": results})
\ No newline at end of file
+            for rec, why in zip(results, safe_explain_many(features_list)):
+                rec["why"] = why
+
+        return Response({"results": results})
+
+# 여러 출발점 일괄 추천. 모든 질의가 메모리 추천 엔진 스냅샷 하나를 공유하고, 결과는 NDJSON 으로 한 줄씩 흘려보냄
+# POST /api/v1/recommendations/batch/
+#   {"queries": [{"lat":, "lon":, "radius_km":, "type":}, ...], "why": "lazy"(기본)|"full"}
+#   type 이 있으면 위치 추천(spots), 없으면 업종 추천(types)
+class RecommendBatch(APIView):
+    MAX_QUERIES = 1000
+    # why=full 일 때 이 개수의 질의씩 설명을 모아 한 번에 동시 요청
+    EXPLAIN_GROUP = 8
+
+    def post(self, request):
+        queries = request.data.get("queries") if isinstance(request.data, dict) else None
+        if not isinstance(queries, list) or not queries:
+            return Response({"detail": "queries 목록을 넣어주세요."}, status=400)
+        if len(queries) > self.MAX_QUERIES:
+            return Response({"detail": f"queries 는 최대 {self.MAX_QUERIES}개까지입니다."}, status=400)
+        lazy = (request.data.get("why") or "lazy").strip().lower() != "full"
+
+        parsed = [self._parse(q) for q in queries]
+        resp = StreamingHttpResponse(self._stream(parsed, lazy), content_type="application/x-ndjson")
+        resp["X-Accel-Buffering"] = "no"
+        return resp
+
+    def _parse(self, q) -> dict:
+        """질의 하나를 단일 추천 API 와 같은 규칙으로 정규화. 잘못된 질의는 error 만 담는다."""
+        if not isinstance(q, dict):
+            return {"error": "질의는 객체여야 합니다."}
+        qtype = response_cache.norm_type(str(q.get("type") or q.get("business_type") or ""))
+        lat = _float_or_default(q.get("lat"), None)
+        lon = _float_or_default(q.get("lon"), None)
+        if (lat is None) != (lon is None) or (not qtype and lat is None):
+            return {"error": "lat, lon 을 숫자로 넣어주세요." if qtype else "type 이 없으면 lat, lon 이 필요합니다."}
+        default = 5.0 if qtype else 3.0
+        radius_km = max(0.1, min(50.0, _float_or_default(q.get("radius_km", default), default)))
+        return {
+            "scope": "spots" if qtype else "types",
+            "type": qtype,
+            "lat": response_cache.snap(lat),
+            "lon": response_cache.snap(lon),
+            "radius_km": response_cache.norm_radius(radius_km),
+        }
+
+    def _answer(self, q: dict, engine):
+        if q["scope"] == "types":
+            # 단일 업종 추천과 응답 캐시를 같이 쓰므로 같은 모양 (결과, 지표, 실제 반경)
+            return engine.recommend_types(q["lat"], q["lon"], q["radius_km"])
+        return engine.recommend_spots(q["type"], q["lat"], q["lon"], q["radius_km"])
+
+    def _stream(self, parsed: List[dict], lazy: bool):
+        # 스트림 도중 Data 가 바뀌어도 한 요청 안의 질의는 같은 스냅샷으로
+        engine = get_recommender()
+
+        def compute(i: int):
+            return self._answer(parsed[i], engine)
+
+        pending = []
+        for i, q in enumerate(parsed):
+            if "error" in q:
+                line = {"index": i, "error": q["error"]}
+                pending.append((line, []))
+            else:
+                key = (q["scope"], q["type"].casefold(), q["lat"], q["lon"], q["radius_km"]) if q["scope"] == "spots" \
+                    else ("types", q["lat"], q["lon"], q["radius_km"])
+                value = response_cache.get_or_compute(key, lambda i=i: compute(i))
+                results, features_list = value[0], value[1]
+                results = [dict(r) for r in results]
+                line = {"index": i, **q, "results": results}
+                if q["scope"] == "types":
+                    line["effective_radius_km"] = value[2]
+                if lazy:
+                    _set_lazy_why(q["scope"], results, q["lat"], q["lon"], q["type"])
+                pending.append((line, features_list))
+            if lazy or len(pending) >= self.EXPLAIN_GROUP:
+                yield from self._flush(pending, lazy)
+                pending = []
+        yield from self._flush(pending, lazy)
+
+    def _flush(self, pending, lazy: bool):
+        if not lazy:
+            whys = iter(safe_explain_many([f for _, fl in pending for f in fl]))
+            for line, fl in pending:
+                for r in line.get("results", []):
+                    r["why"] = next(whys)
+        for line, _ in pending:
+            yield json.dumps(line, ensure_ascii=False) + "\n"
+
+# 설명 지연 조회 (추천 응답의 why_url)
+# GET /api/v1/recommendations/why/?scope=types|spots&spot=&type=&lat=&lon=
+class RecommendWhy(APIView):
+    def get(self, request):
+        scope = (request.query_params.get("scope") or "spots").strip()
+        btype = (request.query_params.get("type") or "").strip()
+        try:
+            spot_id = int(request.query_params.get("spot"))
+        except (TypeError, ValueError):
+            return Response({"detail": "spot 쿼리에 Data id 를 넣어주세요."}, status=400)
+        if scope not in ("types", "spots") or not btype:
+            return Response({"detail": "scope(types|spots), type 쿼리를 확인해주세요."}, status=400)
+
+        lat = _float_or_default(request.query_params.get("lat"), None)
+        lon = _float_or_default(request.query_params.get("lon"), None)
+        spot = Data.objects.filter(id=spot_id).first()
+        if spot is None:
+            return Response({"detail": "해당 위치가 없습니다."}, status=404)
+
+        has_loc = lat is not None and lon is not None
+        dist = float(scoring.haversine_km(lat, lon, np.array([spot.latitude]), np.array([spot.longitude]))[0]) if has_loc else None
+        rate = get_visit_rate(btype)
+        if scope == "types":
+            if dist is None:
+                return Response({"detail": "types 설명에는 lat, lon 이 필요합니다."}, status=400)
+            features = type_features(btype, spot, dist, rate)
+        else:
+            features = spot_features(btype, spot, round(dist, 3) if has_loc else None, rate)
+
+        return Response({"spot_id": spot.id, "business_type": btype, "why": safe_explain_many([features])[0]})
+
+# GET /api/v1/cache/stats/
+class CacheStats(APIView):
+    def get(self, request):
+        from api.services import explain_cache
+        return Response({"explanations": explain_cache.stats(), "responses": response_cache.stats()})
+
+# GET /api/v1/metrics/  (Prometheus 텍스트 형식, 단계별/경로별 지연 히스토그램. 워커 프로세스별 값)
+def metrics(request):
+    return HttpResponse(timing.render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -12,5 +12,14 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'main.settings')
+# ASGI 에서만 추천 API 를 비동기 뷰로 (settings.RECOMMEND_ASYNC)
+os.environ.setdefault('RECOMMEND_ASYNC', '1')
 
 application = get_asgi_application()
+
+# 추천/지도 API 가 첫 요청부터 빠르도록 공간 인덱스와 추천 엔진 스냅샷을 미리 만든다.
+from api.services.recommender import warm_recommender  # noqa: E402
+from api.services.spatial import warm_index  # noqa: E402
+
+warm_index()
+warm_recommender()
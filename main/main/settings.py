@@ -36,6 +36,58 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 load_dotenv(BASE_DIR / ".env")  # .env 파일 로드
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None   # 예: http://127.0.0.1:8001/v1 (로컬 가짜 서버)
+OPENAI_CONCURRENCY = int(os.getenv("OPENAI_CONCURRENCY", "8"))
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "20"))
+
+# 추천 사유 캐시 (프로세스 LRU + DB 테이블)
+EXPLAIN_CACHE_TTL = int(os.getenv("EXPLAIN_CACHE_TTL", str(7 * 24 * 3600)))   # 초
+EXPLAIN_CACHE_LRU_SIZE = int(os.getenv("EXPLAIN_CACHE_LRU_SIZE", "2048"))
+EXPLAIN_CACHE_MAX_ROWS = int(os.getenv("EXPLAIN_CACHE_MAX_ROWS", "100000"))
+
+# 추천 응답 캐시 (위경도를 격자로 맞춰 근처 요청끼리 공유, Data 버전이 바뀌면 비움)
+RECOMMEND_CACHE_GRID_DEG = float(os.getenv("RECOMMEND_CACHE_GRID_DEG", "0.001"))   # 위도 약 110m. 0 이면 격자 맞춤 안 함
+RECOMMEND_CACHE_SIZE = int(os.getenv("RECOMMEND_CACHE_SIZE", "4096"))              # 0 이면 캐시 끔
+RECOMMEND_CACHE_TTL = int(os.getenv("RECOMMEND_CACHE_TTL", "3600"))                # 초
+
+# 업종/위치 추천 API 를 비동기 뷰(api.async_views)로 연결. ASGI(uvicorn)에서 LLM 대기 중 스레드를 잡지 않는다.
+# 기본은 동기 뷰 (WSGI/runserver). main/asgi.py 로 띄우면 켜진다 (환경 변수로 0 을 주면 끔)
+RECOMMEND_ASYNC = os.getenv("RECOMMEND_ASYNC", "0") == "1"
+RECOMMEND_ASYNC_THREADS = int(os.getenv("RECOMMEND_ASYNC_THREADS", "8"))       # 점수 계산/DB 조회용 스레드 수
+
+# 업종 추천 반경 안 후보가 이 수보다 적으면 가까운 후보로 채울 때까지 반경을 넓힌다 (1 이면 비었을 때만)
+RECOMMEND_MIN_TYPE_CANDIDATES = int(os.getenv("RECOMMEND_MIN_TYPE_CANDIDATES", "1"))
+
+# 업종 추천 사전 계산 타일 (build_tiles 명령). 범위 안 + 반경이 버킷 값이면 타일로 바로 응답
+RECOMMEND_TILE_GRID_DEG = float(os.getenv("RECOMMEND_TILE_GRID_DEG", "0.002"))     # 위도 약 220m
+RECOMMEND_TILE_RADII = tuple(float(x) for x in os.getenv("RECOMMEND_TILE_RADII", "1,3,5").split(","))
+RECOMMEND_TILE_BBOX = (37.41, 37.72, 126.76, 127.19)                                 # 서울 (min_lat, max_lat, min_lon, max_lon)
+
+# Data 목록/지도 범위 조회 페이지 크기 (?page_size= 는 최대값까지)
+DATA_PAGE_SIZE = int(os.getenv("DATA_PAGE_SIZE", "500"))
+DATA_MAX_PAGE_SIZE = int(os.getenv("DATA_MAX_PAGE_SIZE", "2000"))
+# by_bbox ?format=columnar|bin 마커 전용 응답은 열 몇 개뿐이라 더 크게
+MARKER_MAX_PAGE_SIZE = int(os.getenv("MARKER_MAX_PAGE_SIZE", "50000"))
+# by_bbox ?zoom= 이 CLUSTER_MAX_ZOOM 보다 작으면 점 대신 줌별 사전 집계 클러스터로 응답
+CLUSTER_MIN_ZOOM = int(os.getenv("CLUSTER_MIN_ZOOM", "6"))
+CLUSTER_MAX_ZOOM = int(os.getenv("CLUSTER_MAX_ZOOM", "15"))
+
+# 분석 요청 추천 계산 작업 큐 (api.services.jobs). 기본 0: 웹 프로세스는 처리하지 않고 run_jobs 명령에 맡김
+# (SQLite 라 쓰는 프로세스/스레드가 많을수록 잠금 대기가 늘어난다)
+ANALYSIS_JOB_WORKERS = int(os.getenv("ANALYSIS_JOB_WORKERS", "0"))
+ANALYSIS_JOB_MAX_ATTEMPTS = int(os.getenv("ANALYSIS_JOB_MAX_ATTEMPTS", "3"))
+ANALYSIS_JOB_RETRY_DELAY = int(os.getenv("ANALYSIS_JOB_RETRY_DELAY", "10"))       # 초, 재시도마다 두 배
+ANALYSIS_JOB_LOCK_TIMEOUT = int(os.getenv("ANALYSIS_JOB_LOCK_TIMEOUT", "300"))    # 초, 넘으면 다른 워커가 다시 가져감
+
+# api.timing: 요청별 단계 시간 JSON 로그 (API_LOG_LEVEL=WARNING 이면 끔)
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "api": {"handlers": ["console"], "level": os.getenv("API_LOG_LEVEL", "INFO"), "propagate": False},
+    },
+}
 
 # Application definition
 
@@ -58,6 +110,7 @@ REST_FRAMEWORK = {
 }
 
 MIDDLEWARE = [
+    'api.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -94,6 +147,8 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / "db.sqlite3",
+        # 작업 워커와 웹 요청이 함께 쓸 때 "database is locked" 대신 이 초만큼 잠금을 기다린다
+        'OPTIONS': {'timeout': int(os.getenv("SQLITE_TIMEOUT", "20"))},
     }
 }
 # Password validation
@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'main.settings')
 
 application = get_wsgi_application()
+
+# 추천/지도 API 가 첫 요청부터 빠르도록 공간 인덱스와 추천 엔진 스냅샷을 미리 만든다.
+from api.services.recommender import warm_recommender  # noqa: E402
+from api.services.spatial import warm_index  # noqa: E402
+
+warm_index()
+warm_recommender()
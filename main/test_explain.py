@@ -1,4 +1,3 @@
-import os
 from api.services.llm_openai import explain
 
 # 테스트용 입력
@@ -14,3 +13,14 @@ features = {
 
 print("=== explain() 결과 ===")
 print(explain(features))
+
+# 여러 건 동시 요청 (OPENAI_BASE_URL 로 로컬 가짜 서버를 지정해 확인 가능)
+import time
+from api.services.llm_openai import explain_many
+
+batch = [dict(features, distance_km=round(0.2 * i, 2)) for i in range(1, 6)]
+t0 = time.perf_counter()
+outs = explain_many(batch)
+print(f"=== explain_many() {len(outs)}건, {time.perf_counter() - t0:.2f}s ===")
+for o in outs:
+    print("-", o[:80])